@@ -0,0 +1,103 @@
+"""Perfil do tempo de importação da interface e da linha de comando (python -X importtime)."""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Diretório em que os módulos são importados
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Módulo importado por cada alvo
+TARGETS = {
+    "app": "main.app",
+    "cli": "main.cli",
+    "utils": "utils",
+}
+
+# Módulos que a interface não deve importar antes de abrir a janela
+HEAVY_MODULES = ("numpy", "pandas", "openpyxl", "pyarrow", "utils.merge_engine")
+
+
+def profile_import(module: str) -> List[Dict]:
+    """
+    Importa um módulo em um processo novo e coleta o tempo de cada importação.
+
+    Args:
+        module: Módulo a importar (por exemplo, "main.app")
+
+    Returns:
+        Lista de {"modulo", "proprio_ms", "acumulado_ms", "nivel"}, na ordem do Python
+
+    Raises:
+        ValueError: Se a importação falha
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"Erro ao importar {module}:\n{result.stderr.strip()}")
+
+    modulos = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        proprio, acumulado, nome = line[len("import time:"):].split("|")
+        modulos.append({
+            "modulo": nome.strip(),
+            "proprio_ms": int(proprio) / 1000,
+            "acumulado_ms": int(acumulado) / 1000,
+            # Cada nível de importação aninhada acrescenta dois espaços ao nome
+            "nivel": (len(nome) - len(nome.lstrip()) - 1) // 2,
+        })
+    return modulos
+
+
+def command_profile(args) -> int:
+    """Mostra os módulos mais lentos de cada alvo."""
+    status = 0
+    for target in args.targets or ["app", "cli"]:
+        module = TARGETS[target]
+        # Menor tempo total entre as repetições
+        modulos = min(
+            (profile_import(module) for _ in range(args.repeat)),
+            key=lambda ms: sum(m["proprio_ms"] for m in ms)
+        )
+        total = sum(m["proprio_ms"] for m in modulos)
+        print(f"{target} (import {module}): {total:.0f} ms, {len(modulos)} módulos")
+
+        for m in sorted(modulos, key=lambda m: m["acumulado_ms"], reverse=True)[:args.top]:
+            print(f"  {m['acumulado_ms']:9.1f} ms  {m['proprio_ms']:8.1f} ms  {'  ' * m['nivel']}{m['modulo']}")
+
+        nomes = {m["modulo"] for m in modulos}
+        pesados = [nome for nome in HEAVY_MODULES if nome in nomes]
+        if pesados:
+            print(f"  Módulos pesados importados: {', '.join(pesados)}")
+            if args.check and target == "app":
+                status = 1
+        print()
+    return status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argumentos do perfil de importação."""
+    parser = argparse.ArgumentParser(description="Perfil do tempo de importação (python -X importtime).")
+    parser.add_argument("--target", dest="targets", action="append", choices=sorted(TARGETS),
+                        help="Alvo a medir; pode ser repetido (padrão: app e cli)")
+    parser.add_argument("--top", type=int, default=15, help="Módulos listados por alvo (padrão: 15)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (vale a mais rápida)")
+    parser.add_argument("--check", action="store_true",
+                        help="Código de saída 1 se a interface importa pandas, numpy ou openpyxl ao abrir")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Função principal do perfil de importação."""
+    return command_profile(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""Benchmark das fases do merge (header, carga, junção, ordenação e gravação) em planilhas sintéticas."""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+# Adicionar o caminho do módulo utils ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from synthetic import generate_dataset
+from utils import DiskCache, WorkbookCache, load_workbook, write_excel
+from utils.column_categories import categorize_columns
+from utils.column_loader import read_header
+from utils.excel_engines import AUTO_ENGINE, ENGINE_MODULES, available_engines
+from utils.join_backends import BACKENDS, get_backend, sort_frame
+from utils.merge_engine import MergeEngine
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+
+# Versão do formato dos arquivos de resultado
+RESULTS_VERSION = 1
+
+# Colunas usadas no merge de cada cenário
+COLUNAS_PESSOAS = ["ID Pessoal", "Nome", "Sobrenome", "Nome do Departamento", "Número do Documento"]
+COLUNAS_REGISTROS = ["Horário", "ID Pessoal", "Nome da Área", "Nome do Dispositivo", "Descrição do Evento"]
+SORT_COLUMN = "Horário"
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def measure(fases: List[Dict], fase: str, func: Callable, trace_memory: bool = True):
+    """
+    Executa uma fase medindo tempo, CPU e memória.
+
+    Acrescenta a fases o dicionário {"fase", "segundos", "cpu_segundos",
+    "pico_mb", "rss_mb", "linhas", "bytes"}. pico_mb é o pico de memória
+    alocada durante a fase (tracemalloc, que deixa a fase mais lenta);
+    rss_mb é o pico de RSS do processo até o fim da fase (não diminui
+    entre as fases).
+
+    Args:
+        fases: Lista que recebe a medição
+        fase: Nome da fase
+        func: Função da fase; retorna (resultado, linhas, bytes)
+        trace_memory: Mede o pico de memória alocada com tracemalloc
+
+    Returns:
+        Resultado da função
+    """
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    inicio, cpu = time.perf_counter(), time.process_time()
+    try:
+        resultado, linhas, tamanho = func()
+        segundos, cpu_segundos = time.perf_counter() - inicio, time.process_time() - cpu
+        pico = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    fases.append({
+        "fase": fase,
+        "segundos": round(segundos, 4),
+        "cpu_segundos": round(cpu_segundos, 4),
+        "pico_mb": None if pico is None else round(pico / (1024 * 1024), 1),
+        "rss_mb": peak_rss_mb(),
+        "linhas": linhas,
+        "bytes": tamanho,
+    })
+    return resultado
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de RSS do processo em MiB (None onde não há o módulo resource)."""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB; macOS, em bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(maxrss / divisor, 1)
+
+
+def run_scenario(
+    manifest: Dict,
+    backend: str = "hash",
+    reader: str = AUTO_ENGINE,
+    trace_memory: bool = True,
+    output_dir: Optional[str] = None
+) -> List[Dict]:
+    """
+    Mede as fases do merge de um conjunto sintético.
+
+    As fases repetem o que MergeEngine.merge() faz, separadas: leitura dos
+    headers e categorização das colunas, carga com tipos compactos (sem
+    caches), junção, ordenação por Horário e gravação em .xlsx.
+
+    Args:
+        manifest: Conjunto gerado por synthetic.generate_dataset()
+        backend: Backend de junção (ver join_backends.BACKENDS)
+        reader: Leitor de planilhas (ver excel_engines)
+        trace_memory: Mede o pico de memória alocada de cada fase
+        output_dir: Diretório do arquivo gravado (padrão: diretório temporário)
+
+    Returns:
+        Lista de medições, uma por fase (ver measure())
+    """
+    fases: List[Dict] = []
+    arquivos = [manifest["pessoas"], *manifest["registros"]]
+
+    # 1. Descoberta das colunas, como ao selecionar os arquivos na interface
+    def header():
+        headers = [read_header(path, header_row=1, engine=reader) for path in arquivos]
+        categorize_columns(headers[0], "pessoa")
+        for colunas in headers[1:]:
+            categorize_columns(colunas, "registros")
+        return headers, 0, None
+
+    measure(fases, "header", header, trace_memory)
+
+    # 2. Carga completa, sem reaproveitar caches
+    def carga():
+        def load(path, usecols):
+            return load_workbook(
+                path, header_row=1, cache=WorkbookCache(), usecols=usecols,
+                disk_cache=DiskCache(enabled=False), postprocess=MergeEngine._compact, engine=reader
+            )
+
+        df_pessoas = load(manifest["pessoas"], COLUNAS_PESSOAS)
+        partes = [load(path, COLUNAS_REGISTROS) for path in manifest["registros"]]
+        df_registros = partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+        tamanho = int(df_pessoas.memory_usage(deep=True).sum() + df_registros.memory_usage(deep=True).sum())
+        return (df_pessoas, df_registros), len(df_pessoas) + len(df_registros), tamanho
+
+    df_pessoas, df_registros = measure(fases, "carga", carga, trace_memory)
+
+    # 3. Junção, sem ordenação
+    def juncao():
+        df = get_backend(backend).join(df_pessoas, df_registros, COLUNAS_PESSOAS, COLUNAS_REGISTROS)
+        return df, len(df), int(df.memory_usage(deep=True).sum())
+
+    df_result = measure(fases, "juncao", juncao, trace_memory)
+
+    # 4. Ordenação completa por Horário
+    def ordenacao():
+        df = sort_frame(df_result, SORT_COLUMN, "DESC")
+        return df, len(df), None
+
+    df_result = measure(fases, "ordenacao", ordenacao, trace_memory)
+
+    # 5. Gravação do resultado
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+        out_path = os.path.join(tmp, "resultado.xlsx")
+
+        def gravacao():
+            linhas = write_excel(df_result, out_path)
+            return None, linhas, os.path.getsize(out_path)
+
+        measure(fases, "gravacao", gravacao, trace_memory)
+
+    return fases
+
+
+def environment(reader: str) -> Dict:
+    """Versões e máquina da execução, para comparar resultados ao longo do tempo."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "leitor": reader,
+        "leitores_instalados": available_engines(),
+    }
+
+
+def command_run(args) -> int:
+    """Gera os conjuntos, mede cada cenário e grava o arquivo de resultados."""
+    execucao = {
+        "versao": RESULTS_VERSION,
+        "inicio": datetime.datetime.now().isoformat(timespec="seconds"),
+        "ambiente": environment(args.reader),
+        "backend": args.backend,
+        "cenarios": [],
+    }
+
+    for n_registros in args.registros:
+        for skew in args.skew:
+            manifest = generate_dataset(
+                args.data_dir, args.pessoas, n_registros, skew, args.unmatched, args.seed
+            )
+            print(f"Cenário: {args.pessoas} pessoas, {n_registros} registros, skew {skew:g}")
+            # O tracemalloc deixa as fases várias vezes mais lentas: os tempos
+            # vêm das repetições sem ele e os picos, de uma passada à parte
+            repeticoes = [
+                run_scenario(manifest, args.backend, args.reader, trace_memory=False)
+                for _ in range(args.repeat)
+            ]
+            memoria = None
+            if not args.no_memory:
+                memoria = run_scenario(manifest, args.backend, args.reader, trace_memory=True)
+            resumo = summarize(repeticoes, memoria)
+            for fase in resumo:
+                print(
+                    f"  {fase['fase']:<10} {fase['segundos']:>9.3f} s"
+                    + (f"  pico {fase['pico_mb']:>8.1f} MiB" if fase["pico_mb"] is not None else "")
+                )
+            execucao["cenarios"].append({
+                "parametros": manifest["parametros"],
+                "fases": resumo,
+                "repeticoes": repeticoes,
+                "memoria": memoria,
+            })
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    nome = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(args.results_dir, f"{nome}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(execucao, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {path}")
+    return 0
+
+
+def summarize(repeticoes: List[List[Dict]], memoria: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Resumo de um cenário: o menor tempo de cada fase entre as repetições e,
+    se houver, o pico de memória alocada da passada com tracemalloc.
+    """
+    resumo = []
+    for i, medicao in enumerate(repeticoes[0]):
+        fase = dict(medicao)
+        medicoes = [repeticao[i] for repeticao in repeticoes]
+        fase["segundos"] = min(m["segundos"] for m in medicoes)
+        fase["cpu_segundos"] = min(m["cpu_segundos"] for m in medicoes)
+        fase["rss_mb"] = max(m["rss_mb"] or 0 for m in medicoes) or None
+        fase["pico_mb"] = memoria[i]["pico_mb"] if memoria else None
+        resumo.append(fase)
+    return resumo
+
+
+def command_compare(args) -> int:
+    """Compara os tempos de duas execuções, cenário a cenário."""
+    execucoes = []
+    for path in (args.anterior, args.atual):
+        with open(path, encoding="utf-8") as f:
+            execucoes.append(json.load(f))
+    anterior, atual = execucoes
+    for nome, valores in (
+        ("backend", (anterior["backend"], atual["backend"])),
+        ("leitor", (anterior["ambiente"]["leitor"], atual["ambiente"]["leitor"])),
+        ("commit", (anterior["ambiente"]["commit"], atual["ambiente"]["commit"])),
+    ):
+        if valores[0] != valores[1]:
+            print(f"{nome}: {valores[0]} -> {valores[1]}")
+
+    cenarios_anteriores = {_scenario_key(c["parametros"]): c for c in anterior["cenarios"]}
+    for cenario in atual["cenarios"]:
+        chave = _scenario_key(cenario["parametros"])
+        base = cenarios_anteriores.get(chave)
+        p = cenario["parametros"]
+        print(f"Cenário: {p['pessoas']} pessoas, {p['registros']} registros, skew {p['skew']:g}")
+        if base is None:
+            print("  (sem medição anterior)")
+            continue
+        tempos_base = {fase["fase"]: fase["segundos"] for fase in base["fases"]}
+        for fase in cenario["fases"]:
+            antes = tempos_base.get(fase["fase"])
+            if not antes:
+                continue
+            variacao = (fase["segundos"] - antes) / antes * 100
+            print(f"  {fase['fase']:<10} {antes:>9.3f} s -> {fase['segundos']:>9.3f} s ({variacao:+.1f}%)")
+    return 0
+
+
+def _scenario_key(parametros: Dict) -> tuple:
+    return tuple(sorted(parametros.items()))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o parser de argumentos."""
+    parser = argparse.ArgumentParser(description="Benchmark das fases do merge em planilhas sintéticas.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Mede os cenários e grava um arquivo de resultados")
+    run.add_argument("--pessoas", type=int, default=10000, help="Linhas de Pessoas (padrão: 10000)")
+    run.add_argument("--registros", type=int, nargs="+", default=[10000, 100000],
+                     help="Linhas de Registros de cada cenário (padrão: 10000 100000)")
+    run.add_argument("--skew", type=float, nargs="+", default=[0.0],
+                     help="Concentração de eventos por pessoa de cada cenário (0 = uniforme)")
+    run.add_argument("--unmatched", type=float, default=0.02, help="Fração de eventos sem pessoa")
+    run.add_argument("--seed", type=int, default=0, help="Semente do gerador aleatório")
+    run.add_argument("--backend", choices=sorted(BACKENDS), default="hash", help="Backend de junção")
+    run.add_argument("--reader", choices=[AUTO_ENGINE, *ENGINE_MODULES], default=AUTO_ENGINE,
+                     help="Leitor de planilhas")
+    run.add_argument("--repeat", type=int, default=1, help="Repetições de cada cenário")
+    run.add_argument("--no-memory", action="store_true",
+                     help="Não faz a passada extra com tracemalloc que mede o pico de memória de cada fase")
+    run.add_argument("--data-dir", default=DEFAULT_DATA_DIR,
+                     help="Diretório das planilhas geradas (padrão: benchmarks/data/)")
+    run.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR,
+                     help="Diretório dos resultados (padrão: benchmarks/results/)")
+
+    compare = subparsers.add_parser("compare", help="Compara duas execuções")
+    compare.add_argument("anterior", help="Arquivo de resultados de referência")
+    compare.add_argument("atual", help="Arquivo de resultados a comparar")
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Função principal do benchmark."""
+    args = build_parser().parse_args(argv)
+    if args.command == "compare":
+        return command_compare(args)
+    return command_run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
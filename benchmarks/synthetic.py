@@ -0,0 +1,252 @@
+"""Geração de planilhas sintéticas no formato das exportações do ZKBio CVSecurity."""
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+# Adicionar o caminho do módulo utils ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.column_categories import categorize_columns
+from utils.output_writers import EXCEL_MAX_ROWS
+
+
+# Colunas das exportações (todas reconhecidas pelas categorias de column_categories)
+PESSOAS_COLUMNS = [
+    "ID Pessoal", "Nome", "Sobrenome", "Nome do Departamento", "Número de Departamento",
+    "Gênero", "Email", "Tipo de Documento", "Número do Documento", "Número do Cartão",
+    "Nome do Cargo", "Data de Contratação", "Data de Nascimento", "Celular",
+    "Telefone Comercial", "Endereço", "País", "Observação",
+]
+REGISTROS_COLUMNS = [
+    "Horário", "ID Pessoal", "Nome", "Sobrenome", "Nome do Departamento", "Número do Cartão",
+    "Nome da Área", "Nome do Dispositivo", "Ponto do Evento", "Descrição do Evento",
+    "Nível do Evento", "Nome do Leitor", "Modo de Verificação",
+]
+
+# Título que as exportações trazem na primeira linha (o header fica na segunda)
+TITLE = "Relatório sintético"
+
+# Linhas de dados por arquivo de Registros (limite do Excel menos título e header)
+MAX_ROWS_PER_FILE = EXCEL_MAX_ROWS - 2
+
+MANIFEST = "manifest.json"
+
+_DEPARTAMENTOS = ["Administração", "Operações", "Manutenção", "Segurança", "Logística", "TI"]
+_CARGOS = ["Analista", "Técnico", "Supervisor", "Gerente", "Assistente"]
+_AREAS = [f"Área {i}" for i in range(1, 21)]
+_EVENTOS = ["Abertura normal por cartão", "Acesso negado", "Abertura por biometria", "Porta aberta"]
+_NIVEIS = ["Normal", "Exceção", "Alarme"]
+_MODOS = ["Cartão", "Digital", "Face", "Cartão + Senha"]
+
+
+def check_columns() -> None:
+    """
+    Confere que as colunas sintéticas caem nas categorias reais da interface.
+
+    Raises:
+        ValueError: Se alguma coluna ficaria em "Personalizadas"
+    """
+    for columns, data_type in ((PESSOAS_COLUMNS, "pessoa"), (REGISTROS_COLUMNS, "registros")):
+        personalizadas = categorize_columns(columns, data_type).get("Personalizadas", [])
+        if personalizadas:
+            raise ValueError(f"Colunas sem categoria ({data_type}): {', '.join(personalizadas)}")
+
+
+def make_pessoas(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Gera a planilha de Pessoas.
+
+    Args:
+        n: Número de pessoas ("ID Pessoal" de 1 a n)
+        seed: Semente do gerador aleatório
+
+    Returns:
+        DataFrame com as colunas de PESSOAS_COLUMNS
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1)
+    departamento = rng.integers(0, len(_DEPARTAMENTOS), n)
+    nascimento = pd.Timestamp("1960-01-01") + pd.to_timedelta(rng.integers(0, 15000, n), unit="D")
+    contratacao = pd.Timestamp("2005-01-01") + pd.to_timedelta(rng.integers(0, 7000, n), unit="D")
+
+    return pd.DataFrame({
+        "ID Pessoal": ids,
+        "Nome": [f"Pessoa{i}" for i in ids],
+        "Sobrenome": rng.choice(["Silva", "Souza", "Oliveira", "Santos", "Lima"], n),
+        "Nome do Departamento": np.array(_DEPARTAMENTOS)[departamento],
+        "Número de Departamento": departamento + 1,
+        "Gênero": rng.choice(["M", "F"], n),
+        "Email": [f"pessoa{i}@exemplo.com" for i in ids],
+        "Tipo de Documento": "CPF",
+        "Número do Documento": rng.integers(10 ** 10, 10 ** 11, n).astype(str),
+        "Número do Cartão": rng.integers(10 ** 6, 10 ** 7, n),
+        "Nome do Cargo": rng.choice(_CARGOS, n),
+        "Data de Contratação": contratacao.strftime("%Y-%m-%d"),
+        "Data de Nascimento": nascimento.strftime("%Y-%m-%d"),
+        "Celular": [f"(11) 9{i % 10000:04d}-{i % 7919:04d}" for i in ids],
+        "Telefone Comercial": None,
+        "Endereço": [f"Rua {i % 500}, {i % 2000}" for i in ids],
+        "País": "Brasil",
+        "Observação": rng.choice([None, "ASO em dia", "Terceirizado"], n, p=[0.8, 0.1, 0.1]),
+    }, columns=PESSOAS_COLUMNS)
+
+
+def make_registros(
+    n: int,
+    n_pessoas: int,
+    skew: float = 0.0,
+    unmatched: float = 0.02,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Gera a planilha de Registros de acesso.
+
+    Args:
+        n: Número de eventos
+        n_pessoas: Número de pessoas de make_pessoas()
+        skew: Concentração dos eventos por pessoa: 0 = uniforme; valores
+              maiores seguem uma lei de Zipf (a k-ésima pessoa mais ativa tem
+              peso 1 / k ** skew)
+        unmatched: Fração de eventos com "ID Pessoal" ausente de Pessoas
+        seed: Semente do gerador aleatório
+
+    Returns:
+        DataFrame com as colunas de REGISTROS_COLUMNS, em ordem cronológica
+    """
+    rng = np.random.default_rng(seed + 1)
+
+    # 1. "ID Pessoal" com a distribuição pedida (pessoas mais ativas sorteadas ao acaso)
+    weights = 1.0 / np.arange(1, n_pessoas + 1) ** skew
+    ranking = rng.permutation(n_pessoas) + 1
+    ids = ranking[rng.choice(n_pessoas, n, p=weights / weights.sum())]
+    sem_pessoa = rng.random(n) < unmatched
+    ids[sem_pessoa] = n_pessoas + rng.integers(1, max(2, n_pessoas // 10), int(sem_pessoa.sum()))
+
+    # 2. Eventos ao longo de 90 dias, com dados repetidos da pessoa
+    segundos = np.sort(rng.integers(0, 90 * 24 * 3600, n))
+    horario = (pd.Timestamp("2024-01-01") + pd.to_timedelta(segundos, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+    area = rng.integers(0, len(_AREAS), n)
+    dispositivo = area * 3 + rng.integers(0, 3, n)
+
+    return pd.DataFrame({
+        "Horário": horario,
+        "ID Pessoal": ids,
+        "Nome": [f"Pessoa{i}" for i in ids],
+        "Sobrenome": None,
+        "Nome do Departamento": None,
+        "Número do Cartão": None,
+        "Nome da Área": np.array(_AREAS)[area],
+        "Nome do Dispositivo": [f"Leitor-{d:03d}" for d in dispositivo],
+        "Ponto do Evento": [f"Porta-{d:03d}" for d in dispositivo],
+        "Descrição do Evento": rng.choice(_EVENTOS, n, p=[0.7, 0.1, 0.15, 0.05]),
+        "Nível do Evento": rng.choice(_NIVEIS, n, p=[0.9, 0.08, 0.02]),
+        "Nome do Leitor": [f"Leitor-{d:03d}-1" for d in dispositivo],
+        "Modo de Verificação": rng.choice(_MODOS, n),
+    }, columns=REGISTROS_COLUMNS)
+
+
+def write_workbook(df: pd.DataFrame, path: str, title: str = TITLE) -> None:
+    """Grava o DataFrame como uma exportação: título na primeira linha e header na segunda."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([title])
+    sheet.append(list(df.columns))
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def generate_dataset(
+    data_dir: str,
+    n_pessoas: int,
+    n_registros: int,
+    skew: float = 0.0,
+    unmatched: float = 0.02,
+    seed: int = 0
+) -> Dict:
+    """
+    Gera (ou reaproveita) um conjunto de planilhas sintéticas.
+
+    Cada conjunto fica em um subdiretório de data_dir identificado pelos
+    parâmetros; se o manifesto já existe, os arquivos não são gerados de
+    novo. Registros acima do limite de linhas do Excel são divididos em
+    vários arquivos (registros_1.xlsx, registros_2.xlsx, ...).
+
+    Args:
+        data_dir: Diretório dos conjuntos
+        n_pessoas: Linhas de Pessoas
+        n_registros: Linhas de Registros (somando todos os arquivos)
+        skew: Concentração de eventos por pessoa (ver make_registros)
+        unmatched: Fração de eventos sem pessoa correspondente
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Manifesto {"parametros", "pessoas", "registros"} com os caminhos dos arquivos
+    """
+    parametros = {
+        "pessoas": n_pessoas, "registros": n_registros,
+        "skew": skew, "unmatched": unmatched, "seed": seed,
+    }
+    name = f"p{n_pessoas}_r{n_registros}_s{skew:g}_u{unmatched:g}_seed{seed}"
+    target = os.path.join(data_dir, name)
+    manifest_path = os.path.join(target, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("parametros") == parametros:
+            return manifest
+
+    check_columns()
+    os.makedirs(target, exist_ok=True)
+
+    # 1. Pessoas
+    pessoas_path = os.path.join(target, "pessoas.xlsx")
+    write_workbook(make_pessoas(n_pessoas, seed), pessoas_path)
+
+    # 2. Registros, divididos em arquivos que cabem em uma planilha
+    registros = make_registros(n_registros, n_pessoas, skew, unmatched, seed)
+    partes = max(1, math.ceil(n_registros / MAX_ROWS_PER_FILE))
+    registros_paths = []
+    for parte in range(partes):
+        path = os.path.join(target, f"registros_{parte + 1}.xlsx")
+        inicio = parte * MAX_ROWS_PER_FILE
+        write_workbook(registros.iloc[inicio:inicio + MAX_ROWS_PER_FILE], path)
+        registros_paths.append(path)
+
+    manifest = {"parametros": parametros, "pessoas": pessoas_path, "registros": registros_paths}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Gera um conjunto pela linha de comando e mostra os arquivos criados."""
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas de Pessoas e Registros.")
+    parser.add_argument("--pessoas", type=int, default=10000, help="Linhas de Pessoas (padrão: 10000)")
+    parser.add_argument("--registros", type=int, default=100000, help="Linhas de Registros (padrão: 100000)")
+    parser.add_argument("--skew", type=float, default=0.0, help="Concentração de eventos por pessoa (0 = uniforme)")
+    parser.add_argument("--unmatched", type=float, default=0.02, help="Fração de eventos sem pessoa (padrão: 0.02)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador aleatório")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(__file__), "data"),
+                        help="Diretório dos conjuntos (padrão: benchmarks/data/)")
+    args = parser.parse_args(argv)
+
+    manifest = generate_dataset(
+        args.data_dir, args.pessoas, args.registros, args.skew, args.unmatched, args.seed
+    )
+    print(manifest["pessoas"])
+    for path in manifest["registros"]:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
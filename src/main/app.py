@@ -1,24 +1,62 @@
 """Aplicativo principal unificado com interface tipo ZKBio CVSecurity."""
 import sys
 import os
+import multiprocessing
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 
 # Adicionar o caminho do módulo utils ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+# Somente módulos leves aqui: o pandas e a engine são importados em segundo
+# plano depois que a janela abre (ver utils.warmup) ou no primeiro uso
 from utils import (
-    load_columns_from_excel,
     categorize_columns,
-    MergeEngine,
+    set_custom_categories,
     ConfigManager,
-    CategoryFrame,
-    ScrollableFrame,
+    ColumnChecklist,
     set_path,
     validar_entrada,
-    validar_colunas_selecionadas
+    validar_colunas_selecionadas,
+    BackgroundTask,
+    start_warmup
 )
-import pandas as pd
+from utils.merge_options import (
+    DATE_FILTER_COLUMN,
+    DEFAULT_CSV_DELIMITER,
+    DEFAULT_CSV_ENCODING,
+    DEFAULT_OUTPUT_FORMAT,
+    DEFAULT_OUTPUT_MODE,
+    DEFAULT_ROW_GROUP_ROWS,
+    DEFAULT_SQLITE_TABLE,
+    OUTPUT_EXTENSIONS,
+    OUTPUT_FORMATS,
+    OUTPUT_MODES,
+    PRESET_AGGREGATIONS,
+    VALUE_FILTER_COLUMNS,
+    format_for_path,
+)
+
+# Intervalo (ms) de consulta aos eventos da tarefa em segundo plano
+POLL_INTERVAL_MS = 100
+
+# Linhas por página da prévia do resultado
+PREVIEW_PAGE_ROWS = 200
+
+# Opções dos formatos de saída editáveis na interface: (formato, opção, rótulo, padrão, largura)
+FORMAT_OPTION_FIELDS = [
+    ("csv", "encoding", "Codificação CSV:", DEFAULT_CSV_ENCODING, 10),
+    ("csv", "delimiter", "Delimitador:", DEFAULT_CSV_DELIMITER, 3),
+    ("parquet", "row_group_size", "Linhas por grupo Parquet:", DEFAULT_ROW_GROUP_ROWS, 8),
+    ("sqlite", "table", "Tabela SQLite:", DEFAULT_SQLITE_TABLE, 12),
+]
+
+# Rótulos exibidos para cada etapa informada pela engine
+PHASE_LABELS = {
+    "load": "Carregando planilhas...",
+    "join": "Mesclando...",
+    "write": "Gravando arquivo...",
+}
 
 
 class MergeApp(tk.Tk):
@@ -34,21 +72,40 @@ class MergeApp(tk.Tk):
 
         # Inicializar manager de configurações
         self.config_manager = ConfigManager()
-        self.merge_engine = MergeEngine()
+        self._merge_engine = None
+
+        # Categorias de colunas do usuário (~/.worksheet-merge/categories.json)
+        try:
+            set_custom_categories(self.config_manager.load_categories())
+        except ValueError as e:
+            messagebox.showwarning("Aviso", f"Categorias personalizadas ignoradas:\n{str(e)}")
 
         # Variáveis de controle
         self.path_pessoas = tk.StringVar()
         self.path_secundario = tk.StringVar()
-        self.df_pessoas = None
-        self.df_secundario = None
+        self.colunas_pessoas = []
+        self.colunas_secundario = []
         self.colunas_categorias_pessoas = {}
         self.colunas_categorias_secundario = {}
-        self.category_frames_pessoas = {}
-        self.category_frames_secundario = {}
+        self.current_task = None
+        self.preview = None
+        self.preview_page = 0
+        self.preview_window = None
 
         # Criar widgets
         self._create_widgets()
 
+        # Importar o pandas e a engine assim que a janela for desenhada
+        self.after_idle(start_warmup)
+
+    @property
+    def merge_engine(self):
+        """Engine do merge, criada no primeiro uso (importa o pandas)."""
+        if self._merge_engine is None:
+            from utils import MergeEngine
+            self._merge_engine = MergeEngine()
+        return self._merge_engine
+
     def _create_widgets(self):
         """Cria todos os widgets da interface."""
 
@@ -114,16 +171,11 @@ class MergeApp(tk.Tk):
         )
         self.paned.add(frame_aba_pessoas)
 
-        self.scrollable_pessoas = ScrollableFrame(frame_aba_pessoas)
-        self.scrollable_pessoas.pack(fill="both", expand=True)
-
-        # Label no aba pessoas
-        self.label_pessoas = tk.Label(
-            self.scrollable_pessoas.get_frame(),
-            text="Selecione um arquivo de Pessoas para ver as colunas disponíveis.",
-            fg="gray"
+        self.checklist_pessoas = ColumnChecklist(
+            frame_aba_pessoas,
+            empty_text="Selecione um arquivo de Pessoas para ver as colunas disponíveis."
         )
-        self.label_pessoas.pack()
+        self.checklist_pessoas.pack(fill="both", expand=True)
 
         # Aba 2: Secundário
         frame_aba_secundario = tk.LabelFrame(
@@ -135,16 +187,11 @@ class MergeApp(tk.Tk):
         )
         self.paned.add(frame_aba_secundario)
 
-        self.scrollable_secundario = ScrollableFrame(frame_aba_secundario)
-        self.scrollable_secundario.pack(fill="both", expand=True)
-
-        # Label no aba secundário
-        self.label_secundario = tk.Label(
-            self.scrollable_secundario.get_frame(),
-            text="Selecione um arquivo Secundário para ver as colunas disponíveis.",
-            fg="gray"
+        self.checklist_secundario = ColumnChecklist(
+            frame_aba_secundario,
+            empty_text="Selecione um arquivo Secundário para ver as colunas disponíveis."
         )
-        self.label_secundario.pack()
+        self.checklist_secundario.pack(fill="both", expand=True)
 
         # ===== FRAME INFERIOR: OPÇÕES =====
         frame_opcoes = tk.LabelFrame(
@@ -183,6 +230,88 @@ class MergeApp(tk.Tk):
             value="ASC"
         ).pack(side="left", padx=5)
 
+        # Modo de saída: ordenar tudo, primeiros N, últimos por pessoa ou ordem original
+        frame_saida = tk.Frame(frame_opcoes)
+        frame_saida.pack(fill="x", pady=5)
+        tk.Label(frame_saida, text="Saída:").pack(side="left", padx=(0, 5))
+        self.combo_output_mode = ttk.Combobox(
+            frame_saida,
+            values=list(OUTPUT_MODES.values()),
+            state="readonly",
+            width=20
+        )
+        self.combo_output_mode.set(OUTPUT_MODES[DEFAULT_OUTPUT_MODE])
+        self.combo_output_mode.pack(side="left", padx=(0, 10))
+        tk.Label(frame_saida, text="Limite (N / por pessoa):").pack(side="left", padx=(0, 5))
+        self.entry_limit = tk.Entry(frame_saida, width=10)
+        self.entry_limit.pack(side="left")
+
+        # Formato do arquivo de saída e as opções de cada formato (a extensão
+        # escolhida na janela de salvar também define o formato)
+        frame_formato = tk.Frame(frame_opcoes)
+        frame_formato.pack(fill="x", pady=5)
+        tk.Label(frame_formato, text="Formato:").pack(side="left", padx=(0, 5))
+        self.combo_output_format = ttk.Combobox(
+            frame_formato,
+            values=list(OUTPUT_FORMATS.values()),
+            state="readonly",
+            width=10
+        )
+        self.combo_output_format.set(OUTPUT_FORMATS[DEFAULT_OUTPUT_FORMAT])
+        self.combo_output_format.pack(side="left", padx=(0, 10))
+        self.entries_formato = {}
+        for output_format, option, rotulo, padrao, largura in FORMAT_OPTION_FIELDS:
+            tk.Label(frame_formato, text=rotulo).pack(side="left", padx=(0, 5))
+            entry = tk.Entry(frame_formato, width=largura)
+            entry.insert(0, str(padrao))
+            entry.pack(side="left", padx=(0, 10))
+            self.entries_formato[(output_format, option)] = entry
+
+        # Resumos gravados como planilhas extras, calculados durante o merge
+        frame_resumos = tk.Frame(frame_opcoes)
+        frame_resumos.pack(fill="x", pady=5)
+        tk.Label(frame_resumos, text="Resumos:").pack(side="left", padx=(0, 5))
+        self.vars_resumos = {}
+        for nome in PRESET_AGGREGATIONS:
+            self.vars_resumos[nome] = tk.BooleanVar(value=False)
+            tk.Checkbutton(frame_resumos, text=nome, variable=self.vars_resumos[nome]).pack(side="left")
+        self.var_somente_resumos = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            frame_resumos,
+            text="Somente resumos (sem detalhe)",
+            variable=self.var_somente_resumos
+        ).pack(side="left", padx=(10, 0))
+        # Resumos personalizados de uma configuração carregada (sem controles próprios)
+        self.resumos_personalizados = {}
+
+        # Filtros de linhas do arquivo secundário
+        frame_filtros = tk.LabelFrame(
+            frame_opcoes,
+            text="Filtros do arquivo secundário (valores separados por vírgula; vazio = sem filtro)",
+            padx=5,
+            pady=5
+        )
+        frame_filtros.pack(fill="x", pady=5)
+
+        frame_periodo = tk.Frame(frame_filtros)
+        frame_periodo.pack(fill="x")
+        tk.Label(frame_periodo, text=f"{DATE_FILTER_COLUMN} de:").pack(side="left", padx=(0, 5))
+        self.entry_filtro_inicio = tk.Entry(frame_periodo, width=20)
+        self.entry_filtro_inicio.pack(side="left", padx=(0, 5))
+        tk.Label(frame_periodo, text="até:").pack(side="left", padx=(0, 5))
+        self.entry_filtro_fim = tk.Entry(frame_periodo, width=20)
+        self.entry_filtro_fim.pack(side="left", padx=(0, 5))
+        tk.Label(frame_periodo, text="(AAAA-MM-DD [HH:MM:SS])", fg="gray").pack(side="left")
+
+        frame_valores = tk.Frame(frame_filtros)
+        frame_valores.pack(fill="x", pady=(5, 0))
+        self.entries_filtro = {}
+        for i, coluna in enumerate(VALUE_FILTER_COLUMNS):
+            tk.Label(frame_valores, text=f"{coluna}:").grid(row=i // 2, column=2 * (i % 2), sticky="w", padx=(0, 5))
+            entry = tk.Entry(frame_valores, width=30)
+            entry.grid(row=i // 2, column=2 * (i % 2) + 1, sticky="w", padx=(0, 15), pady=1)
+            self.entries_filtro[coluna] = entry
+
         # Salvar configuração
         frame_salvar_config = tk.Frame(frame_opcoes)
         frame_salvar_config.pack(fill="x", pady=5)
@@ -219,11 +348,28 @@ class MergeApp(tk.Tk):
             width=10
         ).pack(side="left")
 
+        # ===== FRAME PROGRESSO =====
+        frame_progresso = tk.Frame(self)
+        frame_progresso.pack(fill="x", padx=10)
+
+        self.label_progresso = tk.Label(frame_progresso, text="", fg="gray", width=28, anchor="w")
+        self.label_progresso.pack(side="left")
+        self.progress_bar = ttk.Progressbar(frame_progresso, mode="determinate", maximum=100)
+        self.progress_bar.pack(side="left", fill="x", expand=True, padx=5)
+        self.button_cancelar = tk.Button(
+            frame_progresso,
+            text="Cancelar",
+            command=self._cancel_task,
+            state="disabled",
+            width=10
+        )
+        self.button_cancelar.pack(side="left")
+
         # ===== FRAME BOTÕES =====
         frame_botoes = tk.Frame(self)
         frame_botoes.pack(fill="x", padx=10, pady=10)
 
-        tk.Button(
+        self.button_mesclar = tk.Button(
             frame_botoes,
             text="MESCLAR",
             command=self._merge,
@@ -232,7 +378,31 @@ class MergeApp(tk.Tk):
             font=("Arial", 11, "bold"),
             padx=30,
             pady=10
-        ).pack(side="left", padx=5)
+        )
+        self.button_mesclar.pack(side="left", padx=5)
+
+        # Primeiras linhas do resultado, sem gravar o arquivo
+        self.button_previa = tk.Button(
+            frame_botoes,
+            text="PRÉVIA",
+            command=self._preview,
+            font=("Arial", 11, "bold"),
+            padx=30,
+            pady=10
+        )
+        self.button_previa.pack(side="left", padx=5)
+
+        # Tempo, memória e linhas de cada fase do último merge
+        self.button_detalhes = tk.Button(
+            frame_botoes,
+            text="DETALHES",
+            command=self._show_metrics,
+            state="disabled",
+            font=("Arial", 11, "bold"),
+            padx=30,
+            pady=10
+        )
+        self.button_detalhes.pack(side="left", padx=5)
 
         tk.Button(
             frame_botoes,
@@ -268,52 +438,55 @@ class MergeApp(tk.Tk):
             self._update_config_dropdown()
 
     def _load_pessoas_columns(self):
-        """Carrega e categoriza colunas de pessoas."""
-        try:
-            path = self.path_pessoas.get()
-            if not path:
-                return
+        """Carrega as colunas de pessoas em segundo plano."""
+        path = self.path_pessoas.get()
+        if not path:
+            return
 
-            # Carregar colunas
-            colunas = load_columns_from_excel(path, header_row=1)
-            self.df_pessoas = pd.read_excel(path, header=1)
+        # Carregar colunas (somente o header; o parse completo fica para o merge)
+        self._run_task(
+            lambda control: _load_columns(path),
+            on_done=self._render_pessoas_columns,
+            error_message="Erro ao carregar colunas de Pessoas",
+            status="Lendo colunas de Pessoas..."
+        )
+
+    def _render_pessoas_columns(self, colunas):
+        """Categoriza e exibe as colunas de pessoas."""
+        try:
+            self.colunas_pessoas = colunas
 
             # Categorizar
             self.colunas_categorias_pessoas = categorize_columns(colunas, "pessoa")
+            self._update_sort_options()
 
-            # Limpar frames antigos
-            for frame in self.category_frames_pessoas.values():
-                frame.destroy()
-            self.category_frames_pessoas.clear()
-
-            # Renderizar categorias
-            frame_container = self.scrollable_pessoas.get_frame()
-            for widget in frame_container.winfo_children():
-                widget.destroy()
-
-            for categoria, colunas_cat in self.colunas_categorias_pessoas.items():
-                category_frame = CategoryFrame(
-                    frame_container,
-                    title=categoria,
-                    columns=colunas_cat,
-                    mandatory_column="ID Pessoal" if categoria == "Informações Básicas" else None
-                )
-                category_frame.pack(fill="x", padx=5, pady=5)
-                self.category_frames_pessoas[categoria] = category_frame
+            # Exibir as categorias (os itens da lista são substituídos, sem recriar widgets)
+            self.checklist_pessoas.set_columns(
+                self.colunas_categorias_pessoas,
+                mandatory_column="ID Pessoal"
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar colunas de Pessoas:\n{str(e)}")
 
     def _load_secundario_columns(self):
-        """Carrega e categoriza colunas do arquivo secundário."""
-        try:
-            path = self.path_secundario.get()
-            if not path:
-                return
+        """Carrega as colunas do arquivo secundário em segundo plano."""
+        path = self.path_secundario.get()
+        if not path:
+            return
 
-            # Carregar colunas
-            colunas = load_columns_from_excel(path, header_row=1)
-            self.df_secundario = pd.read_excel(path, header=1)
+        # Carregar colunas (somente o header; o parse completo fica para o merge)
+        self._run_task(
+            lambda control: _load_columns(path),
+            on_done=self._render_secundario_columns,
+            error_message="Erro ao carregar colunas do arquivo secundário",
+            status="Lendo colunas do arquivo secundário..."
+        )
+
+    def _render_secundario_columns(self, colunas):
+        """Categoriza e exibe as colunas do arquivo secundário."""
+        try:
+            self.colunas_secundario = colunas
 
             # Detectar tipo baseado nas colunas
             if "Horário" in colunas:
@@ -323,95 +496,450 @@ class MergeApp(tk.Tk):
 
             # Categorizar
             self.colunas_categorias_secundario = categorize_columns(colunas, tipo)
+            self._update_sort_options()
 
-            # Limpar frames antigos
-            for frame in self.category_frames_secundario.values():
-                frame.destroy()
-            self.category_frames_secundario.clear()
-
-            # Renderizar categorias
-            frame_container = self.scrollable_secundario.get_frame()
-            for widget in frame_container.winfo_children():
-                widget.destroy()
-
-            for categoria, colunas_cat in self.colunas_categorias_secundario.items():
-                category_frame = CategoryFrame(
-                    frame_container,
-                    title=categoria,
-                    columns=colunas_cat,
-                    mandatory_column="ID Pessoal" if "ID Pessoal" in colunas_cat else None
-                )
-                category_frame.pack(fill="x", padx=5, pady=5)
-                self.category_frames_secundario[categoria] = category_frame
+            # Exibir as categorias (os itens da lista são substituídos, sem recriar widgets)
+            self.checklist_secundario.set_columns(
+                self.colunas_categorias_secundario,
+                mandatory_column="ID Pessoal"
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar colunas do arquivo secundário:\n{str(e)}")
 
     def _get_selected_columns_pessoas(self):
         """Retorna colunas selecionadas de pessoas."""
-        colunas = []
-        for frame in self.category_frames_pessoas.values():
-            colunas.extend(frame.get_selected_columns())
-        return colunas
+        return self.checklist_pessoas.get_selected_columns()
 
     def _get_selected_columns_secundario(self):
         """Retorna colunas selecionadas do arquivo secundário."""
-        colunas = []
-        for frame in self.category_frames_secundario.values():
-            colunas.extend(frame.get_selected_columns())
-        return colunas
+        return self.checklist_secundario.get_selected_columns()
+
+    def _get_validated_selection(self):
+        """
+        Valida os arquivos e as colunas selecionadas.
+
+        Returns:
+            Tupla (colunas de pessoas, colunas do arquivo secundário), ou None se inválido
+        """
+        # Validações básicas
+        if not validar_entrada(
+            self.path_pessoas.get(),
+            self.path_secundario.get(),
+            "arquivo secundário"
+        ):
+            return None
+
+        # Obter colunas selecionadas
+        colunas_pessoas = self._get_selected_columns_pessoas()
+        colunas_secundario = self._get_selected_columns_secundario()
+
+        # Validar seleções
+        if not validar_colunas_selecionadas(
+            self.colunas_pessoas,
+            self.colunas_secundario,
+            colunas_pessoas,
+            colunas_secundario,
+            "arquivo secundário"
+        ):
+            return None
+
+        return colunas_pessoas, colunas_secundario
 
     def _merge(self):
-        """Executa o merge das planilhas."""
+        """Valida as seleções e inicia o merge em segundo plano."""
         try:
-            # Validações básicas
-            if not validar_entrada(
-                self.path_pessoas.get(),
-                self.path_secundario.get(),
-                "arquivo secundário"
-            ):
+            selecao = self._get_validated_selection()
+            if selecao is None:
                 return
+            colunas_pessoas, colunas_secundario = selecao
+            output_format, output_options = self._get_output_format()
 
-            # Obter colunas selecionadas
-            colunas_pessoas = self._get_selected_columns_pessoas()
-            colunas_secundario = self._get_selected_columns_secundario()
-
-            # Validar seleções
-            if not validar_colunas_selecionadas(
-                self.df_pessoas,
-                self.df_secundario,
-                colunas_pessoas,
-                colunas_secundario,
-                "arquivo secundário"
-            ):
+            # Solicitar caminho para salvar antes de iniciar o processamento
+            # (o formato selecionado é oferecido primeiro)
+            formatos = [output_format, *[f for f in OUTPUT_FORMATS if f != output_format]]
+            extensao = OUTPUT_EXTENSIONS[output_format][0]
+            save_path = filedialog.asksaveasfilename(
+                defaultextension=extensao,
+                filetypes=[
+                    *[
+                        (OUTPUT_FORMATS[f], " ".join(f"*{ext}" for ext in OUTPUT_EXTENSIONS[f]))
+                        for f in formatos
+                    ],
+                    ("All Files", "*.*")
+                ],
+                initialfile=f"planilha_mesclada{extensao}"
+            )
+            if not save_path:
                 return
 
-            # Executar merge
-            df_result = self.merge_engine.merge(
-                self.path_pessoas.get(),
-                self.path_secundario.get(),
-                colunas_pessoas,
-                colunas_secundario,
-                sort_column=self.combo_sort.get(),
-                sort_order=self.var_sort_order.get()
+            # A extensão escolhida define o formato
+            output_format = format_for_path(save_path, output_format)
+            self.combo_output_format.set(OUTPUT_FORMATS[output_format])
+            options = output_options.get(output_format, {})
+
+            # Ler os valores da interface aqui: a tarefa não acessa widgets
+            path_pessoas = self.path_pessoas.get()
+            path_secundario = self.path_secundario.get()
+            sort_column = self.combo_sort.get()
+            sort_order = self.var_sort_order.get()
+            filters = self._get_filters()
+            output_mode, limit = self._get_output_mode()
+            aggregations = self._get_aggregations()
+            detail_path = None if self.var_somente_resumos.get() else save_path
+            if aggregations and output_format != "xlsx":
+                # Os resumos são planilhas extras do mesmo arquivo
+                messagebox.showerror("Erro", "Os resumos são gravados somente em Excel (.xlsx)")
+                return
+
+            def run_report(control):
+                self.merge_engine.merge_report(
+                    path_pessoas,
+                    path_secundario,
+                    colunas_pessoas,
+                    colunas_secundario,
+                    aggregations,
+                    save_path,
+                    detail_path=detail_path,
+                    control=control,
+                    filters=filters
+                )
+                return save_path
+
+            def run_merge(control):
+                if output_mode == "unsorted":
+                    # Ordem original: os blocos do merge são gravados à
+                    # medida que chegam, sem montar o resultado em memória
+                    data = self.merge_engine.merge_chunks(
+                        path_pessoas,
+                        path_secundario,
+                        colunas_pessoas,
+                        colunas_secundario,
+                        control=control,
+                        filters=filters
+                    )
+                else:
+                    data = self.merge_engine.merge(
+                        path_pessoas,
+                        path_secundario,
+                        colunas_pessoas,
+                        colunas_secundario,
+                        sort_column=sort_column,
+                        sort_order=sort_order,
+                        control=control,
+                        filters=filters,
+                        output_mode=output_mode,
+                        limit=limit
+                    )
+                from utils import write_output
+                write_output(
+                    data, save_path, output_format, options, control=control,
+                    metrics=self.merge_engine.last_metrics
+                )
+                return save_path
+
+            # Com resumos, o detalhe segue a ordem do arquivo secundário
+            self._run_task(
+                run_report if aggregations else run_merge,
+                on_done=self._merge_done,
+                error_message="Erro ao processar merge",
+                status=PHASE_LABELS["load"],
+                cancellable=True
             )
 
-            # Solicitar caminho para salvar
-            save_path = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")],
-                initialfile="planilha_mesclada.xlsx"
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao processar merge:\n{str(e)}")
+
+    def _merge_done(self, path):
+        """Informa o fim do merge, com o resumo dos IDs sem correspondência em Pessoas."""
+        mensagem = f"Planilhas mescladas com sucesso!\n\nArquivo salvo em:\n{path}"
+        stats = self.merge_engine.last_key_stats
+        if stats and (stats["sem_correspondencia"] or stats["sem_chave"]):
+            from utils.join_keys import format_match_stats
+            mensagem += f"\n\nAtenção: {format_match_stats(stats)}"
+        messagebox.showinfo("Sucesso", mensagem)
+
+    def _run_task(self, target, on_done, error_message, status="", cancellable=False):
+        """
+        Executa uma função em segundo plano e acompanha seus eventos com after().
+
+        Args:
+            target: Função que recebe o TaskControl e retorna o resultado
+            on_done: Chamada na thread da interface com o resultado
+            error_message: Título da mensagem exibida em caso de erro
+            status: Texto exibido enquanto a tarefa roda
+            cancellable: Se o botão Cancelar fica habilitado
+        """
+        if self.current_task is not None and self.current_task.running:
+            messagebox.showwarning("Aviso", "Aguarde a conclusão da operação em andamento")
+            return
+
+        self.button_mesclar.config(state="disabled")
+        self.button_previa.config(state="disabled")
+        self.button_cancelar.config(state="normal" if cancellable else "disabled")
+        self.label_progresso.config(text=status)
+        self.progress_bar.config(mode="indeterminate")
+        self.progress_bar.start(15)
+
+        task = BackgroundTask(target).start()
+        self.current_task = task
+        self.after(POLL_INTERVAL_MS, lambda: self._poll_task(task, on_done, error_message))
+
+    def _poll_task(self, task, on_done, error_message):
+        """Processa os eventos da tarefa em segundo plano."""
+        for kind, payload in task.poll():
+            if kind == "progress":
+                self._show_progress(*payload)
+                continue
+
+            self._finish_task()
+            if kind == "done":
+                on_done(payload)
+            elif kind == "cancelled":
+                self.label_progresso.config(text="Operação cancelada")
+            else:
+                messagebox.showerror("Erro", f"{error_message}:\n{str(payload)}")
+            return
+
+        self.after(POLL_INTERVAL_MS, lambda: self._poll_task(task, on_done, error_message))
+
+    def _show_progress(self, phase, current, total):
+        """Atualiza o rótulo e a barra de progresso."""
+        label = PHASE_LABELS.get(phase, phase)
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", value=100 * current / total)
+            self.label_progresso.config(text=f"{label} {current}/{total}")
+        else:
+            if str(self.progress_bar.cget("mode")) != "indeterminate":
+                self.progress_bar.config(mode="indeterminate")
+                self.progress_bar.start(15)
+            text = f"{label} {current}" if current else label
+            self.label_progresso.config(text=text)
+
+    def _finish_task(self):
+        """Restaura a interface ao fim de uma tarefa."""
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", value=0)
+        self.label_progresso.config(text="")
+        self.button_mesclar.config(state="normal")
+        self.button_previa.config(state="normal")
+        self.button_cancelar.config(state="disabled")
+        if self._merge_engine is not None and self._merge_engine.last_metrics is not None:
+            self.button_detalhes.config(state="normal")
+
+    def _show_metrics(self):
+        """Mostra as fases do último merge: tempo, CPU, memória, linhas e bytes."""
+        metrics = self.merge_engine.last_metrics
+        if metrics is None:
+            return
+        run = metrics.to_dict()
+
+        janela = tk.Toplevel(self)
+        janela.title(f"Detalhes da execução ({run['operacao']})")
+        janela.geometry("860x360")
+
+        colunas = {
+            "segundos": "Tempo (s)",
+            "cpu_segundos": "CPU (s)",
+            "linhas_entrada": "Linhas entrada",
+            "linhas_saida": "Linhas saída",
+            "bytes_lidos": "Lidos (KiB)",
+            "bytes_gravados": "Gravados (KiB)",
+            "rss_mb": "RSS (MiB)",
+            "rss_pico_mb": "Pico (MiB)",
+        }
+        tree = ttk.Treeview(janela, columns=list(colunas))
+        tree.heading("#0", text="Fase")
+        tree.column("#0", width=200)
+        for coluna, titulo in colunas.items():
+            tree.heading(coluna, text=titulo)
+            tree.column(coluna, width=80, anchor="e")
+
+        # As fases vêm na ordem em que começaram: a fase "pai" já foi inserida
+        itens = {}
+        for fase in run["fases"]:
+            texto = fase["fase"]
+            if fase.get("arquivo"):
+                texto += f" ({fase['arquivo']})"
+            valores = []
+            for coluna in colunas:
+                valor = fase.get(coluna)
+                if valor is not None and coluna.startswith("bytes"):
+                    valor = f"{valor / 1024:.1f}"
+                valores.append("" if valor is None else valor)
+            itens[fase["fase"]] = tree.insert(
+                itens.get(fase["pai"], ""), "end", text=texto, values=valores, open=True
             )
+        tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        rodape = f"Total: {run['segundos']} s"
+        if run["erro"]:
+            rodape += f" | Erro: {run['erro']}"
+        if metrics.log_path:
+            rodape += f"\nRegistro: {metrics.log_path}"
+        tk.Label(janela, text=rodape, justify="left", anchor="w").pack(fill="x", padx=10, pady=(0, 10))
 
-            if save_path:
-                df_result.to_excel(save_path, index=False)
-                messagebox.showinfo(
-                    "Sucesso",
-                    f"Planilhas mescladas com sucesso!\n\nArquivo salvo em:\n{save_path}"
+    def _preview(self):
+        """Calcula a primeira página do resultado em segundo plano e a mostra na janela de prévia."""
+        try:
+            selecao = self._get_validated_selection()
+            if selecao is None:
+                return
+            colunas_pessoas, colunas_secundario = selecao
+
+            # Ler os valores da interface aqui: a tarefa não acessa widgets
+            path_pessoas = self.path_pessoas.get()
+            path_secundario = self.path_secundario.get()
+            filters = self._get_filters()
+
+            def run_preview(control):
+                return self.merge_engine.preview(
+                    path_pessoas,
+                    path_secundario,
+                    colunas_pessoas,
+                    colunas_secundario,
+                    page_size=PREVIEW_PAGE_ROWS,
+                    control=control,
+                    filters=filters
                 )
 
+            self._run_task(
+                run_preview,
+                on_done=self._preview_done,
+                error_message="Erro ao calcular a prévia",
+                status="Calculando a prévia...",
+                cancellable=True
+            )
+
         except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar merge:\n{str(e)}")
+            messagebox.showerror("Erro", f"Erro ao calcular a prévia:\n{str(e)}")
+
+    def _preview_done(self, preview):
+        """Substitui a prévia anterior e mostra a primeira página."""
+        if self.preview is not None:
+            self.preview.close()
+        self.preview = preview
+        self._open_preview_window()
+        self._render_preview_page(0, preview.page(0))
+
+    def _open_preview_window(self):
+        """Cria a janela de prévia (uma única, reaproveitada a cada atualização)."""
+        if self.preview_window is not None and self.preview_window.winfo_exists():
+            self.preview_window.lift()
+            return
+
+        janela = tk.Toplevel(self)
+        janela.title("Prévia do resultado")
+        janela.geometry("900x500")
+        janela.protocol("WM_DELETE_WINDOW", self._close_preview)
+        self.preview_window = janela
+
+        tk.Label(
+            janela,
+            text="Primeiras linhas do resultado, na ordem do arquivo secundário "
+                 "(sem ordenação, modo de saída e resumos). Somente as páginas exibidas são calculadas.",
+            fg="gray",
+            anchor="w"
+        ).pack(fill="x", padx=10, pady=(10, 5))
+
+        # Grade: somente as linhas da página atual ficam no Treeview
+        frame_grade = tk.Frame(janela)
+        frame_grade.pack(fill="both", expand=True, padx=10)
+        self.tree_preview = ttk.Treeview(frame_grade, show="headings")
+        scroll_y = ttk.Scrollbar(frame_grade, orient="vertical", command=self.tree_preview.yview)
+        scroll_x = ttk.Scrollbar(frame_grade, orient="horizontal", command=self.tree_preview.xview)
+        self.tree_preview.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        self.tree_preview.grid(row=0, column=0, sticky="nsew")
+        scroll_y.grid(row=0, column=1, sticky="ns")
+        scroll_x.grid(row=1, column=0, sticky="ew")
+        frame_grade.rowconfigure(0, weight=1)
+        frame_grade.columnconfigure(0, weight=1)
+
+        # Navegação entre as páginas
+        frame_paginas = tk.Frame(janela)
+        frame_paginas.pack(fill="x", padx=10, pady=10)
+        self.button_pagina_anterior = tk.Button(
+            frame_paginas, text="◀ Anterior", command=lambda: self._show_preview_page(self.preview_page - 1)
+        )
+        self.button_pagina_anterior.pack(side="left")
+        self.button_pagina_seguinte = tk.Button(
+            frame_paginas, text="Próxima ▶", command=lambda: self._show_preview_page(self.preview_page + 1)
+        )
+        self.button_pagina_seguinte.pack(side="left", padx=5)
+        self.label_pagina = tk.Label(frame_paginas, text="")
+        self.label_pagina.pack(side="left", padx=10)
+        tk.Button(
+            frame_paginas, text="Atualizar", command=self._preview
+        ).pack(side="right")
+
+    def _show_preview_page(self, number):
+        """Mostra uma página da prévia, calculando-a em segundo plano se ainda não foi lida."""
+        preview = self.preview
+        if preview is None or not preview.has_page(number):
+            return
+        if preview.is_loaded(number):
+            self._render_preview_page(number, preview.page(number))
+            return
+
+        self._run_task(
+            lambda control: preview.page(number, control),
+            on_done=lambda linhas: self._render_preview_page(number, linhas),
+            error_message="Erro ao calcular a prévia",
+            status="Calculando a prévia...",
+            cancellable=True
+        )
+
+    def _render_preview_page(self, number, linhas):
+        """Substitui as linhas da grade pelas da página."""
+        if self.preview_window is None or not self.preview_window.winfo_exists():
+            return
+        preview = self.preview
+        self.preview_page = number
+
+        # Identificadores por posição: o resultado pode repetir nomes de colunas
+        colunas = [str(coluna) for coluna in (preview.columns or [])]
+        if [self.tree_preview.heading(c, "text") for c in self.tree_preview["columns"]] != colunas:
+            ids = [f"c{i}" for i in range(len(colunas))]
+            self.tree_preview.configure(columns=ids)
+            for id_coluna, coluna in zip(ids, colunas):
+                self.tree_preview.heading(id_coluna, text=coluna)
+                self.tree_preview.column(id_coluna, width=120, stretch=False)
+
+        self.tree_preview.delete(*self.tree_preview.get_children())
+        valores = linhas.astype(object).where(linhas.notna(), "")
+        for linha in valores.itertuples(index=False):
+            self.tree_preview.insert("", "end", values=[str(valor) for valor in linha])
+
+        inicio = number * preview.page_size
+        if len(linhas):
+            texto = f"Página {number + 1}: linhas {inicio + 1} a {inicio + len(linhas)}"
+        else:
+            texto = "Nenhuma linha no resultado (confira os filtros)" if number == 0 else f"Página {number + 1}: sem linhas"
+        if preview.exhausted:
+            texto += f" de {preview.rows_loaded}"
+        self.label_pagina.config(text=texto)
+
+        self.button_pagina_anterior.config(state="normal" if number > 0 else "disabled")
+        self.button_pagina_seguinte.config(state="normal" if preview.has_page(number + 1) else "disabled")
+
+    def _close_preview(self):
+        """Fecha a janela de prévia e o arquivo secundário."""
+        if self.current_task is not None and self.current_task.running:
+            self.current_task.cancel()
+        if self.preview is not None:
+            self.preview.close()
+            self.preview = None
+        if self.preview_window is not None:
+            self.preview_window.destroy()
+            self.preview_window = None
+
+    def _cancel_task(self):
+        """Solicita o cancelamento da tarefa em andamento."""
+        if self.current_task is not None and self.current_task.running:
+            self.current_task.cancel()
+            self.label_progresso.config(text="Cancelando...")
+            self.button_cancelar.config(state="disabled")
 
     def _save_config(self):
         """Salva a configuração atual."""
@@ -428,12 +956,25 @@ class MergeApp(tk.Tk):
             messagebox.showwarning("Aviso", "Selecione colunas em ambos os painéis antes de salvar")
             return
 
+        try:
+            output_mode, limit = self._get_output_mode()
+            output_format, output_options = self._get_output_format()
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
+
         if self.config_manager.save_config(
             config_name,
             colunas_pessoas,
             colunas_secundario,
             self.combo_sort.get(),
-            self.var_sort_order.get()
+            self.var_sort_order.get(),
+            self._get_filters(),
+            output_mode,
+            limit,
+            self._get_aggregations(),
+            output_format,
+            output_options
         ):
             messagebox.showinfo("Sucesso", f"Configuração '{config_name}' salva com sucesso!")
             self._update_config_dropdown()
@@ -453,11 +994,8 @@ class MergeApp(tk.Tk):
 
         if config:
             # Carregar seleções de colunas
-            for frame in self.category_frames_pessoas.values():
-                frame.set_selected_columns(config.get("pessoas", []))
-
-            for frame in self.category_frames_secundario.values():
-                frame.set_selected_columns(config.get("secundario", []))
+            self.checklist_pessoas.set_selected_columns(config.get("pessoas", []))
+            self.checklist_secundario.set_selected_columns(config.get("secundario", []))
 
             # Carregar configurações de ordenação
             if config.get("sort_column"):
@@ -465,8 +1003,139 @@ class MergeApp(tk.Tk):
             if config.get("sort_order"):
                 self.var_sort_order.set(config["sort_order"])
 
+            # Carregar filtros, modo e formato de saída
+            self._set_filters(config.get("filters", {}))
+            self._set_output_mode(config.get("output_mode"), config.get("limit"))
+            self._set_output_format(config.get("output_format"), config.get("output_options"))
+            self._set_aggregations(config.get("aggregations", {}))
+
             messagebox.showinfo("Sucesso", f"Configuração '{config_name}' carregada!")
 
+    def _update_sort_options(self):
+        """Oferece como ordenação as colunas do arquivo secundário e, em seguida, as de Pessoas."""
+        colunas = list(dict.fromkeys([*self.colunas_secundario, *self.colunas_pessoas]))
+        self.combo_sort["values"] = colunas or ["Horário", "Nome do Nível"]
+
+    def _get_output_mode(self):
+        """
+        Lê o modo de saída e o limite da interface.
+
+        Returns:
+            Tupla (modo, limite ou None)
+
+        Raises:
+            ValueError: Se o limite não é um número inteiro
+        """
+        nomes = {nome: modo for modo, nome in OUTPUT_MODES.items()}
+        output_mode = nomes.get(self.combo_output_mode.get(), DEFAULT_OUTPUT_MODE)
+        texto = self.entry_limit.get().strip()
+        if not texto:
+            return output_mode, None
+        try:
+            return output_mode, int(texto)
+        except ValueError:
+            raise ValueError(f"Limite inválido: {texto}")
+
+    def _set_output_mode(self, output_mode, limit):
+        """Exibe o modo de saída e o limite de uma configuração."""
+        if output_mode not in OUTPUT_MODES:
+            output_mode = DEFAULT_OUTPUT_MODE
+        self.combo_output_mode.set(OUTPUT_MODES[output_mode])
+        self.entry_limit.delete(0, tk.END)
+        if limit is not None:
+            self.entry_limit.insert(0, str(limit))
+
+    def _get_output_format(self):
+        """
+        Lê o formato de saída e as opções de cada formato da interface.
+
+        Returns:
+            Tupla (formato, {formato: {opção: valor}}); campos vazios ficam
+            de fora (vale o padrão do formato)
+
+        Raises:
+            ValueError: Se o número de linhas por grupo não é um número inteiro
+        """
+        nomes = {nome: formato for formato, nome in OUTPUT_FORMATS.items()}
+        output_format = nomes.get(self.combo_output_format.get(), DEFAULT_OUTPUT_FORMAT)
+        options = {}
+        for (formato, option), entry in self.entries_formato.items():
+            texto = entry.get()
+            if option == "delimiter":
+                # Espaço é um delimitador válido; "\t" representa a tabulação
+                texto = "\t" if texto == "\\t" else texto
+            else:
+                texto = texto.strip()
+            if not texto:
+                continue
+            if option == "row_group_size":
+                try:
+                    texto = int(texto)
+                except ValueError:
+                    raise ValueError(f"Linhas por grupo inválidas: {texto}")
+            options.setdefault(formato, {})[option] = texto
+        return output_format, options
+
+    def _set_output_format(self, output_format, output_options):
+        """Exibe o formato de saída e as opções de uma configuração."""
+        if output_format not in OUTPUT_FORMATS:
+            output_format = DEFAULT_OUTPUT_FORMAT
+        self.combo_output_format.set(OUTPUT_FORMATS[output_format])
+        output_options = output_options or {}
+        for formato, option, _, padrao, _ in FORMAT_OPTION_FIELDS:
+            valor = (output_options.get(formato) or {}).get(option, padrao)
+            if option == "delimiter" and valor == "\t":
+                valor = "\\t"
+            entry = self.entries_formato[(formato, option)]
+            entry.delete(0, tk.END)
+            entry.insert(0, str(valor))
+
+    def _get_aggregations(self):
+        """Resumos marcados na interface, seguidos dos personalizados da configuração carregada."""
+        aggregations = {
+            nome: PRESET_AGGREGATIONS[nome]
+            for nome, var in self.vars_resumos.items()
+            if var.get()
+        }
+        aggregations.update(self.resumos_personalizados)
+        return aggregations
+
+    def _set_aggregations(self, aggregations):
+        """Marca os resumos de uma configuração salva."""
+        for nome, var in self.vars_resumos.items():
+            var.set(nome in aggregations)
+        self.resumos_personalizados = {
+            nome: spec for nome, spec in aggregations.items()
+            if nome not in PRESET_AGGREGATIONS
+        }
+
+    def _get_filters(self):
+        """Monta a especificação de filtros a partir do painel de filtros."""
+        filters = {}
+        periodo = {
+            "inicio": self.entry_filtro_inicio.get().strip(),
+            "fim": self.entry_filtro_fim.get().strip(),
+        }
+        if any(periodo.values()):
+            filters[DATE_FILTER_COLUMN] = {chave: valor for chave, valor in periodo.items() if valor}
+
+        for coluna, entry in self.entries_filtro.items():
+            valores = [valor.strip() for valor in entry.get().split(",") if valor.strip()]
+            if valores:
+                filters[coluna] = valores
+        return filters
+
+    def _set_filters(self, filters):
+        """Preenche o painel de filtros com uma especificação salva."""
+        periodo = filters.get(DATE_FILTER_COLUMN, {})
+        for entry, chave in ((self.entry_filtro_inicio, "inicio"), (self.entry_filtro_fim, "fim")):
+            entry.delete(0, tk.END)
+            entry.insert(0, periodo.get(chave, ""))
+
+        for coluna, entry in self.entries_filtro.items():
+            entry.delete(0, tk.END)
+            entry.insert(0, ", ".join(str(valor) for valor in filters.get(coluna, [])))
+
     def _delete_config(self):
         """Deleta a configuração selecionada."""
         config_name = self.combo_configs.get()
@@ -486,6 +1155,12 @@ class MergeApp(tk.Tk):
         self.combo_configs["values"] = configs
 
 
+def _load_columns(path):
+    """Lê as colunas de uma planilha (somente o header; o parse completo fica para o merge)."""
+    from utils import load_columns_from_excel
+    return load_columns_from_excel(path, header_row=1)
+
+
 def main():
     """Função principal que inicia o aplicativo."""
     app = MergeApp()
@@ -493,4 +1168,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos em executáveis congelados (Windows)
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,600 @@
+"""Execução do merge em lote pela linha de comando, sem interface gráfica."""
+import argparse
+import multiprocessing
+import os
+import sys
+from typing import Optional
+
+# Adicionar o caminho do módulo utils ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils import ConfigManager, DiskCache, MergeEngine, write_output
+from utils.aggregations import PRESET_AGGREGATIONS
+from utils.incremental_merge import DEFAULT_WATERMARK_COLUMN, MergeStateStore
+from utils.dtypes import format_memory_report
+from utils.excel_engines import AUTO_ENGINE, ENGINE_MODULES, available_engines, benchmark_engines
+from utils.join_backends import BACKENDS
+from utils.join_keys import format_match_stats
+from utils.merge_options import DEFAULT_OUTPUT_FORMAT, OUTPUT_EXTENSIONS, OUTPUT_FORMATS, format_for_path
+from utils.metrics import RunLog, RunMetrics, format_metrics
+from utils.output_modes import DEFAULT_OUTPUT_MODE, OUTPUT_MODES
+from utils.row_filters import DATE_FILTER_COLUMN
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o parser de argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="worksheet-merge",
+        description="Mescla planilhas do ZKBio CVSecurity usando configurações salvas."
+    )
+    parser.add_argument(
+        "--config-dir",
+        help="Diretório das configurações (padrão: ~/.worksheet-merge/)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # run
+    run = subparsers.add_parser(
+        "run",
+        help="Executa o merge de um arquivo de Pessoas com um ou mais arquivos secundários"
+    )
+    run.add_argument("--config", required=True, help="Nome da configuração salva")
+    run.add_argument("--pessoas", required=True, help="Arquivo de Pessoas (.xls ou .xlsx)")
+    run.add_argument(
+        "--secundario",
+        required=True,
+        nargs="+",
+        help="Um ou mais arquivos secundários (Registros ou Níveis de Acesso)"
+    )
+    saida = run.add_mutually_exclusive_group(required=True)
+    saida.add_argument(
+        "--out",
+        nargs="+",
+        help="Arquivo(s) de saída: um para cada arquivo secundário, ou um único "
+             "arquivo com todos os resultados concatenados"
+    )
+    saida.add_argument(
+        "--out-dir",
+        help="Diretório de saída; cada resultado é salvo como <secundario>_mesclado.<extensão do formato>"
+    )
+    run.add_argument(
+        "--format",
+        dest="output_format",
+        choices=list(OUTPUT_FORMATS),
+        help="Formato de saída (padrão: o da extensão de --out ou, se ela não for "
+             "reconhecida, o da configuração ou xlsx)"
+    )
+    run.add_argument("--csv-encoding", help="Codificação do CSV (padrão: a da configuração ou utf-8)")
+    run.add_argument(
+        "--csv-delimiter",
+        help="Separador de campos do CSV; \\t para tabulação (padrão: o da configuração ou ',')"
+    )
+    run.add_argument(
+        "--row-group-size",
+        type=int,
+        help="Linhas por grupo do Parquet (padrão: o da configuração ou 100000)"
+    )
+    run.add_argument(
+        "--sqlite-table",
+        help="Tabela do banco SQLite, substituída a cada execução (padrão: a da configuração ou resultado)"
+    )
+    run.add_argument("--sort-column", help="Sobrescreve a coluna de ordenação da configuração")
+    run.add_argument(
+        "--sort-order",
+        choices=["ASC", "DESC"],
+        help="Sobrescreve a ordem de ordenação da configuração"
+    )
+    run.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default="hash",
+        help="Backend de junção (padrão: hash; os demais processam os arquivos em sequência)"
+    )
+    run.add_argument(
+        "--reader",
+        choices=[AUTO_ENGINE, *ENGINE_MODULES],
+        default=AUTO_ENGINE,
+        help="Leitor de planilhas (padrão: auto, o mais rápido instalado para cada tipo de arquivo)"
+    )
+    run.add_argument(
+        "--mode",
+        dest="output_mode",
+        choices=list(OUTPUT_MODES),
+        help="Modo de saída: sorted (tudo ordenado), top_n (primeiras --limit linhas), "
+             "latest_per_person (últimas --limit linhas de cada ID Pessoal) ou unsorted "
+             "(ordem do arquivo secundário); padrão: o da configuração ou sorted"
+    )
+    run.add_argument(
+        "--limit",
+        type=int,
+        help="N do modo top_n ou linhas por pessoa do modo latest_per_person (padrão: 1)"
+    )
+    run.add_argument(
+        "--from",
+        dest="date_from",
+        help="Somente linhas com Horário a partir desta data (sobrescreve o filtro da configuração)"
+    )
+    run.add_argument(
+        "--to",
+        dest="date_to",
+        help="Somente linhas com Horário até esta data, inclusive (sobrescreve o filtro da configuração)"
+    )
+    run.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Processa somente as linhas novas desde a última execução desta configuração "
+             "(exportações cumulativas; um único arquivo secundário)"
+    )
+    run.add_argument(
+        "--watermark-column",
+        default=DEFAULT_WATERMARK_COLUMN,
+        help="Coluna que identifica as linhas novas no modo incremental (padrão: Horário)"
+    )
+    run.add_argument(
+        "--reset-state",
+        action="store_true",
+        help="Descarta o estado incremental salvo e refaz o merge completo"
+    )
+    run.add_argument(
+        "--summary",
+        nargs="*",
+        metavar="RESUMO",
+        help="Grava resumos como planilhas extras, calculados durante o merge: "
+             f"{', '.join(PRESET_AGGREGATIONS)} ou resumos da configuração "
+             "(sem nomes: os resumos da configuração); o detalhe segue a ordem "
+             "do arquivo secundário (um único arquivo secundário)"
+    )
+    run.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Grava somente os resumos, sem o detalhe (implica --summary)"
+    )
+    run.add_argument(
+        "--explain",
+        action="store_true",
+        help="Mostra o plano de execução da junção (backend sqlite-tuned)"
+    )
+    run.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Mostra a memória economizada pelos tipos compactos em cada planilha carregada"
+    )
+    run.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Mostra o tempo, a CPU, a memória e as linhas de cada fase do merge "
+             "(as execuções ficam registradas em <config-dir>/runs/)"
+    )
+    run.add_argument(
+        "--jobs",
+        type=int,
+        help="Número de processos para os arquivos secundários (padrão: número de CPUs)"
+    )
+
+    # list
+    subparsers.add_parser("list", help="Lista as configurações salvas")
+
+    # readers
+    readers = subparsers.add_parser(
+        "readers",
+        help="Lista os leitores de planilhas instalados ou compara seus tempos de leitura"
+    )
+    readers.add_argument("arquivos", nargs="*", help="Arquivos a ler com cada leitor")
+    readers.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(ENGINE_MODULES),
+        help="Leitores a comparar (padrão: os instalados que leem cada arquivo)"
+    )
+    readers.add_argument("--repeat", type=int, default=1, help="Leituras por leitor; vale a mais rápida")
+
+    # cache
+    cache = subparsers.add_parser("cache", help="Consulta ou limpa o cache de planilhas em disco")
+    cache.add_argument("action", choices=["info", "purge"], help="info: resumo do cache; purge: apaga o cache")
+
+    return parser
+
+
+# Opções de formato da linha de comando: argumento -> (formato, opção do gravador)
+FORMAT_OPTION_ARGS = {
+    "csv_encoding": ("csv", "encoding"),
+    "csv_delimiter": ("csv", "delimiter"),
+    "row_group_size": ("parquet", "row_group_size"),
+    "sqlite_table": ("sqlite", "table"),
+}
+
+
+def resolve_output_format(args, config: dict) -> tuple:
+    """
+    Define o formato de saída e as opções do gravador.
+
+    O formato vem de --format; sem ele, da extensão dos arquivos de --out
+    e, quando ela não é reconhecida (ou com --out-dir), da configuração.
+    As opções da configuração para o formato são sobrescritas pelas da
+    linha de comando.
+
+    Returns:
+        Tupla (formato, opções do gravador)
+
+    Raises:
+        ValueError: Se os arquivos de saída têm formatos diferentes ou uma
+                    opção não corresponde ao formato
+    """
+    output_format = args.output_format
+    if output_format is None and args.out:
+        formatos = {format_for_path(path) for path in args.out}
+        if len(formatos) > 1:
+            raise ValueError("os arquivos de saída têm formatos diferentes; informe --format")
+        output_format = formatos.pop()
+    if output_format is None:
+        output_format = config.get("output_format") or DEFAULT_OUTPUT_FORMAT
+
+    options = dict((config.get("output_options") or {}).get(output_format) or {})
+    for arg, (formato, option) in FORMAT_OPTION_ARGS.items():
+        value = getattr(args, arg)
+        if value is None:
+            continue
+        if formato != output_format:
+            raise ValueError(
+                f"--{arg.replace('_', '-')} vale somente para o formato {formato} "
+                f"(formato de saída: {output_format})"
+            )
+        options[option] = "\t" if arg == "csv_delimiter" and value == "\\t" else value
+    return output_format, options
+
+
+def resolve_outputs(args, output_format: str = DEFAULT_OUTPUT_FORMAT) -> list:
+    """
+    Define o arquivo de saída de cada arquivo secundário.
+
+    Returns:
+        Lista de saídas (uma por arquivo secundário), ou None quando um único
+        arquivo de saída recebe todos os resultados concatenados
+
+    Raises:
+        ValueError: Se o número de saídas não corresponde ao de arquivos secundários
+    """
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+        return [
+            os.path.join(
+                args.out_dir,
+                f"{os.path.splitext(os.path.basename(path))[0]}_mesclado"
+                f"{OUTPUT_EXTENSIONS[output_format][0]}"
+            )
+            for path in args.secundario
+        ]
+
+    if len(args.out) == 1 and len(args.secundario) > 1:
+        return None
+
+    if len(args.out) != len(args.secundario):
+        raise ValueError(
+            f"Informe um arquivo de saída para cada arquivo secundário, ou um único arquivo "
+            f"({len(args.secundario)} secundários, {len(args.out)} saídas)"
+        )
+    return args.out
+
+
+def resolve_filters(args, config: dict) -> dict:
+    """Filtros da configuração, com o período de --from/--to (se informado) sobrescrito."""
+    filters = dict(config.get("filters") or {})
+    if args.date_from or args.date_to:
+        periodo = dict(filters.get(DATE_FILTER_COLUMN) or {})
+        if args.date_from:
+            periodo["inicio"] = args.date_from
+        if args.date_to:
+            periodo["fim"] = args.date_to
+        filters[DATE_FILTER_COLUMN] = periodo
+    return filters
+
+
+def command_run(args, config_manager: ConfigManager) -> int:
+    """Executa o subcomando run. Retorna o código de saída do processo."""
+    config = config_manager.load_config(args.config)
+    if config is None:
+        print(f"Erro: configuração '{args.config}' não encontrada", file=sys.stderr)
+        return 1
+
+    try:
+        output_format, output_options = resolve_output_format(args, config)
+        outputs = resolve_outputs(args, output_format)
+        engine = MergeEngine(
+            backend=args.backend,
+            disk_cache=DiskCache(config_manager.cache_dir),
+            reader=args.reader,
+            run_log=RunLog(config_manager.runs_dir)
+        )
+    except ValueError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+
+    params = dict(
+        selected_columns_pessoas=config.get("pessoas", []),
+        selected_columns_secundario=config.get("secundario", []),
+        sort_column=args.sort_column or config.get("sort_column"),
+        sort_order=args.sort_order or config.get("sort_order") or "DESC",
+        filters=resolve_filters(args, config),
+        output_mode=args.output_mode or config.get("output_mode") or DEFAULT_OUTPUT_MODE,
+        limit=args.limit if args.limit is not None else config.get("limit"),
+    )
+    output = dict(output_format=output_format, output_options=output_options)
+
+    # Resumos calculados em streaming durante o merge
+    if args.summary is not None or args.summary_only:
+        return run_summary_command(args, config, engine, outputs, params, **output)
+
+    # Merge incremental: somente as linhas novas da exportação cumulativa
+    if args.incremental:
+        return run_incremental_command(args, config_manager, engine, outputs, params, **output)
+
+    # Todos os resultados em um único arquivo
+    if outputs is None:
+        out_path = args.out[0]
+        print(f"Mesclando {len(args.secundario)} arquivos -> {out_path}")
+        try:
+            df_result = engine.merge_batch(
+                args.pessoas, args.secundario, max_workers=args.jobs, **params
+            )
+            linhas = write_output(
+                df_result, out_path, output_format, output_options, metrics=engine.last_metrics
+            )
+        except Exception as e:
+            print(f"Erro: {str(e)}", file=sys.stderr)
+            return 1
+        print(f"  {linhas} linhas gravadas")
+        print_memory_report(args, engine)
+        print_metrics(args, engine.last_metrics)
+        return 0
+
+    # Um arquivo por entrada: em paralelo com a junção hash (Pessoas é
+    # indexada uma única vez), ou em sequência com os demais backends
+    if args.backend == "hash":
+        try:
+            resultados = engine.merge_batch(
+                args.pessoas, args.secundario,
+                output_paths=outputs, max_workers=args.jobs, **output, **params
+            )
+        except Exception as e:
+            print(f"Erro: {str(e)}", file=sys.stderr)
+            return 1
+    else:
+        resultados = []
+        for path_secundario, out_path in zip(args.secundario, outputs):
+            resultado = {"secundario": path_secundario, "saida": out_path, "linhas": None, "erro": None}
+            try:
+                df_result = engine.merge(args.pessoas, path_secundario, **params)
+                resultado["chaves"] = engine.last_key_stats
+                resultado["linhas"] = write_output(
+                    df_result, out_path, output_format, output_options, metrics=engine.last_metrics
+                )
+                resultado["plano"] = getattr(engine.backend, "last_query_plan", None)
+            except Exception as e:
+                resultado["erro"] = str(e)
+            resultado["metricas"] = engine.last_metrics
+            resultados.append(resultado)
+
+    falhas = 0
+    for resultado in resultados:
+        print(f"Mesclando {resultado['secundario']} -> {resultado['saida']}")
+        if resultado["erro"]:
+            falhas += 1
+            print(f"  Erro: {resultado['erro']}", file=sys.stderr)
+        else:
+            print(f"  {resultado['linhas']} linhas gravadas")
+            stats = resultado.get("chaves")
+            if stats and (stats["sem_correspondencia"] or stats["sem_chave"]):
+                print(f"  {format_match_stats(stats)}")
+        if args.explain and resultado.get("plano"):
+            for linha in resultado["plano"]:
+                print(f"  plano: {linha}")
+        print_metrics(args, resultado.get("metricas"))
+
+    print_memory_report(args, engine)
+    if args.backend == "hash":
+        print_metrics(args, engine.last_metrics)
+    if falhas:
+        print(f"{falhas} de {len(resultados)} merges falharam", file=sys.stderr)
+        return 1
+    return 0
+
+
+def resolve_aggregations(args, config: dict) -> dict:
+    """
+    Resumos pedidos em --summary (prontos ou definidos na configuração).
+
+    Raises:
+        ValueError: Se algum resumo não existe ou nenhum foi definido
+    """
+    definidos = {**PRESET_AGGREGATIONS, **(config.get("aggregations") or {})}
+    if not args.summary:
+        if not config.get("aggregations"):
+            raise ValueError("a configuração não define resumos; informe-os em --summary")
+        return dict(config["aggregations"])
+
+    desconhecidos = [name for name in args.summary if name not in definidos]
+    if desconhecidos:
+        raise ValueError(
+            f"resumo desconhecido: {', '.join(desconhecidos)} (opções: {', '.join(definidos)})"
+        )
+    return {name: definidos[name] for name in args.summary}
+
+
+def run_summary_command(args, config: dict, engine, outputs, params,
+                        output_format: str, output_options: dict) -> int:
+    """Executa o merge com resumos. Retorna o código de saída do processo."""
+    if len(args.secundario) != 1 or args.incremental:
+        print("Erro: os resumos aceitam um único arquivo secundário, sem o modo incremental",
+              file=sys.stderr)
+        return 1
+    if output_format != "xlsx":
+        # Os resumos são planilhas extras do mesmo arquivo
+        print(f"Erro: os resumos são gravados somente em xlsx (formato de saída: {output_format})",
+              file=sys.stderr)
+        return 1
+
+    out_path = outputs[0]
+    print(f"Mesclando (resumos) {args.secundario[0]} -> {out_path}")
+    try:
+        linhas = engine.merge_report(
+            args.pessoas, args.secundario[0],
+            params["selected_columns_pessoas"], params["selected_columns_secundario"],
+            aggregations=resolve_aggregations(args, config),
+            output_path=out_path,
+            detail_path=None if args.summary_only else out_path,
+            filters=params["filters"]
+        )
+    except Exception as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+
+    for name, total in linhas.items():
+        print(f"  {name}: {total} linhas gravadas")
+    print_memory_report(args, engine)
+    print_metrics(args, engine.last_metrics)
+    return 0
+
+
+def run_incremental_command(args, config_manager: ConfigManager, engine, outputs, params,
+                            output_format: str, output_options: dict) -> int:
+    """Executa o merge incremental da configuração. Retorna o código de saída do processo."""
+    if len(args.secundario) != 1:
+        print("Erro: o modo incremental aceita um único arquivo secundário", file=sys.stderr)
+        return 1
+
+    # O resultado incremental é sempre o histórico completo, ordenado
+    output_mode = params.pop("output_mode")
+    params.pop("limit")
+    if output_mode != DEFAULT_OUTPUT_MODE:
+        print(f"Erro: o modo incremental não aceita o modo de saída '{output_mode}'", file=sys.stderr)
+        return 1
+
+    out_path = outputs[0]
+    print(f"Mesclando (incremental) {args.secundario[0]} -> {out_path}")
+    try:
+        df_result = engine.merge_incremental(
+            args.config, args.pessoas, args.secundario[0],
+            watermark_column=args.watermark_column,
+            state_store=MergeStateStore(config_manager.state_dir),
+            reset=args.reset_state,
+            **params
+        )
+        linhas = write_output(
+            df_result, out_path, output_format, output_options, metrics=engine.last_metrics
+        )
+    except Exception as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+
+    stats = engine.last_incremental_stats
+    if stats["completo"]:
+        print("  Sem estado anterior compatível: merge completo")
+    print(f"  {stats['novas']} linhas novas, {stats['reprocessadas']} reprocessadas")
+    print(f"  {linhas} linhas gravadas")
+    print_memory_report(args, engine)
+    print_metrics(args, engine.last_metrics)
+    return 0
+
+
+def print_memory_report(args, engine: MergeEngine) -> None:
+    """
+    Mostra o relatório de compactação das planilhas carregadas (--memory-report).
+
+    Os arquivos secundários lidos pelos processos do merge em lote não
+    passam pela engine e não aparecem no relatório.
+    """
+    if not args.memory_report:
+        return
+    for path, report in engine.last_memory_report.items():
+        print(f"Memória de {path}:")
+        for linha in format_memory_report(report):
+            print(f"  {linha}")
+
+
+def print_metrics(args, metrics: Optional[RunMetrics]) -> None:
+    """
+    Mostra as fases do merge e o arquivo em que a execução foi registrada (--metrics).
+
+    No merge em lote, a leitura e a junção de cada arquivo secundário
+    acontecem em outros processos e aparecem somente na fase "lote".
+    """
+    if not args.metrics or metrics is None:
+        return
+    for linha in format_metrics(metrics.to_dict()):
+        print(f"  {linha}")
+    if metrics.log_path:
+        print(f"  Registro: {metrics.log_path}")
+
+
+def command_list(args, config_manager: ConfigManager) -> int:
+    """Executa o subcomando list."""
+    for name in config_manager.list_configs():
+        print(name)
+    return 0
+
+
+def command_readers(args, config_manager: ConfigManager) -> int:
+    """Executa o subcomando readers."""
+    if not args.arquivos:
+        for name, module in ENGINE_MODULES.items():
+            situacao = "instalado" if name in available_engines() else f"ausente (pip install {module})"
+            print(f"{name}: {situacao}")
+        return 0
+
+    falhas = 0
+    for path in args.arquivos:
+        print(f"{path}:")
+        try:
+            resultados = benchmark_engines(path, engines=args.engines, repeat=args.repeat)
+        except Exception as e:
+            falhas += 1
+            print(f"  Erro: {str(e)}", file=sys.stderr)
+            continue
+        for resultado in resultados:
+            if resultado["erro"]:
+                print(f"  {resultado['leitor']}: erro: {resultado['erro']}")
+                continue
+            diferente = "" if resultado["mesmo_resultado"] else " (resultado diferente do primeiro leitor)"
+            print(
+                f"  {resultado['leitor']}: {resultado['segundos']:.3f} s, "
+                f"{resultado['linhas']} linhas x {resultado['colunas']} colunas{diferente}"
+            )
+    return 1 if falhas else 0
+
+
+def command_cache(args, config_manager: ConfigManager) -> int:
+    """Executa o subcomando cache."""
+    disk_cache = DiskCache(config_manager.cache_dir)
+
+    if args.action == "purge":
+        removidos = disk_cache.purge()
+        print(f"{removidos} entradas removidas de {disk_cache.cache_dir}")
+        return 0
+
+    info = disk_cache.info()
+    print(f"Diretório: {info['diretorio']}")
+    print(f"Entradas: {info['entradas']}")
+    print(f"Tamanho: {info['bytes'] / (1024 * 1024):.1f} MiB de {info['limite'] / (1024 * 1024):.0f} MiB")
+    if not info["ativo"]:
+        print("Cache desativado (instale o pacote pyarrow para ativá-lo)")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Função principal da linha de comando."""
+    args = build_parser().parse_args(argv)
+    config_manager = ConfigManager(args.config_dir)
+
+    if args.command == "run":
+        return command_run(args, config_manager)
+    if args.command == "cache":
+        return command_cache(args, config_manager)
+    if args.command == "readers":
+        return command_readers(args, config_manager)
+    return command_list(args, config_manager)
+
+
+if __name__ == "__main__":
+    # Necessário para o pool de processos em executáveis congelados (Windows)
+    multiprocessing.freeze_support()
+    sys.exit(main())
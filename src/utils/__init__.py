@@ -1,20 +1,123 @@
 """Módulo de utilitários para worksheet-merge."""
-from .validators import validar_entrada, validar_colunas, validar_colunas_selecionadas
-from .ui_helpers import set_path, gerar_texto_dicas_dinamico, CategoryFrame, ScrollableFrame
-from .merge_engine import MergeEngine
-from .column_loader import load_columns_from_excel, categorize_columns
-from .config_manager import ConfigManager
+import importlib
 
 __all__ = [
+    'StreamingAggregator',
+    'BackgroundTask',
+    'TaskControl',
+    'MergeCancelled',
     'validar_entrada',
     'validar_colunas',
     'validar_colunas_selecionadas',
     'set_path',
     'gerar_texto_dicas_dinamico',
     'CategoryFrame',
+    'ColumnChecklist',
     'ScrollableFrame',
     'MergeEngine',
     'load_columns_from_excel',
+    'read_header',
     'categorize_columns',
+    'set_custom_categories',
     'ConfigManager',
+    'DiskCache',
+    'get_default_disk_cache',
+    'compact_dtypes',
+    'available_engines',
+    'benchmark_engines',
+    'iter_excel_chunks',
+    'MergeStateStore',
+    'JoinKeyIndex',
+    'normalize_keys',
+    'JoinBackend',
+    'HashJoinBackend',
+    'HashJoinTable',
+    'SQLiteJoinBackend',
+    'TunedSQLiteJoinBackend',
+    'get_backend',
+    'RunLog',
+    'RunMetrics',
+    'get_default_run_log',
+    'ExcelStreamWriter',
+    'CsvStreamWriter',
+    'ParquetStreamWriter',
+    'SQLiteTableWriter',
+    'get_writer',
+    'write_excel',
+    'write_output',
+    'apply_filters',
+    'normalize_filters',
+    'WorkbookCache',
+    'get_default_cache',
+    'load_workbook',
+    'MergePreview',
+    'start_warmup',
 ]
+
+# Módulo de cada nome exportado. Os nomes são importados somente quando
+# usados: "import utils" não carrega o pandas (a interface abre sem esperar
+# por ele, ver warmup) nem o tkinter (a engine e a linha de comando
+# funcionam em servidores sem interface gráfica)
+_EXPORTS = {
+    'StreamingAggregator': '.aggregations',
+    'BackgroundTask': '.background',
+    'TaskControl': '.background',
+    'MergeCancelled': '.background',
+    'validar_entrada': '.validators',
+    'validar_colunas': '.validators',
+    'validar_colunas_selecionadas': '.validators',
+    'set_path': '.ui_helpers',
+    'gerar_texto_dicas_dinamico': '.ui_helpers',
+    'CategoryFrame': '.ui_helpers',
+    'ColumnChecklist': '.ui_helpers',
+    'ScrollableFrame': '.ui_helpers',
+    'MergeEngine': '.merge_engine',
+    'load_columns_from_excel': '.column_loader',
+    'read_header': '.column_loader',
+    'categorize_columns': '.column_categories',
+    'set_custom_categories': '.column_categories',
+    'ConfigManager': '.config_manager',
+    'DiskCache': '.disk_cache',
+    'get_default_disk_cache': '.disk_cache',
+    'compact_dtypes': '.dtypes',
+    'available_engines': '.excel_engines',
+    'benchmark_engines': '.excel_engines',
+    'iter_excel_chunks': '.excel_reader',
+    'MergeStateStore': '.incremental_merge',
+    'JoinKeyIndex': '.join_keys',
+    'normalize_keys': '.join_keys',
+    'JoinBackend': '.join_backends',
+    'HashJoinBackend': '.join_backends',
+    'HashJoinTable': '.join_backends',
+    'SQLiteJoinBackend': '.join_backends',
+    'TunedSQLiteJoinBackend': '.join_backends',
+    'get_backend': '.join_backends',
+    'RunLog': '.metrics',
+    'RunMetrics': '.metrics',
+    'get_default_run_log': '.metrics',
+    'ExcelStreamWriter': '.output_writers',
+    'CsvStreamWriter': '.output_writers',
+    'ParquetStreamWriter': '.output_writers',
+    'SQLiteTableWriter': '.output_writers',
+    'get_writer': '.output_writers',
+    'write_excel': '.output_writers',
+    'write_output': '.output_writers',
+    'apply_filters': '.row_filters',
+    'normalize_filters': '.row_filters',
+    'WorkbookCache': '.workbook_cache',
+    'get_default_cache': '.workbook_cache',
+    'load_workbook': '.workbook_cache',
+    'MergePreview': '.preview',
+    'start_warmup': '.warmup',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,171 @@
+"""Resumos (contagens por pessoa, área e dia; primeira entrada e última saída) calculados em streaming."""
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .dtypes import coerce_dates
+from .join_backends import JOIN_KEY
+from .join_keys import normalize_keys
+from .merge_options import DAY_COLUMN, PRESET_AGGREGATIONS, TIME_COLUMN
+
+
+# Funções de agregação aceitas e como os resultados parciais são combinados
+AGGREGATION_FUNCTIONS = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+
+# Resultados parciais acumulados antes de serem combinados
+MAX_PARTIALS = 32
+
+
+def normalize_aggregations(aggregations: Optional[Dict]) -> Dict:
+    """
+    Valida as definições de resumos.
+
+    Cada resumo tem um nome (usado como nome da planilha) e a definição
+    {"por": [colunas de agrupamento], "medidas": {nome: função}}, em que a
+    função é "count" (número de linhas) ou "sum:coluna", "min:coluna",
+    "max:coluna". A coluna "Dia" é derivada de "Horário".
+
+    Exemplo:
+        {"Entrada e saída": {"por": ["ID Pessoal", "Dia"],
+                             "medidas": {"Entrada": "min:Horário", "Saída": "max:Horário"}}}
+
+    Args:
+        aggregations: Definições (None = nenhum resumo)
+
+    Returns:
+        Definições validadas, com as medidas como {nome: (função, coluna)}
+
+    Raises:
+        ValueError: Se alguma definição é inválida
+    """
+    normalized = {}
+    for name, spec in (aggregations or {}).items():
+        if not isinstance(spec, dict) or not spec.get("por") or not spec.get("medidas"):
+            raise ValueError(f"Resumo '{name}' inválido: informe 'por' e 'medidas'")
+
+        medidas = {}
+        for medida, definicao in spec["medidas"].items():
+            function, _, column = str(definicao).partition(":")
+            if function not in AGGREGATION_FUNCTIONS:
+                raise ValueError(
+                    f"Função desconhecida no resumo '{name}': {function} "
+                    f"(opções: {', '.join(AGGREGATION_FUNCTIONS)})"
+                )
+            if function != "count" and not column:
+                raise ValueError(f"Informe a coluna da medida '{medida}' do resumo '{name}' ({function}:coluna)")
+            medidas[medida] = (function, column or None)
+
+        normalized[name] = {"por": list(spec["por"]), "medidas": medidas}
+    return normalized
+
+
+def aggregation_columns(aggregations: Dict) -> List[str]:
+    """Colunas do resultado do merge usadas pelos resumos (já validados)."""
+    columns = []
+    for spec in aggregations.values():
+        for col in spec["por"]:
+            columns.append(TIME_COLUMN if col == DAY_COLUMN else col)
+        for _, col in spec["medidas"].values():
+            if col:
+                columns.append(TIME_COLUMN if col == DAY_COLUMN else col)
+    return list(dict.fromkeys(columns))
+
+
+class StreamingAggregator:
+    """
+    Calcula os resumos bloco a bloco, sem guardar as linhas do merge.
+
+    Cada bloco é resumido com groupby vetorizado; os resumos parciais são
+    combinados (contagens e somas somadas, mínimos e máximos recombinados)
+    a cada MAX_PARTIALS blocos e no final. A memória usada é proporcional
+    ao número de grupos, não ao número de linhas.
+    """
+
+    def __init__(self, aggregations: Dict):
+        """
+        Inicializa os resumos.
+
+        Args:
+            aggregations: Definições já validadas (ver normalize_aggregations)
+        """
+        self.aggregations = aggregations
+        self.rows = 0
+        self._partials: Dict[str, List[pd.DataFrame]] = {name: [] for name in aggregations}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Acrescenta um bloco de linhas do merge aos resumos.
+
+        Args:
+            chunk: Bloco do resultado do merge
+
+        Raises:
+            ValueError: Se falta alguma coluna usada pelos resumos
+        """
+        missing = [col for col in aggregation_columns(self.aggregations) if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Colunas dos resumos não encontradas: {', '.join(missing)}")
+        if chunk.empty:
+            return
+
+        self.rows += len(chunk)
+        frame = self._prepare(chunk)
+        for name, spec in self.aggregations.items():
+            grouped = frame.groupby(spec["por"], dropna=False, sort=False, observed=True)
+            partial = {}
+            for medida, (function, column) in spec["medidas"].items():
+                if function == "count":
+                    partial[medida] = grouped.size()
+                else:
+                    partial[medida] = getattr(grouped[column], function)()
+            partials = self._partials[name]
+            partials.append(pd.DataFrame(partial))
+            if len(partials) >= MAX_PARTIALS:
+                self._partials[name] = [self._combine(spec, partials)]
+
+    def results(self) -> Dict[str, pd.DataFrame]:
+        """
+        Combina os resumos parciais.
+
+        Returns:
+            Dicionário {nome do resumo: DataFrame}, com as colunas de
+            agrupamento seguidas das medidas, ordenado pelas colunas de agrupamento
+        """
+        results = {}
+        for name, spec in self.aggregations.items():
+            columns = [*spec["por"], *spec["medidas"]]
+            partials = self._partials[name]
+            if not partials:
+                results[name] = pd.DataFrame(columns=columns)
+                continue
+            df = self._combine(spec, partials).reset_index()
+            try:
+                df = df.sort_values(spec["por"], kind="mergesort", na_position="last")
+            except TypeError:
+                pass  # Chaves com tipos misturados: manter a ordem de chegada
+            if DAY_COLUMN in spec["por"]:
+                df[DAY_COLUMN] = df[DAY_COLUMN].dt.date
+            results[name] = df[columns].reset_index(drop=True)
+        return results
+
+    def _prepare(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Colunas usadas pelos resumos, com "ID Pessoal" normalizado, datas e "Dia"."""
+        frame = chunk[aggregation_columns(self.aggregations)].copy()
+        if JOIN_KEY in frame.columns:
+            frame[JOIN_KEY] = normalize_keys(frame[JOIN_KEY])
+        if TIME_COLUMN in frame.columns:
+            frame[TIME_COLUMN] = coerce_dates(frame[TIME_COLUMN])
+            frame[DAY_COLUMN] = frame[TIME_COLUMN].dt.normalize()
+        return frame
+
+    @staticmethod
+    def _combine(spec: Dict, partials: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combina resumos parciais de um mesmo resumo."""
+        if len(partials) == 1:
+            return partials[0]
+        combined = pd.concat(partials)
+        grouped = combined.groupby(level=list(range(len(spec["por"]))), dropna=False, sort=False)
+        return grouped.agg({
+            medida: AGGREGATION_FUNCTIONS[function]
+            for medida, (function, _) in spec["medidas"].items()
+        })
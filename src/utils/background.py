@@ -0,0 +1,134 @@
+"""Execução de tarefas longas (carga, merge, gravação) fora da thread da interface."""
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class MergeCancelled(Exception):
+    """Sinaliza que a tarefa foi cancelada pelo usuário."""
+
+
+class TaskControl:
+    """
+    Canal entre a tarefa em execução e quem a acompanha.
+
+    A tarefa informa o progresso com report() e consulta check_cancelled()
+    entre as etapas; quem acompanha chama cancel() para interromper.
+    """
+
+    def __init__(self):
+        """Inicializa o canal."""
+        self._cancel_event = threading.Event()
+        self._events = queue.Queue()
+
+    def report(self, phase: str, current: Optional[int] = None, total: Optional[int] = None) -> None:
+        """
+        Informa o progresso da tarefa.
+
+        Args:
+            phase: Etapa em execução ("load", "join", "write", ...)
+            current: Quantidade já processada na etapa (opcional)
+            total: Quantidade total da etapa (None = progresso indeterminado)
+        """
+        self._events.put(("progress", (phase, current, total)))
+
+    def cancel(self) -> None:
+        """Solicita o cancelamento da tarefa."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se o cancelamento foi solicitado."""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        """
+        Interrompe a tarefa se o cancelamento foi solicitado.
+
+        Raises:
+            MergeCancelled: Se cancel() foi chamado
+        """
+        if self._cancel_event.is_set():
+            raise MergeCancelled("Operação cancelada pelo usuário")
+
+    def _put(self, kind: str, payload: Any = None) -> None:
+        self._events.put((kind, payload))
+
+    def drain(self) -> List[Tuple[str, Any]]:
+        """
+        Retorna os eventos pendentes, sem bloquear.
+
+        Returns:
+            Lista de tuplas (tipo, dados), com tipo "progress", "done",
+            "error" ou "cancelled"
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+
+def report_progress(
+    control: Optional[TaskControl],
+    phase: str,
+    current: Optional[int] = None,
+    total: Optional[int] = None
+) -> None:
+    """Informa progresso e verifica cancelamento, se houver um TaskControl."""
+    if control is not None:
+        control.check_cancelled()
+        control.report(phase, current, total)
+
+
+class BackgroundTask:
+    """
+    Executa uma função em uma thread separada.
+
+    A função recebe o TaskControl da tarefa. O resultado, o erro ou o
+    cancelamento são entregues como eventos em control.drain(), que a
+    interface consulta periodicamente (por exemplo, com Tk.after()).
+    """
+
+    def __init__(self, target: Callable[[TaskControl], Any]):
+        """
+        Prepara a tarefa.
+
+        Args:
+            target: Função a executar; recebe o TaskControl e retorna o resultado
+        """
+        self.target = target
+        self.control = TaskControl()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BackgroundTask":
+        """Inicia a execução e retorna a própria tarefa."""
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Solicita o cancelamento da tarefa."""
+        self.control.cancel()
+
+    @property
+    def running(self) -> bool:
+        """Indica se a thread ainda está em execução."""
+        return self._thread.is_alive()
+
+    def poll(self) -> List[Tuple[str, Any]]:
+        """Retorna os eventos pendentes da tarefa (ver TaskControl.drain)."""
+        return self.control.drain()
+
+    def _run(self) -> None:
+        try:
+            result = self.target(self.control)
+        except MergeCancelled:
+            self.control._put("cancelled")
+        except Exception as e:
+            if self.control.cancelled:
+                self.control._put("cancelled")
+            else:
+                self.control._put("error", e)
+        else:
+            self.control._put("done", result)
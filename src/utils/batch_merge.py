@@ -0,0 +1,266 @@
+"""Merge de vários arquivos secundários contra a mesma planilha de Pessoas, em paralelo."""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .background import MergeCancelled, TaskControl, report_progress
+from .column_categories import date_columns
+from .dtypes import compact_dtypes
+from .excel_engines import AUTO_ENGINE, read_excel
+from .join_backends import JOIN_KEY, HashJoinTable
+from .output_modes import DEFAULT_OUTPUT_MODE, select_rows
+from .output_writers import write_output
+from .row_filters import apply_filters
+
+
+# Coluna auxiliar com a chave de ordenação, quando a coluna de ordenação
+# não faz parte do resultado (removida após a ordenação global)
+SORT_KEY_COLUMN = "__ordenacao__"
+
+# Estado de cada processo de trabalho, preenchido uma única vez por _init_worker
+_worker_state: Dict = {}
+
+
+def _init_worker(
+    table: HashJoinTable,
+    colunas_secundario: List[str],
+    usecols_secundario: List[str],
+    sort_column: Optional[str],
+    sort_order: str,
+    keep_sort_key: bool,
+    sort_source: Optional[str] = None,
+    drop_sort_column: bool = False,
+    filters: Optional[Dict] = None,
+    compact: bool = False,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    limit: Optional[int] = None,
+    reader: str = AUTO_ENGINE,
+    output_format: Optional[str] = None,
+    output_options: Optional[Dict] = None
+) -> None:
+    """Recebe a tabela de Pessoas já indexada e os parâmetros do merge."""
+    _worker_state.update(
+        table=table,
+        colunas_secundario=colunas_secundario,
+        usecols_secundario=usecols_secundario,
+        sort_column=sort_column,
+        sort_order=sort_order,
+        keep_sort_key=keep_sort_key,
+        sort_source=sort_source,
+        drop_sort_column=drop_sort_column,
+        filters=filters,
+        compact=compact,
+        output_mode=output_mode,
+        limit=limit,
+        reader=reader,
+        output_format=output_format,
+        output_options=output_options,
+    )
+
+
+def _merge_one(path_secundario: str, output_path: Optional[str] = None):
+    """
+    Carrega um arquivo secundário e faz a junção com a tabela de Pessoas do processo.
+
+    Returns:
+        Tupla (número de linhas gravadas, se output_path foi informado, ou o
+        DataFrame resultante; estatísticas das chaves sem correspondência)
+    """
+    state = _worker_state
+    if not os.path.exists(path_secundario):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path_secundario}")
+
+    try:
+        df_secundario = read_excel(
+            path_secundario, header_row=1,
+            usecols=state["usecols_secundario"], engine=state["reader"]
+        )
+    except Exception as e:
+        raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
+
+    missing = [col for col in state["usecols_secundario"] if col not in df_secundario.columns]
+    if missing:
+        raise ValueError(
+            f"Colunas não encontradas em Registros/Níveis: {', '.join(missing)}"
+        )
+
+    if state["compact"]:
+        df_secundario, _ = compact_dtypes(df_secundario, date_columns(list(df_secundario.columns)))
+    df_secundario = apply_filters(df_secundario, state["filters"])
+
+    sort_column = state["sort_column"]
+    ordenar_pessoas = state["sort_source"] == "Pessoas"
+    if not ordenar_pessoas:
+        df_secundario = select_rows(
+            df_secundario, state["output_mode"], sort_column, state["sort_order"], state["limit"]
+        )
+
+    colunas_secundario = list(state["colunas_secundario"])
+    if state["keep_sort_key"]:
+        df_secundario = df_secundario.assign(**{SORT_KEY_COLUMN: df_secundario[sort_column]})
+        colunas_secundario.append(SORT_KEY_COLUMN)
+
+    keys = state["table"].index.keys
+    codes = keys.encode(df_secundario[JOIN_KEY])
+    stats = keys.match_stats(df_secundario[JOIN_KEY], codes)
+    df_result = state["table"].probe(df_secundario, colunas_secundario, codes)
+    if ordenar_pessoas:
+        # A coluna de ordenação vem de Pessoas: ordenar/selecionar depois da junção
+        df_result = select_rows(
+            df_result, state["output_mode"], sort_column, state["sort_order"], state["limit"]
+        )
+        if state["drop_sort_column"] and output_path is not None:
+            df_result = df_result.drop(columns=[sort_column])
+    elif state["output_mode"] == "top_n":
+        # Chaves duplicadas em Pessoas podem replicar as linhas selecionadas
+        df_result = df_result.iloc[:state["limit"]]
+
+    if output_path is None:
+        return df_result, stats
+    return write_output(
+        df_result, output_path, state["output_format"], state["output_options"]
+    ), stats
+
+
+def run_batch(
+    table: HashJoinTable,
+    paths_secundario: List[str],
+    colunas_secundario: List[str],
+    usecols_secundario: List[str],
+    sort_column: Optional[str] = None,
+    sort_order: str = "DESC",
+    output_paths: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    control: Optional[TaskControl] = None,
+    filters: Optional[Dict] = None,
+    compact: bool = False,
+    sort_source: Optional[str] = "Secundario",
+    drop_sort_column: bool = False,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    limit: Optional[int] = None,
+    reader: str = AUTO_ENGINE,
+    output_format: Optional[str] = None,
+    output_options: Optional[Dict] = None
+):
+    """
+    Distribui os arquivos secundários entre processos de trabalho.
+
+    A tabela de Pessoas é enviada uma única vez para cada processo. Sem
+    output_paths, os resultados são concatenados na ordem dos arquivos e,
+    havendo coluna de ordenação, ordenados (ou selecionados, conforme o modo
+    de saída) globalmente. Nos modos de seleção, cada processo já seleciona
+    as linhas do seu arquivo: antes da junção, com a coluna de ordenação em
+    Registros/Níveis, ou depois dela, com a coluna em Pessoas.
+
+    Args:
+        table: Tabela de Pessoas já indexada
+        paths_secundario: Arquivos secundários
+        colunas_secundario: Colunas secundárias que entram no resultado
+        usecols_secundario: Colunas a carregar de cada arquivo secundário
+        sort_column: Coluna para ordenação (opcional)
+        sort_order: ASC ou DESC
+        output_paths: Um arquivo de saída por arquivo secundário (opcional)
+        max_workers: Número de processos (padrão: número de CPUs, limitado ao de arquivos)
+        control: Canal de progresso/cancelamento (opcional)
+        filters: Filtros de linhas, aplicados a cada arquivo antes da junção (opcional)
+        compact: Converte cada arquivo para tipos compactos (ver dtypes.compact_dtypes)
+        sort_source: Tabela da coluna de ordenação ("Secundario" ou "Pessoas";
+                     com "Pessoas", a coluna deve estar nas colunas da table)
+        drop_sort_column: Remove a coluna de ordenação do resultado depois de
+                          ordenar (coluna de Pessoas usada só para ordenar)
+        output_mode: Modo de saída (ver output_modes.OUTPUT_MODES)
+        limit: Limite já validado do modo de saída
+        reader: Leitor de planilhas (ver excel_engines)
+        output_format: Formato dos arquivos de saída (padrão: deduzido da extensão)
+        output_options: Opções do formato de saída (ver output_writers.get_writer)
+
+    Returns:
+        DataFrame concatenado, ou (com output_paths) lista de dicionários
+        {"secundario", "saida", "linhas", "chaves", "erro"} na ordem dos
+        arquivos, com as estatísticas das chaves sem correspondência em "chaves"
+
+    Raises:
+        ValueError: Se algum arquivo falhar no modo concatenado
+        MergeCancelled: Se o cancelamento foi solicitado via control
+    """
+    keep_sort_key = bool(
+        output_paths is None and sort_column and sort_source != "Pessoas"
+        and sort_column not in colunas_secundario
+    )
+    init_args = (
+        table, colunas_secundario, usecols_secundario,
+        sort_column, sort_order, keep_sort_key, sort_source, drop_sort_column,
+        filters, compact, output_mode, limit, reader, output_format, output_options
+    )
+    jobs: List[Tuple[str, Optional[str]]] = [
+        (path, output_paths[i] if output_paths is not None else None)
+        for i, path in enumerate(paths_secundario)
+    ]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    results: List = [None] * len(jobs)
+    errors: List[Optional[Exception]] = [None] * len(jobs)
+    report_progress(control, "join", 0, len(jobs))
+
+    if max_workers == 1:
+        # Um único processo: executar aqui mesmo, sem custo de serialização
+        _init_worker(*init_args)
+        for i, job in enumerate(jobs):
+            try:
+                results[i] = _merge_one(*job)
+            except Exception as e:
+                errors[i] = e
+            report_progress(control, "join", i + 1, len(jobs))
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=init_args
+        )
+        try:
+            futures = {executor.submit(_merge_one, *job): i for i, job in enumerate(jobs)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    errors[i] = e
+                report_progress(control, "join", done, len(jobs))
+        except MergeCancelled:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        else:
+            executor.shutdown()
+
+    if output_paths is not None:
+        return [
+            {
+                "secundario": path,
+                "saida": output,
+                "linhas": results[i][0] if errors[i] is None else None,
+                "chaves": results[i][1] if errors[i] is None else None,
+                "erro": str(errors[i]) if errors[i] is not None else None,
+            }
+            for i, (path, output) in enumerate(jobs)
+        ]
+
+    for i, error in enumerate(errors):
+        if error is not None:
+            raise ValueError(f"{paths_secundario[i]}: {str(error)}")
+
+    df_result = pd.concat([result for result, _ in results], ignore_index=True)
+    if sort_column:
+        sort_key = SORT_KEY_COLUMN if keep_sort_key else sort_column
+        df_result = select_rows(
+            df_result, output_mode, sort_key, sort_order, limit
+        ).reset_index(drop=True)
+        if keep_sort_key:
+            df_result = df_result.drop(columns=[SORT_KEY_COLUMN])
+        elif drop_sort_column:
+            df_result = df_result.drop(columns=[sort_column])
+    return df_result
@@ -0,0 +1,254 @@
+"""Categorização das colunas por palavras-chave (sem pandas, para que a interface abra rápido)."""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+# Palavras-chave de cada categoria de colunas de Pessoas (em ordem de prioridade)
+PESSOA_CATEGORIAS = {
+    "Informações Básicas": [
+        "Nome", "Sobrenome", "ID Pessoal", "Email", "Gênero",
+        "Numero de Departamento", "Nome do Departamento",
+        "Número de Departamento"
+    ],
+    "Documentação": [
+        "Tipo de Documento", "Número do Documento", "Número do Cartão",
+        "CPF", "RG", "CNH"
+    ],
+    "Trabalho": [
+        "Nome do Cargo", "Número do Cargo", "Data de Contratação",
+        "Título do Trabalho", "Título do Tr"
+    ],
+    "Datas": [
+        "Data de Nascimento", "Data de Contratação", "Data de",
+        "Nascimento"
+    ],
+    "Contato": [
+        "Celular", "Telefone", "Email", "Telefone Comercial",
+        "Telefone Residencial", "Telefone Re"
+    ],
+    "Endereço": [
+        "Rua", "Endereço", "Endereço Comercial", "Endereço Residencial",
+        "País", "Naturalidade"
+    ],
+    "Observações": [
+        "Observação", "ASO", "Observação 1"
+    ]
+}
+
+# Palavras-chave de cada categoria de colunas de Registros (em ordem de prioridade)
+REGISTROS_CATEGORIAS = {
+    "Informações de Acesso": [
+        "Horário", "Nome da Área", "Nome do Dispositivo", "Descrição do Evento",
+        "Ponto do Evento", "Ponto do Ev"
+    ],
+    "Dados de Evento": [
+        "Nível do Evento", "Nível do Eve", "Arquivo de Mídia", "Arquivo de M",
+        "ID do Evento"
+    ],
+    "Dados de Pessoa": [
+        "ID Pessoal", "Nome", "Sobrenome", "Nome do Departamento",
+        "Nome do Leitor", "Nome do Leit", "Número do Cartão"
+    ],
+    "Segurança": [
+        "Modo de Verificação", "Criptografia", "Modo de Ver"
+    ]
+}
+
+# Categoria das colunas que não casam com nenhuma palavra-chave
+CUSTOM_CATEGORY = "Personalizadas"
+
+# Tipos de planilha aceitos por categorize_columns e suas categorias
+DATA_TYPES = {
+    "pessoa": "pessoa",
+    "registros": "registros",
+    "registro": "registros",
+    "registros_acesso": "registros",
+}
+BUILTIN_CATEGORIES = {
+    "pessoa": PESSOA_CATEGORIAS,
+    "registros": REGISTROS_CATEGORIAS,
+}
+
+# Colunas de data/hora dos registros de acesso
+REGISTROS_DATE_COLUMNS = ["Horário"]
+
+
+def date_columns(columns: List[str]) -> List[str]:
+    """
+    Identifica as colunas de data de uma planilha.
+
+    São as colunas que casam com as palavras-chave da categoria "Datas" de
+    Pessoas (mesmo quando outra categoria tem prioridade, como "Data de
+    Contratação") e o "Horário" dos registros de acesso. Somente as
+    palavras-chave embutidas são usadas: os processos do merge em lote não
+    recebem as categorias do usuário, e todos devem converter as mesmas colunas.
+
+    Args:
+        columns: Lista de nomes de colunas
+
+    Returns:
+        Colunas de data, na ordem original
+    """
+    return [
+        col for col in columns
+        if col in REGISTROS_DATE_COLUMNS or _DATE_MATCHER.match(col) is not None
+    ]
+
+
+class KeywordMatcher:
+    """
+    Associa nomes de colunas a categorias de palavras-chave, respeitando a prioridade.
+
+    As palavras-chave de todas as categorias são compiladas uma única vez em
+    uma expressão regular, com um grupo nomeado por categoria: cada
+    alternativa verifica (por lookahead) se alguma palavra-chave da
+    categoria aparece no nome, e as alternativas são tentadas na ordem das
+    categorias. O resultado equivale a procurar cada palavra-chave no nome
+    em minúsculas, categoria por categoria, parando na primeira que casa.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        """
+        Compila as palavras-chave.
+
+        Args:
+            categories: Palavras-chave por categoria, em ordem de prioridade
+        """
+        self.categories = list(categories)
+        self._groups = {}
+        alternativas = []
+        for i, (categoria, keywords) in enumerate(categories.items()):
+            keywords = [keyword.lower() for keyword in keywords if keyword]
+            if not keywords:
+                continue
+            # As mais longas primeiro, para que a alternativa pare no primeiro acerto
+            keywords.sort(key=len, reverse=True)
+            nome = f"c{i}"
+            self._groups[nome] = categoria
+            alternativas.append(
+                f"(?=.*?(?:{'|'.join(re.escape(keyword) for keyword in keywords)}))(?P<{nome}>)"
+            )
+        self._pattern = re.compile("|".join(alternativas), re.DOTALL) if alternativas else None
+
+    def match(self, column) -> Optional[str]:
+        """
+        Retorna a categoria de maior prioridade cujas palavras-chave aparecem no nome.
+
+        Args:
+            column: Nome da coluna
+
+        Returns:
+            Nome da categoria, ou None se nenhuma palavra-chave aparece no nome
+        """
+        if self._pattern is None:
+            return None
+        found = self._pattern.match(str(column).lower())
+        return self._groups[found.lastgroup] if found else None
+
+
+_DATE_MATCHER = KeywordMatcher({"Datas": PESSOA_CATEGORIAS["Datas"]})
+
+# Categorias em uso por tipo de planilha (embutidas mais as do usuário) e seus matchers
+_categories: Dict[str, Dict[str, List[str]]] = {
+    data_type: {categoria: list(keywords) for categoria, keywords in categories.items()}
+    for data_type, categories in BUILTIN_CATEGORIES.items()
+}
+_matchers: Dict[str, KeywordMatcher] = {
+    data_type: KeywordMatcher(categories) for data_type, categories in _categories.items()
+}
+
+
+def set_custom_categories(custom: Optional[Dict[str, Dict[str, List[str]]]]) -> None:
+    """
+    Acrescenta às categorias embutidas as categorias e palavras-chave do usuário.
+
+    Palavras-chave de uma categoria existente são acrescentadas a ela (a
+    prioridade entre categorias não muda); categorias novas entram depois
+    das embutidas, antes de "Personalizadas". Chamar novamente substitui as
+    definições anteriores; None restaura somente as categorias embutidas.
+
+    Exemplo (ver ConfigManager.load_categories):
+        {"pessoa": {"Saúde": ["ASO", "Exame"], "Contato": ["WhatsApp"]},
+         "registros": {"Temperatura": ["Temperatura", "Máscara"]}}
+
+    Args:
+        custom: Palavras-chave por categoria, por tipo de planilha ("pessoa" ou "registros")
+
+    Raises:
+        ValueError: Se a definição é inválida
+    """
+    categories = {
+        data_type: {categoria: list(keywords) for categoria, keywords in builtin.items()}
+        for data_type, builtin in BUILTIN_CATEGORIES.items()
+    }
+
+    for data_type, definidas in (custom or {}).items():
+        tipo = DATA_TYPES.get(str(data_type).lower())
+        if tipo is None:
+            raise ValueError(
+                f"Tipo de planilha desconhecido nas categorias: {data_type} (opções: pessoa, registros)"
+            )
+        if not isinstance(definidas, dict):
+            raise ValueError(f"Categorias de '{data_type}' devem ser um dicionário {{categoria: [palavras]}}")
+        for categoria, keywords in definidas.items():
+            if categoria == CUSTOM_CATEGORY:
+                raise ValueError(f"A categoria '{CUSTOM_CATEGORY}' é reservada")
+            if not isinstance(keywords, list) or not all(isinstance(k, str) and k.strip() for k in keywords):
+                raise ValueError(f"Palavras-chave de '{categoria}' devem ser uma lista de textos")
+            existentes = categories[tipo].setdefault(categoria, [])
+            existentes.extend(k for k in keywords if k not in existentes)
+
+    _categories.clear()
+    _categories.update(categories)
+    _matchers.clear()
+    _matchers.update({data_type: KeywordMatcher(cats) for data_type, cats in categories.items()})
+    _categorize.cache_clear()
+
+
+def categorize_columns(columns: List[str], data_type: str) -> Dict[str, List[str]]:
+    """
+    Categoriza colunas automaticamente por tipo.
+
+    Cada coluna fica na primeira categoria (em ordem de prioridade) com uma
+    palavra-chave contida no nome, sem diferenciar maiúsculas; as demais
+    ficam em "Personalizadas". O resultado é memorizado para cada lista de
+    colunas.
+
+    Args:
+        columns: Lista de nomes de colunas
+        data_type: Tipo de dados ("pessoa" ou "registros")
+
+    Returns:
+        Dicionário com categorias e suas respectivas colunas
+        {
+            "Categoria 1": ["coluna1", "coluna2", ...],
+            "Categoria 2": [...],
+            ...
+        }
+    """
+    tipo = DATA_TYPES.get(data_type.lower())
+    if tipo is None:
+        # Tipo desconhecido, retorna como personalizado
+        return {"Colunas": columns}
+    return {categoria: list(cols) for categoria, cols in _categorize(tuple(columns), tipo)}
+
+
+@lru_cache(maxsize=128)
+def _categorize(columns: Tuple, data_type: str) -> Tuple[Tuple[str, Tuple], ...]:
+    """Categoriza as colunas com o matcher do tipo (memorizado; ver set_custom_categories)."""
+    matcher = _matchers[data_type]
+    categorized = {categoria: [] for categoria in _categories[data_type]}
+    categorized[CUSTOM_CATEGORY] = []
+    seen = {categoria: set() for categoria in categorized}
+
+    for col in columns:
+        categoria = matcher.match(col)
+        if categoria is None:
+            categorized[CUSTOM_CATEGORY].append(col)
+        elif col not in seen[categoria]:
+            seen[categoria].add(col)
+            categorized[categoria].append(col)
+
+    # Remover categorias vazias
+    return tuple((k, tuple(v)) for k, v in categorized.items() if v)
@@ -1,15 +1,32 @@
-"""Funções para descoberta e categorização dinâmica de colunas."""
-import pandas as pd
-from typing import List, Dict, Optional
-
-
-def load_columns_from_excel(file_path: str, header_row: int = 1) -> List[str]:
+"""Funções para descoberta dos nomes de colunas das planilhas."""
+import os
+import openpyxl
+from typing import List, Optional
+
+from .disk_cache import DiskCache, get_default_disk_cache
+from .excel_engines import AUTO_ENGINE, read_excel
+from .excel_reader import dedup_column_names, trimmed_length
+from .workbook_cache import WorkbookCache, get_default_cache
+
+
+def load_columns_from_excel(
+    file_path: str,
+    header_row: int = 1,
+    cache: Optional[WorkbookCache] = None,
+    disk_cache: Optional[DiskCache] = None
+) -> List[str]:
     """
     Carrega os nomes das colunas reais de um arquivo Excel.
 
+    Se a planilha já estiver no cache (em memória ou em disco), usa as
+    colunas armazenadas. Caso contrário, lê apenas as primeiras linhas do
+    arquivo (até o header), deixando o parse completo para o momento do merge.
+
     Args:
         file_path: Caminho do arquivo Excel
         header_row: Número da linha que contém o header (0-indexed, padrão: 1 para segunda linha)
+        cache: Cache de planilhas (padrão: cache compartilhado do processo)
+        disk_cache: Cache em disco (padrão: ~/.worksheet-merge/cache/)
 
     Returns:
         Lista com os nomes das colunas presentes no arquivo
@@ -18,157 +35,70 @@ def load_columns_from_excel(file_path: str, header_row: int = 1) -> List[str]:
         FileNotFoundError: Se o arquivo não existe
         ValueError: Se o arquivo não é um Excel válido
     """
-    try:
-        df = pd.read_excel(file_path, header=header_row)
-        return list(df.columns)
-    except FileNotFoundError:
+    if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+    if cache is None:
+        cache = get_default_cache()
+
+    if disk_cache is None:
+        disk_cache = get_default_disk_cache()
+
+    df = cache.get(file_path, header_row)
+    if df is not None:
+        return list(df.columns)
+
+    columns = disk_cache.columns(file_path, header_row)
+    if columns is not None:
+        return columns
+
+    try:
+        return read_header(file_path, header_row)
     except Exception as e:
         raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
 
 
-def categorize_columns(columns: List[str], data_type: str) -> Dict[str, List[str]]:
+def read_header(file_path: str, header_row: int = 1, engine: str = AUTO_ENGINE) -> List:
     """
-    Categoriza colunas automaticamente por tipo.
+    Lê somente a linha de header de um arquivo Excel.
+
+    Para .xlsx/.xlsm usa o modo somente leitura do openpyxl, que percorre as
+    linhas sob demanda e para logo após o header. Para os demais formatos
+    (.xls) usa o leitor escolhido (ver excel_engines) limitando a leitura a
+    zero linhas de dados.
+
+    Os nomes retornados seguem as mesmas regras do pandas: células vazias
+    viram "Unnamed: N" e nomes repetidos recebem os sufixos ".1", ".2", ...
 
     Args:
-        columns: Lista de nomes de colunas
-        data_type: Tipo de dados ("pessoa" ou "registros")
+        file_path: Caminho do arquivo Excel
+        header_row: Linha que contém o header (0-indexed)
+        engine: Leitor dos formatos sem leitura linha a linha ("auto" = o mais rápido)
 
     Returns:
-        Dicionário com categorias e suas respectivas colunas
-        {
-            "Categoria 1": ["coluna1", "coluna2", ...],
-            "Categoria 2": [...],
-            ...
-        }
+        Lista com os nomes das colunas
     """
-    if data_type.lower() == "pessoa":
-        return _categorize_pessoa_columns(columns)
-    elif data_type.lower() in ["registros", "registro", "registros_acesso"]:
-        return _categorize_registros_columns(columns)
-    else:
-        # Tipo desconhecido, retorna como personalizado
-        return {"Colunas": columns}
-
-
-def _categorize_pessoa_columns(columns: List[str]) -> Dict[str, List[str]]:
-    """Categoriza colunas de planilha de Pessoas."""
-
-    categorized = {
-        "Informações Básicas": [],
-        "Documentação": [],
-        "Trabalho": [],
-        "Datas": [],
-        "Contato": [],
-        "Endereço": [],
-        "Observações": [],
-        "Personalizadas": []
-    }
-
-    # Palavras-chave para cada categoria
-    categoria_map = {
-        "Informações Básicas": [
-            "Nome", "Sobrenome", "ID Pessoal", "Email", "Gênero",
-            "Numero de Departamento", "Nome do Departamento",
-            "Número de Departamento"
-        ],
-        "Documentação": [
-            "Tipo de Documento", "Número do Documento", "Número do Cartão",
-            "CPF", "RG", "CNH"
-        ],
-        "Trabalho": [
-            "Nome do Cargo", "Número do Cargo", "Data de Contratação",
-            "Título do Trabalho", "Título do Tr"
-        ],
-        "Datas": [
-            "Data de Nascimento", "Data de Contratação", "Data de",
-            "Nascimento"
-        ],
-        "Contato": [
-            "Celular", "Telefone", "Email", "Telefone Comercial",
-            "Telefone Residencial", "Telefone Re"
-        ],
-        "Endereço": [
-            "Rua", "Endereço", "Endereço Comercial", "Endereço Residencial",
-            "País", "Naturalidade"
-        ],
-        "Observações": [
-            "Observação", "ASO", "Observação 1"
-        ]
-    }
-
-    # Categorizar cada coluna
-    for col in columns:
-        categorized_flag = False
-
-        for categoria, keywords in categoria_map.items():
-            for keyword in keywords:
-                if keyword.lower() in col.lower():
-                    if col not in categorized[categoria]:
-                        categorized[categoria].append(col)
-                    categorized_flag = True
-                    break
-
-            if categorized_flag:
-                break
-
-        # Se não foi categorizada, adicionar em Personalizadas
-        if not categorized_flag:
-            categorized["Personalizadas"].append(col)
-
-    # Remover categorias vazias
-    return {k: v for k, v in categorized.items() if v}
-
-
-def _categorize_registros_columns(columns: List[str]) -> Dict[str, List[str]]:
-    """Categoriza colunas de planilha de Registros/Acessos."""
-
-    categorized = {
-        "Informações de Acesso": [],
-        "Dados de Evento": [],
-        "Dados de Pessoa": [],
-        "Segurança": [],
-        "Personalizadas": []
-    }
-
-    # Palavras-chave para cada categoria
-    categoria_map = {
-        "Informações de Acesso": [
-            "Horário", "Nome da Área", "Nome do Dispositivo", "Descrição do Evento",
-            "Ponto do Evento", "Ponto do Ev"
-        ],
-        "Dados de Evento": [
-            "Nível do Evento", "Nível do Eve", "Arquivo de Mídia", "Arquivo de M",
-            "ID do Evento"
-        ],
-        "Dados de Pessoa": [
-            "ID Pessoal", "Nome", "Sobrenome", "Nome do Departamento",
-            "Nome do Leitor", "Nome do Leit", "Número do Cartão"
-        ],
-        "Segurança": [
-            "Modo de Verificação", "Criptografia", "Modo de Ver"
-        ]
-    }
-
-    # Categorizar cada coluna
-    for col in columns:
-        categorized_flag = False
-
-        for categoria, keywords in categoria_map.items():
-            for keyword in keywords:
-                if keyword.lower() in col.lower():
-                    if col not in categorized[categoria]:
-                        categorized[categoria].append(col)
-                    categorized_flag = True
-                    break
-
-            if categorized_flag:
-                break
-
-        # Se não foi categorizada, adicionar em Personalizadas
-        if not categorized_flag:
-            categorized["Personalizadas"].append(col)
-
-    # Remover categorias vazias
-    return {k: v for k, v in categorized.items() if v}
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in (".xlsx", ".xlsm"):
+        return list(read_excel(file_path, header_row=header_row, nrows=0, engine=engine).columns)
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # Ler o header e a primeira linha de dados (que pode ser mais larga)
+        rows = list(sheet.iter_rows(
+            min_row=header_row + 1,
+            max_row=header_row + 2,
+            values_only=True
+        ))
+    finally:
+        workbook.close()
+
+    if not rows:
+        return []
+
+    header = list(rows[0])
+    width = max(trimmed_length(row) for row in rows)
+    header = (header + [None] * width)[:width]
+
+    return dedup_column_names(header)
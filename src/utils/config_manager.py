@@ -5,6 +5,10 @@ from pathlib import Path
 from typing import List, Dict, Optional
 
 
+# Diretório padrão de configurações e dados locais do aplicativo
+DEFAULT_CONFIG_DIR = os.path.join(Path.home(), ".worksheet-merge")
+
+
 class ConfigManager:
     """Gerencia persistência de configurações de checkboxes em JSON."""
 
@@ -17,13 +21,14 @@ class ConfigManager:
                        (padrão: ~/.worksheet-merge/)
         """
         if config_dir is None:
-            config_dir = os.path.join(
-                Path.home(),
-                ".worksheet-merge"
-            )
+            config_dir = DEFAULT_CONFIG_DIR
 
         self.config_dir = config_dir
         self.config_file = os.path.join(config_dir, "configs.json")
+        self.categories_file = os.path.join(config_dir, "categories.json")
+        self.cache_dir = os.path.join(config_dir, "cache")
+        self.state_dir = os.path.join(config_dir, "state")
+        self.runs_dir = os.path.join(config_dir, "runs")
 
         # Criar diretório se não existir
         os.makedirs(config_dir, exist_ok=True)
@@ -38,7 +43,13 @@ class ConfigManager:
         selected_columns_pessoas: List[str],
         selected_columns_secundario: List[str],
         sort_column: Optional[str] = None,
-        sort_order: str = "DESC"
+        sort_order: str = "DESC",
+        filters: Optional[Dict] = None,
+        output_mode: str = "sorted",
+        limit: Optional[int] = None,
+        aggregations: Optional[Dict] = None,
+        output_format: str = "xlsx",
+        output_options: Optional[Dict] = None
     ) -> bool:
         """
         Salva uma configuração de checkboxes em arquivo JSON.
@@ -49,6 +60,13 @@ class ConfigManager:
             selected_columns_secundario: Colunas selecionadas do arquivo secundário
             sort_column: Coluna para ordenação (opcional)
             sort_order: ASC ou DESC
+            filters: Filtros de linhas do arquivo secundário (opcional)
+            output_mode: Modo de saída (ver output_modes.OUTPUT_MODES)
+            limit: Limite do modo de saída (opcional)
+            aggregations: Definições de resumos (ver aggregations.normalize_aggregations)
+            output_format: Formato do arquivo de saída (ver merge_options.OUTPUT_FORMATS)
+            output_options: Opções de cada formato, por formato
+                            (por exemplo, {"csv": {"delimiter": ";"}})
 
         Returns:
             True se salvo com sucesso, False caso contrário
@@ -60,7 +78,13 @@ class ConfigManager:
                 "pessoas": selected_columns_pessoas,
                 "secundario": selected_columns_secundario,
                 "sort_column": sort_column,
-                "sort_order": sort_order
+                "sort_order": sort_order,
+                "filters": filters or {},
+                "output_mode": output_mode,
+                "limit": limit,
+                "aggregations": aggregations or {},
+                "output_format": output_format,
+                "output_options": output_options or {}
             }
 
             self._save_configs(configs)
@@ -129,6 +153,31 @@ class ConfigManager:
             print(f"Erro ao deletar configuração: {str(e)}")
             return False
 
+    def load_categories(self) -> Dict:
+        """
+        Carrega as categorias de colunas definidas pelo usuário (categories.json).
+
+        O arquivo é opcional e editado à mão; o formato é o aceito por
+        column_categories.set_custom_categories:
+            {"pessoa": {"Categoria": ["palavra-chave", ...]}, "registros": {...}}
+
+        Returns:
+            Dicionário com as categorias (vazio se o arquivo não existe)
+
+        Raises:
+            ValueError: Se o arquivo não é um JSON válido
+        """
+        if not os.path.exists(self.categories_file):
+            return {}
+        try:
+            with open(self.categories_file, 'r', encoding='utf-8') as f:
+                categories = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Erro ao ler {self.categories_file}: {str(e)}")
+        if not isinstance(categories, dict):
+            raise ValueError(f"{self.categories_file} deve conter um objeto JSON")
+        return categories
+
     def _load_configs(self) -> Dict:
         """
         Carrega todas as configurações do arquivo JSON.
@@ -0,0 +1,367 @@
+"""Cache em disco (formato colunar Feather) das planilhas já processadas."""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .config_manager import DEFAULT_CONFIG_DIR
+
+try:
+    import pyarrow
+    import pyarrow.feather as feather
+    import pyarrow.ipc
+except ImportError:  # pyarrow é opcional: sem ele o cache em disco fica desativado
+    pyarrow = None
+    feather = None
+
+
+# Limite padrão de espaço ocupado pelo cache em disco (2 GiB)
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Quantidade máxima de arquivos lembrados no índice caminho -> hash do conteúdo
+MAX_INDEX_ENTRIES = 1000
+
+CACHE_EXTENSION = ".feather"
+
+# Chave dos metadados do schema Feather com todas as colunas da planilha
+HEADER_METADATA_KEY = b"worksheet_merge.header"
+
+
+class DiskCache:
+    """
+    Guarda o DataFrame de cada planilha em Feather, identificado pelo hash do conteúdo.
+
+    Depois do primeiro parse, as cargas seguintes do mesmo arquivo são uma
+    leitura mapeada em memória do arquivo Feather (somente das colunas
+    pedidas), em vez de um novo parse do Excel. Cada entrada guarda apenas
+    as colunas já lidas da planilha (o parse continua projetado); colunas
+    lidas depois são acrescentadas à mesma entrada, e o header completo fica
+    nos metadados do schema para saber quais colunas faltam. O hash do conteúdo de cada
+    (caminho, mtime, tamanho) fica guardado em index.json para não precisar
+    reler o arquivo a cada consulta. O espaço total é limitado, descartando
+    as entradas usadas há mais tempo.
+
+    Requer o pacote opcional pyarrow; sem ele, todas as operações são ignoradas.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            cache_dir: Diretório do cache (padrão: ~/.worksheet-merge/cache/)
+            max_bytes: Espaço máximo (em bytes) ocupado pelos arquivos do cache
+            enabled: Permite desativar o cache explicitamente
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(DEFAULT_CONFIG_DIR, "cache")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled and feather is not None
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        file_path: str,
+        header_row: int = 1,
+        columns: Optional[List] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Lê a planilha do cache, se houver entrada para o conteúdo atual do arquivo.
+
+        Args:
+            file_path: Caminho do arquivo Excel original
+            header_row: Linha que contém o header (0-indexed)
+            columns: Colunas a ler (padrão: todas); colunas inexistentes são ignoradas
+
+        Returns:
+            DataFrame ou None se não houver entrada ou se a entrada não tem
+            todas as colunas pedidas
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entry_path(file_path, header_row)
+        if entry is None or not os.path.exists(entry):
+            return None
+
+        try:
+            header, stored = self._read_schema(entry)
+            # Manter a ordem das colunas do arquivo, como no parse do Excel
+            if columns is None:
+                columns = header
+            else:
+                wanted = set(columns)
+                columns = [col for col in header if col in wanted]
+            if any(col not in stored for col in columns):
+                return None  # Colunas ainda não lidas: novo parse projetado
+            table = feather.read_table(entry, columns=columns, memory_map=True)
+            df = table.to_pandas()
+            os.utime(entry)  # marcar como usado recentemente (política LRU)
+            return df
+        except Exception:
+            return None
+
+    def columns(self, file_path: str, header_row: int = 1) -> Optional[List[str]]:
+        """
+        Retorna as colunas da planilha em cache sem ler os dados.
+
+        Só consulta arquivos cujo hash já é conhecido (não lê o arquivo Excel).
+
+        Args:
+            file_path: Caminho do arquivo Excel original
+            header_row: Linha que contém o header (0-indexed)
+
+        Returns:
+            Lista de colunas ou None se não houver entrada
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entry_path(file_path, header_row, compute_hash=False)
+        if entry is None or not os.path.exists(entry):
+            return None
+
+        try:
+            return self._read_schema(entry)[0]
+        except Exception:
+            return None
+
+    def store(
+        self,
+        file_path: str,
+        header_row: int,
+        df: pd.DataFrame,
+        header: Optional[List] = None
+    ) -> bool:
+        """
+        Grava as colunas lidas de uma planilha no cache.
+
+        Se já existe entrada para o arquivo, as colunas novas são acrescentadas
+        a ela (na ordem do header). DataFrames que não podem ser representados
+        em Feather (por exemplo, colunas com números e textos misturados) não
+        são armazenados.
+
+        Args:
+            file_path: Caminho do arquivo Excel original
+            header_row: Linha que contém o header (0-indexed)
+            df: DataFrame com as colunas lidas da planilha
+            header: Todas as colunas da planilha (padrão: as colunas de df)
+
+        Returns:
+            True se a entrada foi gravada
+        """
+        if not self.enabled:
+            return False
+
+        entry = self._entry_path(file_path, header_row)
+        if entry is None:
+            return False
+
+        header = [str(col) for col in (df.columns if header is None else header)]
+        temp_path = f"{entry}.{os.getpid()}.tmp"
+        try:
+            table = pyarrow.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+            table = self._merge_entry(entry, header, table)
+            metadata = dict(table.schema.metadata or {})
+            metadata[HEADER_METADATA_KEY] = json.dumps(header, ensure_ascii=False).encode("utf-8")
+            table = table.replace_schema_metadata(metadata)
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            feather.write_feather(table, temp_path, compression="uncompressed")
+            os.replace(temp_path, entry)
+        except Exception:
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass  # Ignorar erro ao remover arquivo temporário
+            return False
+
+        self._evict()
+        return True
+
+    def purge(self) -> int:
+        """
+        Remove todas as entradas do cache.
+
+        Returns:
+            Número de arquivos removidos
+        """
+        removed = 0
+        with self._lock:
+            for path in self._cache_files():
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            if os.path.exists(self.index_file):
+                try:
+                    os.remove(self.index_file)
+                except OSError:
+                    pass
+        return removed
+
+    def info(self) -> Dict:
+        """
+        Resume o conteúdo do cache.
+
+        Returns:
+            Dicionário {"diretorio", "entradas", "bytes", "limite", "ativo"}
+        """
+        files = self._cache_files()
+        return {
+            "diretorio": self.cache_dir,
+            "entradas": len(files),
+            "bytes": sum(os.path.getsize(path) for path in files),
+            "limite": self.max_bytes,
+            "ativo": self.enabled,
+        }
+
+    def content_hash(self, file_path: str) -> str:
+        """
+        Calcula o hash SHA-256 do conteúdo do arquivo.
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            Hash em hexadecimal
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _entry_path(
+        self,
+        file_path: str,
+        header_row: int,
+        compute_hash: bool = True
+    ) -> Optional[str]:
+        """Caminho do arquivo Feather correspondente ao conteúdo atual do arquivo."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        signature = f"{os.path.abspath(file_path)}|{stat.st_mtime}|{stat.st_size}"
+
+        with self._lock:
+            index = self._load_index()
+            digest = index.get(signature)
+            if digest is None:
+                if not compute_hash:
+                    return None
+                digest = self.content_hash(file_path)
+                index[signature] = digest
+                # Manter somente as entradas mais recentes do índice
+                for old in list(index)[:-MAX_INDEX_ENTRIES]:
+                    del index[old]
+                self._save_index(index)
+
+        return os.path.join(self.cache_dir, f"{digest}_h{header_row}{CACHE_EXTENSION}")
+
+    @staticmethod
+    def _read_schema(entry: str):
+        """
+        Lê somente o schema de um arquivo Feather.
+
+        Returns:
+            Tupla (header completo da planilha, colunas guardadas na entrada)
+        """
+        with pyarrow.memory_map(entry) as source:
+            schema = pyarrow.ipc.open_file(source).schema
+        stored = list(schema.names)
+        raw = (schema.metadata or {}).get(HEADER_METADATA_KEY)
+        header = stored if raw is None else json.loads(raw.decode("utf-8"))
+        return header, stored
+
+    def _merge_entry(self, entry: str, header: List[str], table):
+        """Acrescenta à tabela nova as colunas já guardadas na entrada existente."""
+        if not os.path.exists(entry):
+            return table
+        try:
+            old_header, _ = self._read_schema(entry)
+            old = feather.read_table(entry, memory_map=False)
+        except Exception:
+            return table
+        if old_header != header or old.num_rows != table.num_rows:
+            return table  # Entrada de outra leitura da planilha: substituir
+
+        names = set(table.column_names)
+        for name in old.column_names:
+            if name not in names:
+                table = table.append_column(old.schema.field(name), old.column(name))
+        order = {name: i for i, name in enumerate(header)}
+        return table.select(sorted(table.column_names, key=lambda name: order.get(name, len(order))))
+
+    def _load_index(self) -> Dict[str, str]:
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, str]) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(temp_path, self.index_file)
+        except OSError:
+            pass  # O índice é apenas uma otimização
+
+    def _cache_files(self) -> List[str]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(CACHE_EXTENSION)
+        ]
+
+    def _evict(self) -> None:
+        """Remove as entradas usadas há mais tempo até o cache caber no limite."""
+        with self._lock:
+            files = []
+            for path in self._cache_files():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+_default_disk_cache = None
+
+
+def get_default_disk_cache() -> DiskCache:
+    """Retorna o cache em disco padrão (~/.worksheet-merge/cache/)."""
+    global _default_disk_cache
+    if _default_disk_cache is None:
+        _default_disk_cache = DiskCache()
+    return _default_disk_cache
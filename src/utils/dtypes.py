@@ -0,0 +1,244 @@
+"""Tipos compactos para as planilhas carregadas (categorias, datas e chaves inteiras)."""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .join_backends import JOIN_KEY
+from .metrics import format_bytes
+
+
+# Colunas de texto com até esta proporção de valores distintos viram categorias
+CATEGORY_MAX_RATIO = 0.5
+
+# Formatos de data tentados, em ordem, para colunas de texto
+DATE_FORMATS = ["ISO8601", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y"]
+
+# Maior inteiro representado exatamente em ponto flutuante
+_MAX_EXACT_FLOAT = 2 ** 53
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    date_columns: Optional[Iterable[str]] = None
+) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Converte as colunas de uma planilha para tipos compactos.
+
+    - "ID Pessoal" vira inteiro (Int32/Int64, aceitam vazios) quando todos os
+      valores são inteiros; caso contrário é mantido;
+    - colunas de data (date_columns) viram datetime64, somente se todos os
+      valores preenchidos puderem ser convertidos;
+    - colunas de texto com poucos valores distintos viram categorias
+      (com as categorias em ordem alfabética, preservando a ordenação).
+
+    Conversões que perderiam informação não são feitas. O DataFrame
+    original não é modificado.
+
+    Args:
+        df: DataFrame carregado
+        date_columns: Colunas de data (padrão: nenhuma)
+
+    Returns:
+        Tupla (DataFrame convertido, relatório por coluna convertida com
+        {"coluna", "tipo_antes", "tipo_depois", "bytes_antes", "bytes_depois"})
+    """
+    date_columns = set(date_columns or [])
+    converted = {}
+    report = []
+
+    for col in df.columns:
+        series = df[col]
+        if col == JOIN_KEY:
+            new = compact_key(series)
+        elif col in date_columns:
+            new = parse_dates(series)
+        elif _is_text(series):
+            new = _to_category(series)
+        else:
+            continue
+
+        if new is series:
+            continue
+        converted[col] = new
+        report.append({
+            "coluna": col,
+            "tipo_antes": str(series.dtype),
+            "tipo_depois": str(new.dtype),
+            "bytes_antes": int(series.memory_usage(index=False, deep=True)),
+            "bytes_depois": int(new.memory_usage(index=False, deep=True)),
+        })
+
+    if not converted:
+        return df, report
+
+    df = df.copy(deep=False)
+    for col, new in converted.items():
+        df[col] = new
+    return df, report
+
+
+def compact_key(series: pd.Series) -> pd.Series:
+    """
+    Converte a coluna de chave para inteiro quando todos os valores são inteiros.
+
+    Aceita inteiros, números com ".0" e textos numéricos sem zeros à esquerda;
+    qualquer outro valor mantém a coluna como está. Usa Int32 quando todos os
+    valores cabem em 32 bits e Int64 caso contrário (ambos aceitam vazios).
+
+    Args:
+        series: Coluna "ID Pessoal"
+
+    Returns:
+        Coluna convertida, ou a própria series
+    """
+    if isinstance(series.dtype, (pd.Int32Dtype, pd.Int64Dtype)):
+        return series
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype(_integer_dtype(series.to_numpy()))
+
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna().to_numpy()
+        if len(values) and not (
+            np.all(np.mod(values, 1) == 0) and np.all(np.abs(values) < _MAX_EXACT_FLOAT)
+        ):
+            return series
+        return series.astype(_integer_dtype(values))
+
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return series
+
+    present = series.dropna()
+    if present.empty:
+        return series
+    if pd.api.types.infer_dtype(present, skipna=False) in ("integer", "floating", "mixed-integer-float"):
+        numbers = present.astype(float)
+    else:
+        texts = present.astype(str)
+        if not texts.str.fullmatch(r"-?(0|[1-9]\d{0,15})(\.0+)?").all():
+            return series
+        numbers = texts.astype(float)
+
+    numbers = numbers.to_numpy()
+    if not (np.all(np.mod(numbers, 1) == 0) and np.all(np.abs(numbers) < _MAX_EXACT_FLOAT)):
+        return series
+
+    result = pd.Series(pd.NA, index=series.index, dtype=_integer_dtype(numbers), name=series.name)
+    result[present.index] = numbers.astype(np.int64)
+    return result
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas em texto para datetime64.
+
+    Tenta os formatos de DATE_FORMATS; a conversão só é feita se todos os
+    valores preenchidos forem reconhecidos pelo mesmo formato.
+
+    Args:
+        series: Coluna de datas
+
+    Returns:
+        Coluna convertida, ou a própria series
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not _is_text(series):
+        return series
+
+    present = series.notna()
+    if not present.any():
+        return series
+    for date_format in DATE_FORMATS:
+        dates = pd.to_datetime(series, errors="coerce", format=date_format)
+        if (dates.notna() == present).all():
+            return dates
+    return series
+
+
+def coerce_dates(series: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna para datetime64, com valores não reconhecidos como NaT.
+
+    Usa as mesmas regras de parse_dates (os formatos de DATE_FORMATS, ISO
+    primeiro e depois dia/mês/ano), mas aceita colunas com formatos
+    misturados: cada valor é convertido pelo primeiro formato que o
+    reconhece. É o parser comum aos filtros de período, à compactação e
+    aos resumos por dia, para que todos interpretem as datas igualmente.
+
+    Args:
+        series: Coluna de datas (datetime64, textos ou valores de data/hora)
+
+    Returns:
+        Coluna datetime64
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    parsed = parse_dates(series)
+    if pd.api.types.is_datetime64_any_dtype(parsed):
+        return parsed
+
+    result = None
+    for date_format in DATE_FORMATS:
+        dates = pd.to_datetime(series, errors="coerce", format=date_format)
+        result = dates if result is None else result.where(result.notna(), dates)
+        if result.notna().all():
+            break
+    return result
+
+
+def format_memory_report(report: List[Dict]) -> List[str]:
+    """
+    Formata o relatório de compactação em linhas de texto.
+
+    Args:
+        report: Relatório retornado por compact_dtypes
+
+    Returns:
+        Uma linha por coluna e uma linha de total
+    """
+    lines = []
+    total_antes = total_depois = 0
+    for item in report:
+        total_antes += item["bytes_antes"]
+        total_depois += item["bytes_depois"]
+        lines.append(
+            f"{item['coluna']}: {item['tipo_antes']} -> {item['tipo_depois']}, "
+            f"{format_bytes(item['bytes_antes'])} -> {format_bytes(item['bytes_depois'])}"
+        )
+    lines.append(
+        f"Total: {format_bytes(total_antes)} -> {format_bytes(total_depois)} "
+        f"({format_bytes(total_antes - total_depois)} economizados)"
+    )
+    return lines
+
+
+def _integer_dtype(values: np.ndarray) -> str:
+    """Menor tipo inteiro com vazios (Int32 ou Int64) que representa os valores."""
+    info = np.iinfo(np.int32)
+    if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return "Int32"
+    return "Int64"
+
+
+def _is_text(series: pd.Series) -> bool:
+    """Indica se a coluna contém somente textos (e vazios)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    if pd.api.types.is_string_dtype(series) and not pd.api.types.is_object_dtype(series):
+        return True
+    return (
+        pd.api.types.is_object_dtype(series)
+        and pd.api.types.infer_dtype(series, skipna=True) == "string"
+    )
+
+
+def _to_category(series: pd.Series) -> pd.Series:
+    """Converte para categoria se a coluna tiver poucos valores distintos."""
+    if len(series) == 0:
+        return series
+    if series.nunique(dropna=True) > CATEGORY_MAX_RATIO * len(series):
+        return series
+    return series.astype("category")
@@ -0,0 +1,197 @@
+"""Escolha do leitor de planilhas (calamine, openpyxl ou xlrd) conforme o tipo de arquivo."""
+import importlib.util
+import os
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+# Leitor automático: o mais rápido disponível para a extensão do arquivo
+AUTO_ENGINE = "auto"
+
+# Pacote que cada leitor do pandas requer
+ENGINE_MODULES = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+    "xlrd": "xlrd",
+}
+
+# Leitores de cada extensão, do mais rápido para o mais lento
+ENGINE_PREFERENCE = {
+    ".xlsx": ("calamine", "openpyxl"),
+    ".xlsm": ("calamine", "openpyxl"),
+    ".xls": ("calamine", "xlrd"),
+}
+
+
+@lru_cache(maxsize=None)
+def engine_available(engine: str) -> bool:
+    """Indica se o pacote do leitor está instalado (sem importá-lo)."""
+    module = ENGINE_MODULES.get(engine)
+    return module is not None and importlib.util.find_spec(module) is not None
+
+
+def available_engines() -> List[str]:
+    """Leitores instalados, na ordem de ENGINE_MODULES."""
+    return [engine for engine in ENGINE_MODULES if engine_available(engine)]
+
+
+def validate_engine(engine: str) -> None:
+    """
+    Valida o nome do leitor.
+
+    Raises:
+        ValueError: Se o leitor é desconhecido
+    """
+    if engine != AUTO_ENGINE and engine not in ENGINE_MODULES:
+        raise ValueError(
+            f"Leitor desconhecido: {engine} (opções: {AUTO_ENGINE}, {', '.join(ENGINE_MODULES)})"
+        )
+
+
+def engine_candidates(file_path: str, engine: str = AUTO_ENGINE) -> List[str]:
+    """
+    Leitores a tentar para um arquivo, em ordem.
+
+    Args:
+        file_path: Caminho do arquivo (a extensão define os leitores)
+        engine: Leitor desejado, ou "auto" para o mais rápido disponível
+
+    Returns:
+        Lista de leitores; com um leitor explícito, somente ele
+
+    Raises:
+        ValueError: Se o leitor é desconhecido ou nenhum leitor está instalado
+    """
+    validate_engine(engine)
+    if engine != AUTO_ENGINE:
+        return [engine]
+
+    candidates = [name for name in _preference(file_path) if engine_available(name)]
+    if not candidates:
+        extension = os.path.splitext(file_path)[1].lower()
+        pacotes = " ou ".join(ENGINE_MODULES[name] for name in _preference(file_path))
+        raise ValueError(f"Nenhum leitor disponível para arquivos {extension}: instale {pacotes}")
+    return candidates
+
+
+def read_excel(
+    file_path: str,
+    header_row: int = 1,
+    usecols: Optional[List] = None,
+    nrows: Optional[int] = None,
+    engine: str = AUTO_ENGINE,
+    header: Optional[List] = None
+) -> pd.DataFrame:
+    """
+    Lê a primeira planilha de um arquivo Excel com o leitor escolhido.
+
+    No modo "auto", os leitores de engine_candidates() são tentados em
+    ordem: se o mais rápido falha (por exemplo, em um arquivo que ele não
+    entende), o próximo é usado.
+
+    Args:
+        file_path: Caminho do arquivo
+        header_row: Linha que contém o header (0-indexed)
+        usecols: Colunas a carregar (padrão: todas); colunas inexistentes são ignoradas
+        nrows: Número máximo de linhas de dados (padrão: todas)
+        engine: Leitor ("auto", "calamine", "openpyxl" ou "xlrd")
+        header: Lista que recebe os nomes de todas as colunas da planilha,
+                inclusive as não carregadas por usecols (opcional)
+
+    Returns:
+        DataFrame com os dados
+
+    Raises:
+        ValueError: Se nenhum leitor consegue ler o arquivo
+    """
+    kwargs = {"header": header_row, "nrows": nrows}
+    names: List = []
+    if usecols is not None:
+        wanted = set(usecols)
+
+        def _usecol(col) -> bool:
+            # O pandas consulta cada coluna do header, em ordem (já sem nomes repetidos)
+            names.append(col)
+            return col in wanted
+
+        kwargs["usecols"] = _usecol
+
+    errors = []
+    for name in engine_candidates(file_path, engine):
+        names.clear()
+        try:
+            df = pd.read_excel(file_path, engine=name, **kwargs)
+        except Exception as e:
+            errors.append((name, str(e)))
+            continue
+        if header is not None:
+            header[:] = names if usecols is not None else list(df.columns)
+        return df
+
+    if len(errors) == 1:
+        raise ValueError(errors[0][1])
+    raise ValueError("; ".join(f"{name}: {message}" for name, message in errors))
+
+
+def benchmark_engines(
+    file_path: str,
+    header_row: int = 1,
+    engines: Optional[List[str]] = None,
+    repeat: int = 1
+) -> List[Dict]:
+    """
+    Mede o tempo de leitura do mesmo arquivo com cada leitor.
+
+    Os resultados são comparados com o do primeiro leitor que conseguiu ler
+    o arquivo (valores convertidos para texto, ignorando diferenças de tipo).
+
+    Args:
+        file_path: Caminho do arquivo
+        header_row: Linha que contém o header (0-indexed)
+        engines: Leitores a medir (padrão: os instalados que leem a extensão do arquivo)
+        repeat: Leituras por leitor; vale o menor tempo
+
+    Returns:
+        Lista de dicionários {"leitor", "segundos", "linhas", "colunas",
+        "mesmo_resultado", "erro"}, na ordem de engines
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+    results = []
+    reference = None
+    for name in engines or engine_candidates(file_path):
+        result = {"leitor": name, "segundos": None, "linhas": None, "colunas": None,
+                  "mesmo_resultado": None, "erro": None}
+        try:
+            tempos = []
+            for _ in range(max(1, repeat)):
+                inicio = time.perf_counter()
+                df = read_excel(file_path, header_row=header_row, engine=name)
+                tempos.append(time.perf_counter() - inicio)
+        except Exception as e:
+            result["erro"] = str(e)
+            results.append(result)
+            continue
+
+        result.update(segundos=min(tempos), linhas=len(df), colunas=len(df.columns))
+        texto = _as_text(df)
+        if reference is None:
+            reference = texto
+        result["mesmo_resultado"] = texto.equals(reference)
+        results.append(result)
+    return results
+
+
+def _preference(file_path: str) -> tuple:
+    """Leitores que entendem a extensão do arquivo, do mais rápido para o mais lento."""
+    extension = os.path.splitext(file_path)[1].lower()
+    return ENGINE_PREFERENCE.get(extension, ENGINE_PREFERENCE[".xlsx"])
+
+
+def _as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Valores como texto (nulos como vazio), para comparar resultados de leitores diferentes."""
+    return df.astype(object).where(df.notna(), "").astype(str)
@@ -0,0 +1,160 @@
+"""Leitura de planilhas Excel em blocos, sem carregar a planilha inteira na memória."""
+import os
+from typing import Iterator, List, Optional
+
+import openpyxl
+import pandas as pd
+
+from .excel_engines import AUTO_ENGINE, read_excel
+
+
+# Número padrão de linhas por bloco na leitura em streaming
+DEFAULT_CHUNKSIZE = 50000
+
+# Extensões lidas linha a linha pelo openpyxl em modo somente leitura
+STREAMING_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def iter_excel_chunks(
+    file_path: str,
+    header_row: int = 1,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    usecols: Optional[List] = None,
+    engine: str = AUTO_ENGINE
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê um arquivo Excel em blocos de linhas.
+
+    Para .xlsx/.xlsm, as linhas são percorridas sob demanda pelo openpyxl em
+    modo somente leitura, e apenas um bloco fica na memória por vez. Outros
+    formatos (.xls) não têm leitura incremental: a planilha é carregada
+    inteira, com o leitor escolhido (ver excel_engines), e entregue em fatias.
+
+    Args:
+        file_path: Caminho do arquivo
+        header_row: Linha que contém o header (0-indexed)
+        chunksize: Número máximo de linhas por bloco
+        usecols: Colunas a carregar (padrão: todas); colunas inexistentes são ignoradas
+        engine: Leitor dos formatos sem leitura incremental ("auto" = o mais rápido)
+
+    Yields:
+        DataFrames com até chunksize linhas
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existe
+        ValueError: Se há erro ao ler o arquivo
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    if chunksize <= 0:
+        raise ValueError("O tamanho do bloco deve ser maior que zero")
+
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in STREAMING_EXTENSIONS:
+        yield from _iter_dataframe_chunks(file_path, header_row, chunksize, usecols, engine)
+        return
+
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
+
+    try:
+        rows = workbook.worksheets[0].iter_rows(min_row=header_row + 1, values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = dedup_column_names(list(header[:trimmed_length(header)]))
+        width = len(columns)
+        wanted = None if usecols is None else set(usecols)
+        positions = [
+            i for i, col in enumerate(columns)
+            if wanted is None or col in wanted
+        ]
+        selected_columns = [columns[i] for i in positions]
+
+        buffer = []
+        for row in rows:
+            # Linhas em branco são ignoradas, como no pandas
+            if all(value is None or value == "" for value in row):
+                continue
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            buffer.append([_convert_cell(row[i]) for i in positions])
+
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=selected_columns)
+                buffer = []
+
+        if buffer:
+            yield pd.DataFrame(buffer, columns=selected_columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
+    finally:
+        workbook.close()
+
+
+def _iter_dataframe_chunks(
+    file_path: str,
+    header_row: int,
+    chunksize: int,
+    usecols: Optional[List],
+    engine: str = AUTO_ENGINE
+) -> Iterator[pd.DataFrame]:
+    """Carrega a planilha inteira e entrega fatias de chunksize linhas."""
+    try:
+        df = read_excel(file_path, header_row=header_row, usecols=usecols, engine=engine)
+    except Exception as e:
+        raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
+
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize].reset_index(drop=True)
+
+
+def _convert_cell(value):
+    """Converte o valor de uma célula como o leitor openpyxl do pandas."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def trimmed_length(row) -> int:
+    """Retorna o comprimento da linha desconsiderando células vazias no final."""
+    length = len(row)
+    while length and (row[length - 1] is None or row[length - 1] == ""):
+        length -= 1
+    return length
+
+
+def dedup_column_names(header: List) -> List:
+    """
+    Aplica as regras de nomes de colunas do pandas.
+
+    Células vazias viram "Unnamed: N" e nomes repetidos recebem os sufixos
+    ".1", ".2", ...
+
+    Args:
+        header: Valores da linha de header
+
+    Returns:
+        Lista com os nomes das colunas
+    """
+    columns = []
+    counts = {}
+    for index, value in enumerate(header):
+        name = f"Unnamed: {index}" if value is None or value == "" else value
+
+        cur_count = counts.get(name, 0)
+        while cur_count > 0:
+            counts[name] = cur_count + 1
+            name = f"{name}.{cur_count}"
+            cur_count = counts.get(name, 0)
+
+        counts[name] = cur_count + 1
+        columns.append(name)
+    return columns
@@ -0,0 +1,306 @@
+"""Merge incremental: processa somente as linhas novas de exportações cumulativas."""
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .background import TaskControl, report_progress
+from .batch_merge import SORT_KEY_COLUMN
+from .config_manager import DEFAULT_CONFIG_DIR
+from .join_backends import JOIN_KEY, HashJoinTable, sort_frame
+from .join_keys import normalize_keys
+from .row_filters import apply_filters
+
+
+# Versão do formato do estado salvo (estados de outra versão são descartados)
+STATE_VERSION = 2
+
+# Coluna padrão usada como marca d'água (data/hora do evento no ZKBio)
+DEFAULT_WATERMARK_COLUMN = "Horário"
+
+# Coluna auxiliar com a posição de cada linha secundária no histórico acumulado
+ROW_COLUMN = "__linha__"
+
+
+class MergeStateStore:
+    """
+    Guarda o estado do merge incremental de cada configuração.
+
+    O estado de uma configuração contém a marca d'água (maior valor já
+    processado da coluna de referência), as linhas secundárias acumuladas,
+    a assinatura de cada "ID Pessoal" de Pessoas e o resultado anterior.
+    Cada configuração ocupa um arquivo em ~/.worksheet-merge/state/.
+    """
+
+    def __init__(self, state_dir: Optional[str] = None):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            state_dir: Diretório dos estados (padrão: ~/.worksheet-merge/state/)
+        """
+        if state_dir is None:
+            state_dir = os.path.join(DEFAULT_CONFIG_DIR, "state")
+        self.state_dir = state_dir
+
+    def path_for(self, config_name: str) -> str:
+        """Caminho do arquivo de estado de uma configuração."""
+        safe = re.sub(r"[^\w\-]+", "_", config_name).strip("_") or "config"
+        digest = hashlib.sha1(config_name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.state_dir, f"{safe}_{digest}.pkl")
+
+    def load(self, config_name: str) -> Optional[Dict]:
+        """
+        Carrega o estado de uma configuração.
+
+        Args:
+            config_name: Nome da configuração
+
+        Returns:
+            Dicionário com o estado, ou None se não houver estado válido
+        """
+        path = self.path_for(config_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            state = pd.read_pickle(path)
+        except Exception:
+            return None
+        if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+            return None
+        return state
+
+    def save(self, config_name: str, state: Dict) -> None:
+        """
+        Grava o estado de uma configuração (substituição atômica do arquivo).
+
+        Args:
+            config_name: Nome da configuração
+            state: Estado a gravar
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self.path_for(config_name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            pd.to_pickle(state, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def reset(self, config_name: str) -> bool:
+        """
+        Apaga o estado de uma configuração.
+
+        Args:
+            config_name: Nome da configuração
+
+        Returns:
+            True se havia estado gravado
+        """
+        path = self.path_for(config_name)
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+
+
+def key_signatures(df_pessoas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resume as linhas de Pessoas de cada "ID Pessoal".
+
+    Args:
+        df_pessoas: Colunas de Pessoas usadas no resultado (incluindo "ID Pessoal")
+
+    Returns:
+        DataFrame indexado pela chave normalizada, com o número de linhas ("linhas") e a
+        soma dos hashes das linhas ("soma") de cada chave
+    """
+    # Hashes reduzidos a 44 bits: a soma por chave não transborda o int64
+    hashes = (
+        pd.util.hash_pandas_object(df_pessoas, index=False).to_numpy() >> np.uint64(20)
+    ).astype(np.int64)
+    frame = pd.DataFrame({"chave": normalize_keys(df_pessoas[JOIN_KEY]), "hash": hashes})
+    grouped = frame.dropna(subset=["chave"]).groupby("chave", sort=False)["hash"]
+    return pd.DataFrame({"linhas": grouped.size(), "soma": grouped.sum()})
+
+
+def changed_keys(previous: pd.DataFrame, current: pd.DataFrame) -> pd.Index:
+    """
+    Chaves cujas linhas de Pessoas mudaram (incluídas, removidas ou alteradas).
+
+    Args:
+        previous: Assinaturas da execução anterior (ver key_signatures)
+        current: Assinaturas atuais
+
+    Returns:
+        Índice com as chaves (normalizadas) afetadas
+    """
+    joined = previous.join(current, how="outer", lsuffix="_ant", sort=False)
+    changed = (joined["linhas_ant"] != joined["linhas"]) | (joined["soma_ant"] != joined["soma"])
+    return joined.index[changed.to_numpy()]
+
+
+def new_rows_mask(values: pd.Series, watermark, watermark_count: int) -> np.ndarray:
+    """
+    Seleciona as linhas posteriores à marca d'água.
+
+    Linhas com valor igual à marca d'água são novas somente além das
+    watermark_count primeiras (já processadas na execução anterior).
+    Linhas sem valor na coluna de referência nunca são consideradas novas.
+
+    Args:
+        values: Coluna de referência do arquivo atual
+        watermark: Maior valor processado anteriormente
+        watermark_count: Quantidade de linhas com esse valor já processadas
+
+    Returns:
+        Máscara booleana das linhas novas
+
+    Raises:
+        TypeError: Se os valores não são comparáveis com a marca d'água
+    """
+    newer = (values > watermark).to_numpy(dtype=bool)
+    equal = (values == watermark).to_numpy(dtype=bool)
+    return newer | (equal & (np.cumsum(equal) > watermark_count))
+
+
+def run_incremental(
+    store: MergeStateStore,
+    config_name: str,
+    df_pessoas: pd.DataFrame,
+    df_secundario: pd.DataFrame,
+    colunas_pessoas: List[str],
+    colunas_secundario: List[str],
+    sort_column: Optional[str] = None,
+    sort_order: str = "DESC",
+    watermark_column: str = DEFAULT_WATERMARK_COLUMN,
+    reset: bool = False,
+    control: Optional[TaskControl] = None,
+    filters: Optional[Dict] = None
+) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Executa o merge incremental de uma configuração.
+
+    Sem estado anterior (ou com seleção diferente), todas as linhas são
+    unidas. Caso contrário, somente as linhas posteriores à marca d'água são
+    unidas e acrescentadas ao resultado anterior; as linhas já processadas
+    cujas chaves mudaram em Pessoas são unidas novamente.
+
+    Args:
+        store: Armazenamento dos estados
+        config_name: Nome da configuração (identifica o estado)
+        df_pessoas: Planilha de Pessoas
+        df_secundario: Exportação cumulativa do arquivo secundário
+        colunas_pessoas: Colunas de Pessoas que entram no resultado
+        colunas_secundario: Colunas secundárias que entram no resultado
+        sort_column: Coluna para ordenação (opcional)
+        sort_order: ASC ou DESC
+        watermark_column: Coluna de referência (data/hora ou ID do evento)
+        reset: Descarta o estado anterior e refaz o merge completo
+        control: Canal de progresso/cancelamento (opcional)
+        filters: Filtros de linhas do arquivo secundário (fazem parte da seleção)
+
+    Returns:
+        Tupla (resultado ordenado, estatísticas {"completo", "novas", "reprocessadas"})
+    """
+    selection = {
+        "pessoas": list(colunas_pessoas),
+        "secundario": list(colunas_secundario),
+        "sort_column": sort_column,
+        "sort_order": sort_order,
+        "watermark_column": watermark_column,
+        "filters": filters or {},
+    }
+    keep_sort_key = bool(sort_column and sort_column not in colunas_secundario)
+    colunas_join = [*colunas_secundario, ROW_COLUMN]
+    if keep_sort_key:
+        colunas_join.append(SORT_KEY_COLUMN)
+
+    state = None if reset else store.load(config_name)
+    if state is not None and state["selection"] != selection:
+        state = None
+
+    # 1. Filtrar as linhas secundárias; assinaturas e índice de Pessoas
+    df_secundario = apply_filters(df_secundario, filters)
+    signatures = key_signatures(df_pessoas[[JOIN_KEY, *colunas_pessoas]])
+    table = HashJoinTable(df_pessoas, colunas_pessoas)
+    values = df_secundario[watermark_column]
+
+    # 2. Separar as linhas novas e as chaves afetadas por mudanças em Pessoas
+    mask = None
+    if state is not None:
+        try:
+            mask = new_rows_mask(values, state["watermark"], state["watermark_count"])
+        except TypeError:
+            mask = None  # Tipo da coluna de referência mudou: refazer tudo
+
+    report_progress(control, "join")
+    if mask is None:
+        historico = _number_rows(df_secundario, 0, sort_column, keep_sort_key)
+        result = table.probe(historico, colunas_join)
+        stats = {"completo": True, "novas": len(historico), "reprocessadas": 0}
+    else:
+        anterior = state["secundario"]
+        novas = _number_rows(
+            df_secundario[mask], len(anterior), sort_column, keep_sort_key
+        )
+        afetadas = changed_keys(state["pessoas"], signatures)
+
+        reprocessar = anterior[_key_in(anterior, afetadas)]
+        mantidas = state["result"][~_key_in(state["result"], afetadas)]
+        unidas = table.probe(pd.concat([reprocessar, novas], ignore_index=True), colunas_join)
+
+        historico = pd.concat([anterior, novas], ignore_index=True)
+        result = pd.concat([mantidas, unidas], ignore_index=True)
+        result = result.sort_values(ROW_COLUMN, kind="mergesort", ignore_index=True)
+        stats = {"completo": False, "novas": len(novas), "reprocessadas": len(reprocessar)}
+
+    # 3. Atualizar a marca d'água e gravar o novo estado
+    watermark = values.max()
+    watermark_count = int((values == watermark).sum())
+    if mask is not None:
+        # A marca d'água nunca retrocede (por exemplo, com um arquivo mais antigo)
+        if pd.isna(watermark) or watermark < state["watermark"]:
+            watermark = state["watermark"]
+            watermark_count = int((values == watermark).sum())
+        if watermark == state["watermark"]:
+            watermark_count = max(watermark_count, state["watermark_count"])
+    store.save(config_name, {
+        "version": STATE_VERSION,
+        "selection": selection,
+        "watermark": watermark,
+        "watermark_count": watermark_count,
+        "pessoas": signatures,
+        "secundario": historico,
+        "result": result,
+    })
+
+    # 4. Ordenar o resultado completo e remover as colunas auxiliares
+    if sort_column:
+        sort_key = SORT_KEY_COLUMN if keep_sort_key else sort_column
+        result = sort_frame(result, sort_key, sort_order)
+    helpers = [col for col in (ROW_COLUMN, SORT_KEY_COLUMN) if col in result.columns]
+    report_progress(control, "join", len(result), len(result))
+    return result.drop(columns=helpers).reset_index(drop=True), stats
+
+
+def _key_in(df: pd.DataFrame, keys: pd.Index) -> np.ndarray:
+    """Linhas cuja chave normalizada está em keys."""
+    return pd.Index(normalize_keys(df[JOIN_KEY])).isin(keys)
+
+
+def _number_rows(
+    df: pd.DataFrame,
+    start: int,
+    sort_column: Optional[str],
+    keep_sort_key: bool
+) -> pd.DataFrame:
+    """Numera as linhas secundárias a partir de start (e copia a chave de ordenação)."""
+    df = df.reset_index(drop=True).assign(**{ROW_COLUMN: np.arange(start, start + len(df))})
+    if keep_sort_key:
+        df[SORT_KEY_COLUMN] = df[sort_column]
+    return df
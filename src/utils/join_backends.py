@@ -0,0 +1,764 @@
+"""Backends de junção (LEFT JOIN) usados pela MergeEngine."""
+import os
+import sqlite3
+import tempfile
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from .background import TaskControl
+from .join_keys import JoinKeyIndex
+from .merge_options import JOIN_KEY
+from .metrics import RunMetrics, measure_phase
+
+
+# Coluna auxiliar (somente nas tabelas SQLite) com o código inteiro da chave normalizada
+KEY_CODE_COLUMN = "__chave__"
+
+
+def select_columns(
+    selected_secundario: List[str],
+    selected_pessoas: List[str]
+) -> List[Tuple[str, str]]:
+    """
+    Define as colunas do resultado e a tabela de origem de cada uma.
+
+    Ordem: Todas colunas de Secundário + Colunas de Pessoas não duplicadas
+
+    Args:
+        selected_secundario: Colunas selecionadas do arquivo secundário
+        selected_pessoas: Colunas selecionadas de pessoas
+
+    Returns:
+        Lista de tuplas (tabela, coluna), com tabela "Secundario" ou "Pessoas"
+    """
+    colunas = [("Secundario", col) for col in selected_secundario]
+
+    # Adicionar colunas de Pessoas que não estão em Secundário (evitar duplicação)
+    for col in selected_pessoas:
+        if col not in selected_secundario:
+            colunas.append(("Pessoas", col))
+
+    return colunas
+
+
+class JoinBackend:
+    """
+    Interface dos backends de junção entre Secundário e Pessoas.
+
+    As chaves são comparadas depois de normalizadas (ver join_keys); as
+    estatísticas das chaves sem correspondência da última junção ficam em
+    last_key_stats.
+    """
+
+    name = ""
+    last_key_stats: Optional[Dict] = None
+
+    def join(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        control: Optional[TaskControl] = None,
+        metrics: Optional[RunMetrics] = None
+    ) -> pd.DataFrame:
+        """
+        Executa o LEFT JOIN de Secundário com Pessoas pela coluna "ID Pessoal".
+
+        Args:
+            df_pessoas: DataFrame de pessoas
+            df_secundario: DataFrame secundário
+            selected_columns_pessoas: Colunas selecionadas de pessoas
+            selected_columns_secundario: Colunas selecionadas do arquivo secundário
+            sort_column: Coluna para ordenação (opcional), de Secundário ou,
+                         se não existir lá, de Pessoas
+            sort_order: ASC ou DESC
+            control: Canal de progresso/cancelamento (opcional)
+            metrics: Métricas da execução em andamento; as etapas internas da
+                     junção são registradas como fases (opcional)
+
+        Returns:
+            DataFrame com as colunas na ordem de select_columns()
+
+        Raises:
+            ValueError: Se a coluna de ordenação não existe em nenhuma das tabelas
+            MergeCancelled: Se o cancelamento foi solicitado via control
+        """
+        raise NotImplementedError
+
+
+class SQLiteJoinBackend(JoinBackend):
+    """Junção via banco SQLite temporário em disco."""
+
+    name = "sqlite"
+
+    def join(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        control: Optional[TaskControl] = None,
+        metrics: Optional[RunMetrics] = None
+    ) -> pd.DataFrame:
+        db_path = None
+
+        try:
+            # 1. Criar banco de dados temporário
+            temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+            db_path = temp_db.name
+            temp_db.close()
+
+            # 2. Inserir em tabelas SQLite somente as colunas usadas na query
+            colunas_pessoas, colunas_secundario = _projection(
+                df_pessoas, df_secundario,
+                selected_columns_pessoas, selected_columns_secundario,
+                sort_column
+            )
+            conn = sqlite3.connect(db_path)
+            if control is not None:
+                # Interromper a query em andamento se o cancelamento for solicitado
+                conn.set_progress_handler(lambda: 1 if control.cancelled else 0, 10000)
+            with measure_phase(
+                metrics, "sqlite_carga", linhas_entrada=len(df_pessoas) + len(df_secundario)
+            ):
+                tabela_pessoas, tabela_secundario = self._with_key_codes(
+                    df_pessoas[colunas_pessoas], df_secundario[colunas_secundario]
+                )
+                tabela_pessoas.to_sql('Pessoas', conn, if_exists='replace', index=False)
+                tabela_secundario.to_sql('Secundario', conn, if_exists='replace', index=False)
+
+            # 3. Construir SELECT dinamicamente
+            colunas_sql = self._build_select_list(
+                selected_columns_secundario,
+                selected_columns_pessoas
+            )
+
+            # 4. Construir e executar query
+            query = self._build_query(
+                colunas_sql, sort_column, sort_order,
+                sort_table(df_pessoas, df_secundario, sort_column)
+            )
+            try:
+                with measure_phase(metrics, "sqlite_consulta") as fase:
+                    df_result = pd.read_sql_query(query, conn)
+                    fase["linhas_saida"] = len(df_result)
+            finally:
+                conn.close()
+
+            return _restore_dtypes(
+                df_result, df_pessoas, df_secundario,
+                selected_columns_pessoas, selected_columns_secundario
+            )
+
+        except Exception:
+            if control is not None:
+                control.check_cancelled()
+            raise
+
+        finally:
+            # 5. Limpar arquivo temporário
+            if db_path and os.path.exists(db_path):
+                try:
+                    os.remove(db_path)
+                except:
+                    pass  # Ignorar erro ao deletar arquivo temporário
+
+    def _with_key_codes(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Acrescenta às duas tabelas a coluna com o código inteiro da chave normalizada.
+
+        Chaves vazias, e chaves secundárias ausentes em Pessoas, ficam com
+        código nulo. Registra as estatísticas em self.last_key_stats.
+        """
+        keys = JoinKeyIndex(df_pessoas[JOIN_KEY])
+        codes = keys.encode(df_secundario[JOIN_KEY])
+        self.last_key_stats = keys.match_stats(df_secundario[JOIN_KEY], codes)
+        return (
+            df_pessoas.assign(**{KEY_CODE_COLUMN: _nullable_codes(keys.codes)}),
+            df_secundario.assign(**{KEY_CODE_COLUMN: _nullable_codes(codes)}),
+        )
+
+    @staticmethod
+    def _build_select_list(
+        selected_secundario: List[str],
+        selected_pessoas: List[str]
+    ) -> str:
+        """
+        Constrói a lista de colunas para SELECT SQL.
+
+        Args:
+            selected_secundario: Colunas selecionadas do arquivo secundário
+            selected_pessoas: Colunas selecionadas de pessoas
+
+        Returns:
+            String formatada para SQL
+        """
+        return ", ".join(
+            f'{tabela}."{col}"'
+            for tabela, col in select_columns(selected_secundario, selected_pessoas)
+        )
+
+    @staticmethod
+    def _build_query(
+        colunas_sql: str,
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        sort_table_name: str = "Secundario"
+    ) -> str:
+        """
+        Constrói a query SQL completa.
+
+        Args:
+            colunas_sql: String com colunas para SELECT
+            sort_column: Coluna para ordenação
+            sort_order: ASC ou DESC
+            sort_table_name: Tabela da coluna de ordenação ("Secundario" ou "Pessoas")
+
+        Returns:
+            Query SQL completa
+        """
+        query = f"""
+        SELECT {colunas_sql}
+        FROM Secundario
+        LEFT JOIN Pessoas ON Secundario."{KEY_CODE_COLUMN}" = Pessoas."{KEY_CODE_COLUMN}"
+        """
+
+        # Adicionar ORDER BY se fornecido
+        if sort_column:
+            query += f'\nORDER BY {sort_table_name}."{_sql_name(sort_column)}" {sort_order}'
+
+        return query
+
+
+class TunedSQLiteJoinBackend(SQLiteJoinBackend):
+    """
+    Junção via SQLite ajustada para carga em massa.
+
+    As tabelas são criadas com os mesmos tipos que o pandas usaria em
+    to_sql() e preenchidas com executemany() em uma única transação, com
+    journal e sincronização desligados. O índice do código da chave em
+    Pessoas é criado depois da carga; opcionalmente, a coluna de ordenação também é
+    indexada (na direção pedida), dispensando a ordenação final.
+
+    O plano de execução da última junção fica em last_query_plan.
+    """
+
+    name = "sqlite-tuned"
+
+    # Onde fica o banco: somente memória, memória com transbordo para disco
+    # (banco temporário do SQLite) ou arquivo temporário
+    STORAGES = {"memory": ":memory:", "spill": "", "file": None}
+
+    def __init__(
+        self,
+        storage: str = "memory",
+        index_sort_column: bool = False,
+        cache_size_kib: int = 256 * 1024
+    ):
+        """
+        Configura o backend.
+
+        Args:
+            storage: "memory" (padrão), "spill" (memória, transbordando para
+                     disco quando o cache enche) ou "file" (arquivo temporário)
+            index_sort_column: Cria índice na coluna de ordenação (a consulta
+                               percorre o índice em vez de ordenar o resultado)
+            cache_size_kib: Tamanho do cache de páginas do SQLite (KiB)
+
+        Raises:
+            ValueError: Se storage não é uma das opções
+        """
+        if storage not in self.STORAGES:
+            raise ValueError(
+                f"Armazenamento SQLite desconhecido: {storage} (opções: {', '.join(self.STORAGES)})"
+            )
+        self.storage = storage
+        self.index_sort_column = index_sort_column
+        self.cache_size_kib = cache_size_kib
+        self.last_query_plan: List[str] = []
+
+    def join(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        control: Optional[TaskControl] = None,
+        metrics: Optional[RunMetrics] = None
+    ) -> pd.DataFrame:
+        db_path = None
+
+        try:
+            # 1. Abrir o banco (em memória ou em arquivo temporário)
+            database = self.STORAGES[self.storage]
+            if database is None:
+                temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+                db_path = database = temp_db.name
+                temp_db.close()
+
+            conn = sqlite3.connect(database)
+            try:
+                if control is not None:
+                    # Interromper a query em andamento se o cancelamento for solicitado
+                    conn.set_progress_handler(lambda: 1 if control.cancelled else 0, 10000)
+                conn.execute("PRAGMA journal_mode=OFF")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+                if self.storage == "memory":
+                    conn.execute("PRAGMA temp_store=MEMORY")
+
+                # 2. Carregar somente as colunas usadas na query, em uma transação
+                colunas_pessoas, colunas_secundario = _projection(
+                    df_pessoas, df_secundario,
+                    selected_columns_pessoas, selected_columns_secundario,
+                    sort_column
+                )
+                with measure_phase(
+                    metrics, "sqlite_carga", linhas_entrada=len(df_pessoas) + len(df_secundario)
+                ):
+                    tabela_pessoas, tabela_secundario = self._with_key_codes(
+                        df_pessoas[colunas_pessoas], df_secundario[colunas_secundario]
+                    )
+                    with conn:
+                        self._bulk_insert(conn, "Pessoas", tabela_pessoas)
+                        self._bulk_insert(conn, "Secundario", tabela_secundario)
+
+                # 3. Criar os índices depois da carga
+                with measure_phase(metrics, "sqlite_indices"), conn:
+                    conn.execute(
+                        f'CREATE INDEX "ix_Pessoas_id" ON Pessoas ("{KEY_CODE_COLUMN}")'
+                    )
+                    if self.index_sort_column and sort_table(
+                        df_pessoas, df_secundario, sort_column
+                    ) == "Secundario":
+                        direction = "DESC" if sort_order.upper() == "DESC" else "ASC"
+                        conn.execute(
+                            f'CREATE INDEX "ix_Secundario_ordem" '
+                            f'ON Secundario ("{_sql_name(sort_column)}" {direction})'
+                        )
+
+                # 4. Construir e executar a query, registrando o plano de execução
+                colunas_sql = self._build_select_list(
+                    selected_columns_secundario,
+                    selected_columns_pessoas
+                )
+                query = self._build_query(
+                    colunas_sql, sort_column, sort_order,
+                    sort_table(df_pessoas, df_secundario, sort_column)
+                )
+                self.last_query_plan = [
+                    row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")
+                ]
+                with measure_phase(metrics, "sqlite_consulta") as fase:
+                    df_result = pd.read_sql_query(query, conn)
+                    fase["linhas_saida"] = len(df_result)
+            finally:
+                conn.close()
+
+            return _restore_dtypes(
+                df_result, df_pessoas, df_secundario,
+                selected_columns_pessoas, selected_columns_secundario
+            )
+
+        except Exception:
+            if control is not None:
+                control.check_cancelled()
+            raise
+
+        finally:
+            # 5. Limpar arquivo temporário
+            if db_path and os.path.exists(db_path):
+                try:
+                    os.remove(db_path)
+                except OSError:
+                    pass  # Ignorar erro ao deletar arquivo temporário
+
+    @staticmethod
+    def _bulk_insert(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+        """Cria a tabela com os tipos do pandas e insere todas as linhas com executemany()."""
+        columns = [f'"{_sql_name(col)}" {_sqlite_type(df[col])}' for col in df.columns]
+        conn.execute(f'CREATE TABLE "{table}" ({", ".join(columns)})')
+
+        placeholders = ", ".join("?" * len(df.columns))
+        values = [_sqlite_values(df[col]) for col in df.columns]
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', zip(*values))
+
+
+# Tipos declarados pelo pandas em to_sql() (modo SQLite), por tipo inferido
+_SQLITE_TYPES = {
+    "string": "TEXT",
+    "floating": "REAL",
+    "integer": "INTEGER",
+    "timedelta64": "INTEGER",
+    "datetime64": "TIMESTAMP",
+    "datetime": "TIMESTAMP",
+    "date": "DATE",
+    "time": "TIME",
+    "boolean": "INTEGER",
+}
+
+
+def _restore_dtypes(
+    df_result: pd.DataFrame,
+    df_pessoas: pd.DataFrame,
+    df_secundario: pd.DataFrame,
+    selected_columns_pessoas: List[str],
+    selected_columns_secundario: List[str]
+) -> pd.DataFrame:
+    """
+    Reaplica ao resultado do SQLite os tipos compactos das colunas de origem.
+
+    O SQLite devolve datas como texto, categorias como texto e inteiros com
+    vazios como float; o resultado fica com os mesmos tipos da junção hash.
+    """
+    for tabela, col in select_columns(selected_columns_secundario, selected_columns_pessoas):
+        source = (df_secundario if tabela == "Secundario" else df_pessoas)[col].dtype
+        if pd.api.types.is_datetime64_any_dtype(source):
+            df_result[col] = pd.to_datetime(df_result[col], format="ISO8601")
+        elif isinstance(source, (pd.CategoricalDtype, pd.Int32Dtype, pd.Int64Dtype)):
+            df_result[col] = df_result[col].astype(source)
+    return df_result
+
+
+def _nullable_codes(codes: np.ndarray) -> pd.api.extensions.ExtensionArray:
+    """Códigos inteiros com nulo no lugar de -1 (nulos nunca casam no SQL)."""
+    values = pd.array(codes, dtype="Int64")
+    values[codes < 0] = pd.NA
+    return values
+
+
+def _sql_name(name) -> str:
+    """Nome de coluna com aspas duplas escapadas, para uso entre aspas no SQL."""
+    return str(name).replace('"', '""')
+
+
+def _sqlite_type(series: pd.Series) -> str:
+    """Tipo declarado da coluna, igual ao que pandas.to_sql() usaria."""
+    return _SQLITE_TYPES.get(pd.api.types.infer_dtype(series, skipna=True), "TEXT")
+
+
+def _sqlite_values(series: pd.Series) -> np.ndarray:
+    """
+    Valores da coluna prontos para o sqlite3, convertidos como em pandas.to_sql().
+
+    Datas viram texto ISO ("AAAA-MM-DD HH:MM:SS"), intervalos viram
+    nanossegundos e valores ausentes viram None.
+    """
+    if series.dtype.kind == "M":
+        values = np.array(
+            [None if pd.isna(v) else v.isoformat(" ") for v in series.dt.to_pydatetime()],
+            dtype=object
+        )
+    elif series.dtype.kind == "m":
+        values = series.to_numpy(dtype="m8[ns]").view("i8").astype(object)
+        values[series.isna().to_numpy()] = None
+    else:
+        values = series.to_numpy(dtype=object, copy=True)
+        values[pd.isna(values)] = None
+    return values
+
+
+def sort_table(
+    df_pessoas: pd.DataFrame,
+    df_secundario: pd.DataFrame,
+    sort_column: Optional[str]
+) -> Optional[str]:
+    """
+    Tabela de origem da coluna de ordenação.
+
+    Args:
+        df_pessoas: DataFrame de pessoas
+        df_secundario: DataFrame secundário
+        sort_column: Coluna de ordenação (opcional)
+
+    Returns:
+        "Secundario" (preferida quando a coluna existe nas duas), "Pessoas"
+        ou None se não há ordenação
+
+    Raises:
+        ValueError: Se a coluna não existe em nenhuma das tabelas
+    """
+    if not sort_column:
+        return None
+    if sort_column in df_secundario.columns:
+        return "Secundario"
+    if sort_column in df_pessoas.columns:
+        return "Pessoas"
+    raise ValueError(
+        f"Coluna de ordenação não encontrada em Registros/Níveis nem em Pessoas: {sort_column}"
+    )
+
+
+def _projection(
+    df_pessoas: pd.DataFrame,
+    df_secundario: pd.DataFrame,
+    selected_columns_pessoas: List[str],
+    selected_columns_secundario: List[str],
+    sort_column: Optional[str] = None
+) -> Tuple[List[str], List[str]]:
+    """Colunas de cada tabela usadas pela junção, na ordem original dos DataFrames."""
+    usadas_pessoas = {JOIN_KEY, *selected_columns_pessoas}
+    usadas_secundario = {JOIN_KEY, *selected_columns_secundario}
+    tabela = sort_table(df_pessoas, df_secundario, sort_column)
+    if tabela == "Secundario":
+        usadas_secundario.add(sort_column)
+    elif tabela == "Pessoas":
+        usadas_pessoas.add(sort_column)
+    return (
+        [col for col in df_pessoas.columns if col in usadas_pessoas],
+        [col for col in df_secundario.columns if col in usadas_secundario],
+    )
+
+
+class HashJoinIndex:
+    """
+    Índice hash das linhas de Pessoas pela chave de junção.
+
+    Cada chave distinta (normalizada, ver join_keys) recebe um código
+    inteiro; as posições das linhas são agrupadas por código, de modo que a
+    consulta de um lote de chaves é feita com operações vetorizadas. Chaves
+    nulas nunca casam (como no SQL).
+    """
+
+    def __init__(self, keys: pd.Series):
+        """
+        Constrói o índice.
+
+        Args:
+            keys: Coluna de chaves de Pessoas (na ordem das linhas)
+        """
+        self.keys = JoinKeyIndex(keys)
+        codes = self.keys.codes
+
+        # Posições das linhas agrupadas por código, preservando a ordem original
+        valid = codes >= 0
+        order = np.argsort(codes, kind="stable")
+        self.positions = order[int((~valid).sum()):]
+        self.counts = np.bincount(codes[valid], minlength=len(self.keys))
+        self.starts = np.cumsum(self.counts) - self.counts
+
+    def probe(
+        self,
+        keys: pd.Series,
+        codes: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Consulta um lote de chaves no índice (semântica de LEFT JOIN).
+
+        Cada chave gera uma linha por ocorrência em Pessoas, ou uma linha sem
+        correspondência (posição -1) se a chave não existir.
+
+        Args:
+            keys: Chaves do lado secundário
+            codes: Códigos já calculados com self.keys.encode(keys) (opcional)
+
+        Returns:
+            Tupla (posições em keys, posições em Pessoas ou -1)
+        """
+        if codes is None:
+            codes = self.keys.encode(keys)
+        if len(self.keys) == 0:
+            left = np.arange(len(keys))
+            return left, np.full(len(keys), -1, dtype=np.intp)
+
+        matched = codes >= 0
+        repeats = np.where(matched, self.counts[np.where(matched, codes, 0)], 1)
+
+        left = np.repeat(np.arange(len(codes)), repeats)
+        codes_rep = codes[left]
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+
+        right = np.full(len(left), -1, dtype=np.intp)
+        hit = codes_rep >= 0
+        right[hit] = self.positions[self.starts[codes_rep[hit]] + offsets[hit]]
+        return left, right
+
+
+class HashJoinTable:
+    """
+    Lado Pessoas da junção hash: colunas projetadas mais o índice por "ID Pessoal".
+
+    É construído uma única vez e pode ser consultado por vários lotes de
+    linhas secundárias (por exemplo, na leitura em blocos).
+    """
+
+    def __init__(self, df_pessoas: pd.DataFrame, columns: List[str]):
+        """
+        Constrói a tabela.
+
+        Args:
+            df_pessoas: DataFrame de pessoas (precisa conter "ID Pessoal")
+            columns: Colunas de Pessoas que entram no resultado
+        """
+        self.columns = list(columns)
+        self.pessoas = df_pessoas[self.columns].reset_index(drop=True)
+        self.index = HashJoinIndex(df_pessoas[JOIN_KEY])
+
+    def probe(
+        self,
+        secundario: pd.DataFrame,
+        columns_secundario: List[str],
+        codes: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """
+        Faz o LEFT JOIN de um lote de linhas secundárias com Pessoas.
+
+        Args:
+            secundario: Linhas secundárias (precisa conter "ID Pessoal")
+            columns_secundario: Colunas do lote que entram no resultado
+            codes: Códigos das chaves do lote, já calculados com encode() (opcional)
+
+        Returns:
+            DataFrame com as colunas secundárias seguidas das colunas de Pessoas
+        """
+        left, right = self.index.probe(secundario[JOIN_KEY], codes)
+
+        # Linhas sem correspondência recebem nulos nas colunas de Pessoas
+        parte_secundario = secundario[columns_secundario].iloc[left].reset_index(drop=True)
+        parte_pessoas = self.pessoas.reindex(right).reset_index(drop=True)
+
+        return pd.concat([parte_secundario, parte_pessoas], axis=1)
+
+
+class HashJoinBackend(JoinBackend):
+    """Junção em memória: índice hash de Pessoas consultado pelas linhas secundárias."""
+
+    name = "hash"
+
+    def join(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        control: Optional[TaskControl] = None,
+        metrics: Optional[RunMetrics] = None
+    ) -> pd.DataFrame:
+        colunas = select_columns(selected_columns_secundario, selected_columns_pessoas)
+        colunas_secundario = [col for tabela, col in colunas if tabela == "Secundario"]
+        colunas_pessoas = [col for tabela, col in colunas if tabela == "Pessoas"]
+
+        # 1. Projetar somente as colunas necessárias
+        tabela_ordenacao = sort_table(df_pessoas, df_secundario, sort_column)
+        projecao_secundario = list(colunas_secundario)
+        if JOIN_KEY not in projecao_secundario:
+            projecao_secundario.append(JOIN_KEY)
+        if tabela_ordenacao == "Secundario" and sort_column not in projecao_secundario:
+            projecao_secundario.append(sort_column)
+        projecao_pessoas = list(colunas_pessoas)
+        if tabela_ordenacao == "Pessoas" and sort_column not in projecao_pessoas:
+            projecao_pessoas.append(sort_column)
+
+        secundario = df_secundario[projecao_secundario]
+        if control is not None:
+            control.check_cancelled()
+
+        # 2. Ordenar antes da junção: as linhas replicadas por chaves
+        #    duplicadas ficam adjacentes e herdam a mesma ordem
+        if tabela_ordenacao == "Secundario":
+            with measure_phase(metrics, "ordenacao", linhas_entrada=len(secundario)):
+                secundario = sort_frame(secundario, sort_column, sort_order)
+
+        # 3. Indexar Pessoas e consultar com as chaves secundárias
+        with measure_phase(metrics, "indice_pessoas", linhas_entrada=len(df_pessoas)):
+            table = HashJoinTable(df_pessoas, projecao_pessoas)
+        if control is not None:
+            control.check_cancelled()
+        with measure_phase(metrics, "consulta_indice", linhas_entrada=len(secundario)) as fase:
+            codes = table.index.keys.encode(secundario[JOIN_KEY])
+            self.last_key_stats = table.index.keys.match_stats(secundario[JOIN_KEY], codes)
+            df_result = table.probe(secundario, colunas_secundario, codes)
+            fase["linhas_saida"] = len(df_result)
+
+        # 4. Coluna de ordenação de Pessoas: ordenar depois da junção
+        if tabela_ordenacao == "Pessoas":
+            with measure_phase(metrics, "ordenacao", linhas_entrada=len(df_result)):
+                df_result = sort_frame(df_result, sort_column, sort_order).reset_index(drop=True)
+            if sort_column not in colunas_pessoas:
+                df_result = df_result.drop(columns=[sort_column])
+        return df_result
+
+
+def sort_frame(df: pd.DataFrame, column: str, sort_order: str = "DESC") -> pd.DataFrame:
+    """
+    Ordena um DataFrame de forma estável, com nulos primeiro em ASC e por último em DESC.
+
+    Colunas com tipos misturados (números e textos) seguem a ordem do SQLite:
+    nulos, depois números, depois textos.
+
+    Args:
+        df: DataFrame a ordenar
+        column: Coluna de ordenação
+        sort_order: ASC ou DESC
+
+    Returns:
+        DataFrame ordenado
+    """
+    ascending = sort_order.upper() != "DESC"
+    try:
+        return df.sort_values(
+            column,
+            ascending=ascending,
+            kind="mergesort",
+            na_position="first" if ascending else "last"
+        )
+    except TypeError:
+        keys = df[column].tolist()
+        order = sorted(
+            range(len(keys)),
+            key=lambda i: _sqlite_sort_key(keys[i]),
+            reverse=not ascending
+        )
+        return df.iloc[order]
+
+
+def _sqlite_sort_key(value) -> Tuple:
+    """Chave de ordenação compatível com a ordem de tipos do SQLite."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return (0, 0)
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return (1, value)
+    return (2, str(value))
+
+
+BACKENDS: Dict[str, Type[JoinBackend]] = {
+    HashJoinBackend.name: HashJoinBackend,
+    SQLiteJoinBackend.name: SQLiteJoinBackend,
+    TunedSQLiteJoinBackend.name: TunedSQLiteJoinBackend,
+}
+
+
+def get_backend(name: str) -> JoinBackend:
+    """
+    Cria um backend de junção pelo nome.
+
+    Args:
+        name: Nome do backend ("hash", "sqlite" ou "sqlite-tuned")
+
+    Returns:
+        Instância do backend
+
+    Raises:
+        ValueError: Se o nome não corresponde a nenhum backend
+    """
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Backend de junção desconhecido: {name} (opções: {', '.join(BACKENDS)})"
+        )
@@ -0,0 +1,162 @@
+"""Normalização e codificação inteira da chave de junção ("ID Pessoal")."""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Texto de um inteiro, opcionalmente com sinal, zeros à esquerda e ".0" no final
+_INTEGER_TEXT = r"-?\d{1,18}(?:\.0*)?"
+
+# Maior inteiro representado exatamente em ponto flutuante
+_MAX_EXACT_FLOAT = 2 ** 53
+
+# Quantidade de chaves sem correspondência listadas como exemplo
+MAX_UNMATCHED_EXAMPLES = 10
+
+
+def normalize_keys(keys: pd.Series) -> np.ndarray:
+    """
+    Converte as chaves para uma forma canônica.
+
+    Cada exportação traz "ID Pessoal" com um tipo diferente (inteiro, número
+    com ".0", texto com zeros à esquerda ou espaços). Chaves que representam
+    um inteiro viram int, de modo que 7, 7.0, "7", " 007 " e "7.0" são a
+    mesma chave; as demais viram texto sem os espaços das pontas. Vazios
+    viram None e nunca casam.
+
+    Args:
+        keys: Coluna de chaves
+
+    Returns:
+        Array (object) com as chaves normalizadas
+    """
+    keys = pd.Series(keys).reset_index(drop=True)
+    normalized = np.full(len(keys), None, dtype=object)
+
+    present = keys.notna().to_numpy(dtype=bool)
+    if not present.any():
+        return normalized
+
+    values = keys[present]
+    if pd.api.types.is_bool_dtype(values):
+        normalized[present] = _canonical_texts(values)
+    elif pd.api.types.is_integer_dtype(values):
+        normalized[present] = values.to_numpy(dtype=np.int64).astype(object)
+    elif pd.api.types.is_float_dtype(values):
+        normalized[present] = _canonical_numbers(values.to_numpy(dtype=float))
+    else:
+        normalized[present] = _canonical_texts(values)
+    return normalized
+
+
+def _canonical_numbers(values: np.ndarray) -> np.ndarray:
+    """Números inteiros viram int; os demais, texto."""
+    integral = (np.mod(values, 1) == 0) & (np.abs(values) < _MAX_EXACT_FLOAT)
+    result = np.empty(len(values), dtype=object)
+    result[integral] = values[integral].astype(np.int64).astype(object)
+    result[~integral] = [str(value) for value in values[~integral]]
+    return result
+
+
+def _canonical_texts(values: pd.Series) -> np.ndarray:
+    """Textos de inteiros viram int; os demais ficam sem os espaços das pontas."""
+    texts = values.astype(str).str.strip()
+    integer = texts.str.fullmatch(_INTEGER_TEXT).to_numpy(dtype=bool)
+
+    result = texts.to_numpy(dtype=object)
+    if integer.any():
+        digits = texts[integer].str.replace(r"\.0*$", "", regex=True)
+        result[integer] = digits.astype(np.int64).to_numpy().astype(object)
+    result[result == ""] = None
+    return result
+
+
+class JoinKeyIndex:
+    """
+    Dicionário das chaves normalizadas de Pessoas, com um código inteiro por chave.
+
+    Os códigos (0..n-1, -1 para chave vazia) são usados por todos os
+    backends de junção: a junção hash agrupa as linhas de Pessoas por código
+    e os backends SQLite juntam as tabelas por uma coluna inteira de códigos.
+    """
+
+    def __init__(self, keys: pd.Series):
+        """
+        Constrói o dicionário.
+
+        Args:
+            keys: Coluna "ID Pessoal" de Pessoas (na ordem das linhas)
+        """
+        self.codes, uniques = pd.factorize(normalize_keys(keys))
+        self.uniques = pd.Index(uniques, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.uniques)
+
+    def encode(self, keys: pd.Series) -> np.ndarray:
+        """
+        Códigos das chaves do lado secundário.
+
+        Args:
+            keys: Coluna "ID Pessoal" do arquivo secundário
+
+        Returns:
+            Array com o código de cada chave, ou -1 se a chave é vazia ou
+            não existe em Pessoas
+        """
+        if len(self.uniques) == 0:
+            return np.full(len(keys), -1, dtype=np.intp)
+        return self.uniques.get_indexer(normalize_keys(keys))
+
+    def match_stats(self, keys: pd.Series, codes: Optional[np.ndarray] = None) -> Dict:
+        """
+        Estatísticas das chaves secundárias sem correspondência em Pessoas.
+
+        Args:
+            keys: Coluna "ID Pessoal" do arquivo secundário
+            codes: Códigos já calculados com encode() (opcional)
+
+        Returns:
+            Dicionário {"linhas", "sem_chave", "sem_correspondencia",
+            "chaves_sem_correspondencia", "exemplos"}: total de linhas, linhas
+            com chave vazia, linhas com chave ausente em Pessoas, quantidade
+            de chaves distintas ausentes e alguns exemplos delas
+        """
+        if codes is None:
+            codes = self.encode(keys)
+        originais = pd.Series(keys).reset_index(drop=True)
+        vazias = originais.isna().to_numpy(dtype=bool)
+        ausentes = (codes < 0) & ~vazias
+
+        distintas = pd.unique(normalize_keys(originais[ausentes]))
+        distintas = [key for key in distintas if key is not None]
+        return {
+            "linhas": int(len(codes)),
+            "sem_chave": int(vazias.sum()),
+            "sem_correspondencia": int(ausentes.sum()),
+            "chaves_sem_correspondencia": len(distintas),
+            "exemplos": distintas[:MAX_UNMATCHED_EXAMPLES],
+        }
+
+
+def format_match_stats(stats: Dict) -> str:
+    """
+    Resume as estatísticas de match_stats() em uma linha de texto.
+
+    Args:
+        stats: Estatísticas de JoinKeyIndex.match_stats()
+
+    Returns:
+        Texto descritivo
+    """
+    texto = (
+        f"{stats['sem_correspondencia']} de {stats['linhas']} linhas sem correspondência em Pessoas "
+        f"({stats['chaves_sem_correspondencia']} IDs distintos"
+    )
+    if stats["exemplos"]:
+        texto += f", ex.: {', '.join(str(key) for key in stats['exemplos'])}"
+    texto += ")"
+    if stats["sem_chave"]:
+        texto += f"; {stats['sem_chave']} linhas sem ID Pessoal"
+    return texto
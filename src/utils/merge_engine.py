@@ -1,13 +1,100 @@
-"""Engine para merge parametrizado de planilhas com SQLite."""
-import pandas as pd
-import sqlite3
-import tempfile
+"""Engine para merge parametrizado de planilhas."""
+import contextlib
 import os
-from typing import List, Optional, Tuple
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .aggregations import StreamingAggregator, aggregation_columns, normalize_aggregations
+from .background import MergeCancelled, TaskControl, report_progress
+from .batch_merge import run_batch
+from .column_categories import date_columns
+from .column_loader import read_header
+from .disk_cache import DiskCache, get_default_disk_cache
+from .dtypes import compact_dtypes
+from .excel_engines import AUTO_ENGINE, validate_engine
+from .excel_reader import DEFAULT_CHUNKSIZE, iter_excel_chunks
+from .incremental_merge import DEFAULT_WATERMARK_COLUMN, MergeStateStore, run_incremental
+from .join_backends import (
+    JOIN_KEY,
+    JoinBackend,
+    HashJoinBackend,
+    HashJoinTable,
+    get_backend,
+    select_columns,
+    sort_table,
+)
+from .metrics import MetricsHook, RunLog, RunMetrics, file_size, get_default_run_log, measure_phase
+from .output_modes import DEFAULT_OUTPUT_MODE, SELECTION_MODES, select_rows, validate_output_mode
+from .output_writers import ExcelStreamWriter
+from .preview import DEFAULT_PREVIEW_ROWS, MergePreview
+from .row_filters import apply_filters, filter_columns, normalize_filters
+from .workbook_cache import WorkbookCache, get_default_cache, load_workbook
 
 
 class MergeEngine:
-    """Engine para realizar merge dinâmico de duas planilhas via SQLite."""
+    """Engine para realizar merge dinâmico de duas planilhas (LEFT JOIN)."""
+
+    def __init__(
+        self,
+        cache: Optional[WorkbookCache] = None,
+        backend: Optional[Union[JoinBackend, str]] = None,
+        disk_cache: Optional[DiskCache] = None,
+        compact: bool = True,
+        reader: str = AUTO_ENGINE,
+        metrics_hooks: Optional[Iterable[MetricsHook]] = None,
+        run_log: Optional[RunLog] = None
+    ):
+        """
+        Inicializa a engine.
+
+        Args:
+            cache: Cache de planilhas carregadas (padrão: cache compartilhado do processo)
+            backend: Backend de junção ou seu nome ("hash", "sqlite" ou "sqlite-tuned").
+                     Padrão: junção hash em memória
+            disk_cache: Cache em disco das planilhas já lidas
+                        (padrão: ~/.worksheet-merge/cache/)
+            compact: Converte as planilhas carregadas para tipos compactos
+                     (categorias, datas e "ID Pessoal" inteiro; ver dtypes.compact_dtypes).
+                     Engines que compartilham um cache devem usar o mesmo valor
+            reader: Leitor de planilhas: "auto" (o mais rápido instalado para
+                    cada tipo de arquivo, com fallback), "calamine", "openpyxl"
+                    ou "xlrd" (ver excel_engines)
+            metrics_hooks: Funções chamadas ao fim de cada fase de cada merge,
+                           com o registro da fase (ver metrics.RunMetrics)
+            run_log: Registro das execuções em JSON
+                     (padrão: ~/.worksheet-merge/runs/; RunLog(enabled=False) desativa)
+        """
+        validate_engine(reader)
+        self.cache = cache if cache is not None else get_default_cache()
+        self.disk_cache = disk_cache if disk_cache is not None else get_default_disk_cache()
+        self.compact = compact
+        self.reader = reader
+        self.last_incremental_stats: Optional[dict] = None
+        # Chaves secundárias sem correspondência em Pessoas na última junção
+        # (ver JoinKeyIndex.match_stats)
+        self.last_key_stats: Optional[dict] = None
+        # Relatório de compactação de cada arquivo carregado (ver dtypes.compact_dtypes)
+        self.last_memory_report: Dict[str, List[Dict]] = {}
+        # Métricas por fase (tempo, CPU, memória, linhas e bytes) do último merge
+        self.last_metrics: Optional[RunMetrics] = None
+        self.metrics_hooks: List[MetricsHook] = list(metrics_hooks or [])
+        self.run_log = run_log if run_log is not None else get_default_run_log()
+        self._metrics: Optional[RunMetrics] = None
+
+        if backend is None:
+            backend = HashJoinBackend()
+        elif isinstance(backend, str):
+            backend = get_backend(backend)
+        self.backend = backend
+
+    def add_metrics_hook(self, hook: MetricsHook) -> None:
+        """
+        Registra uma função chamada ao fim de cada fase dos próximos merges.
+
+        Args:
+            hook: Função que recebe o registro da fase (ver metrics.RunMetrics.phase)
+        """
+        self.metrics_hooks.append(hook)
 
     def merge(
         self,
@@ -16,18 +103,36 @@ class MergeEngine:
         selected_columns_pessoas: List[str],
         selected_columns_secundario: List[str],
         sort_column: Optional[str] = None,
-        sort_order: str = "DESC"
+        sort_order: str = "DESC",
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None,
+        output_mode: str = DEFAULT_OUTPUT_MODE,
+        limit: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Realiza merge dinâmico de duas planilhas usando LEFT JOIN.
 
+        Somente as colunas selecionadas (mais "ID Pessoal", a coluna de
+        ordenação e as colunas filtradas) são lidas das planilhas. As
+        planilhas são obtidas do cache quando já foram carregadas antes.
+        Os filtros são aplicados às linhas secundárias antes da junção.
+
+        A ordenação completa só é feita no modo "sorted" (padrão): "top_n"
+        seleciona as limit primeiras linhas sem ordenar o resto,
+        "latest_per_person" mantém as limit primeiras linhas de cada
+        "ID Pessoal" e "unsorted" mantém a ordem do arquivo secundário.
+
         Args:
             path_pessoas: Caminho do arquivo de pessoas
             path_secundario: Caminho do arquivo secundário (níveis ou registros)
             selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
             selected_columns_secundario: Lista de colunas selecionadas do arquivo secundário
-            sort_column: Coluna para ordenação (opcional)
+            sort_column: Coluna para ordenação (opcional), de Registros/Níveis ou de Pessoas
             sort_order: Ordem de ordenação ("ASC" ou "DESC", padrão: "DESC")
+            control: Canal de progresso/cancelamento (opcional, ver BackgroundTask)
+            filters: Filtros de linhas do arquivo secundário (ver row_filters.normalize_filters)
+            output_mode: Modo de saída (ver output_modes.OUTPUT_MODES)
+            limit: N do modo "top_n" ou K do modo "latest_per_person" (padrão: 1)
 
         Returns:
             DataFrame com os dados mesclados
@@ -35,71 +140,810 @@ class MergeEngine:
         Raises:
             ValueError: Se houver erro na validação ou processamento
             FileNotFoundError: Se os arquivos não existem
+            MergeCancelled: Se o cancelamento foi solicitado via control
         """
-        db_path = None
+        with self._run("merge", [path_pessoas, path_secundario]):
+            try:
+                # 1. Carregar as planilhas, somente com as colunas necessárias
+                filters = normalize_filters(filters)
+                limit = validate_output_mode(output_mode, sort_column, limit)
+                usecols_pessoas, usecols_secundario = self._required_columns(
+                    selected_columns_pessoas, selected_columns_secundario, sort_column, filters
+                )
+                report_progress(control, "load", 0, 2)
+                df_pessoas = self._load_excel(path_pessoas, header_row=1, usecols=usecols_pessoas)
+                report_progress(control, "load", 1, 2)
+                df_secundario = self._load_excel(path_secundario, header_row=1, usecols=usecols_secundario)
+                report_progress(control, "load", 2, 2)
+
+                return self._merge_frames(
+                    df_pessoas, df_secundario,
+                    selected_columns_pessoas, selected_columns_secundario,
+                    sort_column, sort_order, control, filters, output_mode, limit
+                )
+
+            except MergeCancelled:
+                raise
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Arquivo não encontrado: {str(e)}")
+            except ValueError as e:
+                raise ValueError(f"Erro de validação: {str(e)}")
+            except Exception as e:
+                raise ValueError(f"Erro ao processar merge: {str(e)}")
 
+    def merge_frames(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None,
+        output_mode: str = DEFAULT_OUTPUT_MODE,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Realiza o merge a partir de DataFrames já carregados.
+
+        Args:
+            df_pessoas: DataFrame da planilha de pessoas
+            df_secundario: DataFrame do arquivo secundário
+            selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
+            selected_columns_secundario: Lista de colunas selecionadas do arquivo secundário
+            sort_column: Coluna para ordenação (opcional)
+            sort_order: Ordem de ordenação ("ASC" ou "DESC", padrão: "DESC")
+            control: Canal de progresso/cancelamento (opcional)
+            filters: Filtros de linhas do arquivo secundário (opcional)
+            output_mode: Modo de saída (ver merge())
+            limit: Limite do modo de saída (ver merge())
+
+        Returns:
+            DataFrame com os dados mesclados
+
+        Raises:
+            ValueError: Se houver erro na validação ou processamento
+            MergeCancelled: Se o cancelamento foi solicitado via control
+        """
+        with self._run("merge_frames"):
+            try:
+                return self._merge_frames(
+                    df_pessoas, df_secundario,
+                    selected_columns_pessoas, selected_columns_secundario,
+                    sort_column, sort_order, control, normalize_filters(filters),
+                    output_mode, validate_output_mode(output_mode, sort_column, limit)
+                )
+            except MergeCancelled:
+                raise
+            except ValueError as e:
+                raise ValueError(f"Erro de validação: {str(e)}")
+            except Exception as e:
+                raise ValueError(f"Erro ao processar merge: {str(e)}")
+
+    def merge_chunks(
+        self,
+        path_pessoas: str,
+        path_secundario: str,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Realiza o merge em modo streaming, bloco a bloco.
+
+        A planilha de Pessoas é carregada e indexada uma única vez; o arquivo
+        secundário é lido em blocos de chunksize linhas, e cada bloco é
+        unido ao índice e entregue imediatamente. O pico de memória fica
+        limitado ao tamanho do bloco mais a tabela de Pessoas.
+
+        As linhas são entregues na ordem do arquivo secundário (sem ordenação).
+        Os filtros são aplicados a cada bloco assim que ele é lido, antes da
+        junção.
+
+        Args:
+            path_pessoas: Caminho do arquivo de pessoas
+            path_secundario: Caminho do arquivo secundário (níveis ou registros)
+            selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
+            selected_columns_secundario: Lista de colunas selecionadas do arquivo secundário
+            chunksize: Número de linhas secundárias por bloco
+            control: Canal de progresso/cancelamento (opcional)
+            filters: Filtros de linhas do arquivo secundário (opcional)
+
+        Returns:
+            Iterador de DataFrames com os dados mesclados
+
+        Raises:
+            ValueError: Se houver erro na validação ou processamento
+            FileNotFoundError: Se os arquivos não existem
+        """
+        metrics, owner = self._start_run("merge_chunks", [path_pessoas, path_secundario])
+        # A junção em blocos não calcula as estatísticas das chaves
+        self.last_key_stats = None
         try:
-            # 1. Carregar as planilhas
-            df_pessoas = self._load_excel(path_pessoas, header_row=1)
-            df_secundario = self._load_excel(path_secundario, header_row=1)
+            try:
+                # 1. Carregar Pessoas e o header do arquivo secundário
+                filters = normalize_filters(filters)
+                usecols_pessoas, usecols_secundario = self._required_columns(
+                    selected_columns_pessoas, selected_columns_secundario, filters=filters
+                )
+                report_progress(control, "load")
+                df_pessoas = self._load_excel(path_pessoas, header_row=1, usecols=usecols_pessoas)
+                if not os.path.exists(path_secundario):
+                    raise FileNotFoundError(f"Arquivo não encontrado: {path_secundario}")
+                header_secundario = read_header(path_secundario, header_row=1, engine=self.reader)
 
-            # 2. Validar colunas selecionadas
-            self._validate_selected_columns(
-                df_pessoas, df_secundario,
-                selected_columns_pessoas, selected_columns_secundario
-            )
+                # 2. Validar seleções antes de começar a ler os blocos
+                self._validate_selected_columns(
+                    df_pessoas, pd.DataFrame(columns=header_secundario),
+                    selected_columns_pessoas, selected_columns_secundario
+                )
+                if "ID Pessoal" not in selected_columns_pessoas:
+                    raise ValueError("'ID Pessoal' deve estar selecionado em Pessoas")
+                if "ID Pessoal" not in selected_columns_secundario:
+                    raise ValueError("'ID Pessoal' deve estar selecionado em Registros/Níveis")
+                apply_filters(pd.DataFrame(columns=header_secundario), filters)
 
-            # 3. Validar que "ID Pessoal" está em ambas seleções
-            if "ID Pessoal" not in selected_columns_pessoas:
-                raise ValueError("'ID Pessoal' deve estar selecionado em Pessoas")
-            if "ID Pessoal" not in selected_columns_secundario:
-                raise ValueError("'ID Pessoal' deve estar selecionado em Registros/Níveis")
-
-            # 4. Criar banco de dados temporário
-            temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-            db_path = temp_db.name
-            temp_db.close()
-
-            # 5. Inserir dados em tabelas SQLite
-            conn = sqlite3.connect(db_path)
-            df_pessoas.to_sql('Pessoas', conn, if_exists='replace', index=False)
-            df_secundario.to_sql('Secundario', conn, if_exists='replace', index=False)
-
-            # 6. Construir SELECT dinamicamente
-            colunas_sql = self._build_select_list(
-                selected_columns_secundario,
-                selected_columns_pessoas
-            )
+                # 3. Indexar Pessoas uma única vez
+                colunas = select_columns(selected_columns_secundario, selected_columns_pessoas)
+                with self._phase("indice_pessoas", linhas_entrada=len(df_pessoas)):
+                    table = HashJoinTable(
+                        df_pessoas,
+                        [col for tabela, col in colunas if tabela == "Pessoas"]
+                    )
+
+            except MergeCancelled:
+                raise
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Arquivo não encontrado: {str(e)}")
+            except ValueError as e:
+                raise ValueError(f"Erro de validação: {str(e)}")
+            except Exception as e:
+                raise ValueError(f"Erro ao processar merge: {str(e)}")
+        except Exception as e:
+            self._finish_run(metrics, owner, e)
+            raise
 
-            # 7. Construir e executar query
-            query = self._build_query(colunas_sql, sort_column, sort_order)
-            df_result = pd.read_sql_query(query, conn)
-            conn.close()
+        # Os blocos são lidos depois que merge_chunks() retorna: a execução
+        # é encerrada pelo próprio iterador, ao terminar
+        if owner:
+            self._metrics = None
+        chunks = self._iter_joined_chunks(
+            table, path_secundario, usecols_secundario,
+            [col for tabela, col in colunas if tabela == "Secundario"],
+            chunksize, control, filters, self.reader, metrics, self.compact
+        )
+        return self._finish_after(chunks, metrics) if owner else chunks
 
-            return df_result
+    @staticmethod
+    def _iter_joined_chunks(
+        table: HashJoinTable,
+        path_secundario: str,
+        usecols_secundario: List[str],
+        colunas_secundario: List[str],
+        chunksize: int,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None,
+        reader: str = AUTO_ENGINE,
+        metrics: Optional[RunMetrics] = None,
+        compact: bool = False
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lê o arquivo secundário em blocos, filtra e une cada bloco com Pessoas.
 
-        except FileNotFoundError as e:
-            raise FileNotFoundError(f"Arquivo não encontrado: {str(e)}")
+        Com compact=True, cada bloco passa pela mesma conversão de tipos da
+        planilha inteira (ver _compact), para que o resultado em blocos tenha
+        os mesmos tipos do resultado de merge().
+        """
+        try:
+            with measure_phase(
+                metrics, "blocos",
+                arquivo=os.path.basename(path_secundario), bytes_lidos=file_size(path_secundario)
+            ) as fase:
+                rows = 0
+                joined = 0
+                for chunk in iter_excel_chunks(
+                    path_secundario, header_row=1,
+                    chunksize=chunksize, usecols=usecols_secundario, engine=reader
+                ):
+                    rows += len(chunk)
+                    fase["linhas_entrada"] = rows
+                    report_progress(control, "join", rows)
+                    if compact:
+                        chunk, _ = compact_dtypes(chunk, date_columns(list(chunk.columns)))
+                    chunk = apply_filters(chunk, filters)
+                    if len(chunk):
+                        chunk = table.probe(chunk, colunas_secundario)
+                        joined += len(chunk)
+                        fase["linhas_saida"] = joined
+                        yield chunk
         except ValueError as e:
-            raise ValueError(f"Erro de validação: {str(e)}")
-        except Exception as e:
             raise ValueError(f"Erro ao processar merge: {str(e)}")
-        finally:
-            # 8. Limpar arquivo temporário
-            if db_path and os.path.exists(db_path):
-                try:
-                    os.remove(db_path)
-                except:
-                    pass  # Ignorar erro ao deletar arquivo temporário
 
     @staticmethod
-    def _load_excel(file_path: str, header_row: int = 1) -> pd.DataFrame:
+    def _finish_after(
+        chunks: Iterator[pd.DataFrame],
+        metrics: RunMetrics
+    ) -> Iterator[pd.DataFrame]:
+        """Entrega os blocos e encerra as métricas da execução quando eles terminam."""
+        erro = None
+        try:
+            yield from chunks
+        except Exception as e:
+            erro = e
+            raise
+        finally:
+            metrics.finish(erro)
+
+    def preview(
+        self,
+        path_pessoas: str,
+        path_secundario: str,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        page_size: int = DEFAULT_PREVIEW_ROWS,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None
+    ) -> MergePreview:
         """
-        Carrega um arquivo Excel com tratamento de erros.
+        Calcula somente as primeiras linhas do resultado, para conferir a seleção de colunas.
+
+        O arquivo secundário é lido em blocos do tamanho da página (ver
+        merge_chunks) e a leitura para assim que a primeira página está
+        completa; as páginas seguintes são calculadas sob demanda por
+        MergePreview.page(). As linhas seguem a ordem do arquivo secundário,
+        sem ordenação, modo de saída ou resumos; os filtros são aplicados.
+
+        Args:
+            path_pessoas: Caminho do arquivo de pessoas
+            path_secundario: Caminho do arquivo secundário (níveis ou registros)
+            selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
+            selected_columns_secundario: Lista de colunas selecionadas do arquivo secundário
+            page_size: Linhas por página
+            control: Canal de progresso/cancelamento do cálculo da primeira página (opcional)
+            filters: Filtros de linhas do arquivo secundário (opcional)
+
+        Returns:
+            Prévia com a primeira página já calculada (feche com close())
+
+        Raises:
+            ValueError: Se houver erro na validação ou processamento
+            FileNotFoundError: Se os arquivos não existem
+            MergeCancelled: Se o cancelamento foi solicitado via control
+        """
+        def open_chunks(page_control: TaskControl) -> Iterator[pd.DataFrame]:
+            metrics, owner = self._start_run("preview", [path_pessoas, path_secundario])
+            try:
+                chunks = self.merge_chunks(
+                    path_pessoas, path_secundario,
+                    selected_columns_pessoas, selected_columns_secundario,
+                    chunksize=page_size, control=page_control, filters=filters
+                )
+            except Exception as e:
+                self._finish_run(metrics, owner, e)
+                raise
+            if not owner:
+                return chunks
+            # Como em merge_chunks(), a execução termina com o iterador
+            self._metrics = None
+            return self._finish_after(chunks, metrics)
+
+        preview = MergePreview(open_chunks, page_size, control)
+        try:
+            preview.page(0, control)
+        except BaseException:
+            preview.close()
+            raise
+        return preview
+
+    def merge_report(
+        self,
+        path_pessoas: str,
+        path_secundario: str,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        aggregations: Dict,
+        output_path: str,
+        detail_path: Optional[str] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None
+    ) -> Dict[str, int]:
+        """
+        Calcula resumos do merge enquanto as linhas passam pela junção em streaming.
+
+        O merge é feito bloco a bloco (ver merge_chunks); cada bloco atualiza
+        os resumos (ver aggregations.normalize_aggregations) e, se pedido, é
+        gravado no detalhe, sem que o resultado completo fique em memória.
+        Cada resumo vira uma planilha de output_path. O detalhe segue a
+        ordem do arquivo secundário.
+
+        As colunas usadas pelos resumos são lidas de qualquer uma das
+        planilhas, mesmo que não estejam selecionadas; o detalhe contém
+        somente as colunas selecionadas.
+
+        Args:
+            path_pessoas: Caminho do arquivo de pessoas
+            path_secundario: Caminho do arquivo secundário (níveis ou registros)
+            selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
+            selected_columns_secundario: Lista de colunas selecionadas do arquivo secundário
+            aggregations: Definições dos resumos {nome: {"por": [...], "medidas": {...}}}
+            output_path: Arquivo .xlsx dos resumos
+            detail_path: Arquivo do detalhe. None: somente os resumos; igual a
+                         output_path: detalhe na primeira planilha e resumos em seguida
+            chunksize: Número de linhas secundárias por bloco
+            control: Canal de progresso/cancelamento (opcional)
+            filters: Filtros de linhas do arquivo secundário (opcional)
+
+        Returns:
+            Dicionário {nome da planilha: linhas gravadas}, com o detalhe em "detalhe"
+
+        Raises:
+            ValueError: Se houver erro na validação ou processamento
+            FileNotFoundError: Se os arquivos não existem
+            MergeCancelled: Se o cancelamento foi solicitado via control
+        """
+        with self._run("merge_report", [path_pessoas, path_secundario]):
+            try:
+                # 1. Validar os resumos e localizar as colunas usadas por eles
+                aggregations = normalize_aggregations(aggregations)
+                if not aggregations:
+                    raise ValueError("Informe ao menos um resumo")
+                for path in (path_pessoas, path_secundario):
+                    if not os.path.exists(path):
+                        raise FileNotFoundError(path)
+                header_pessoas = read_header(path_pessoas, header_row=1, engine=self.reader)
+                header_secundario = read_header(path_secundario, header_row=1, engine=self.reader)
+
+                colunas_pessoas = list(selected_columns_pessoas)
+                colunas_secundario = list(selected_columns_secundario)
+                missing = []
+                for col in aggregation_columns(aggregations):
+                    if col in colunas_secundario or col in colunas_pessoas:
+                        continue
+                    if col in header_secundario:
+                        colunas_secundario.append(col)
+                    elif col in header_pessoas:
+                        colunas_pessoas.append(col)
+                    else:
+                        missing.append(col)
+                if missing:
+                    raise ValueError(
+                        f"Colunas dos resumos não encontradas nas planilhas: {', '.join(missing)}"
+                    )
+                colunas_detalhe = [
+                    col for _, col in select_columns(selected_columns_secundario, selected_columns_pessoas)
+                ]
+
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Arquivo não encontrado: {str(e)}")
+            except ValueError as e:
+                raise ValueError(f"Erro de validação: {str(e)}")
+            except Exception as e:
+                raise ValueError(f"Erro ao processar merge: {str(e)}")
+
+            # 2. Percorrer os blocos do merge, atualizando resumos e detalhe
+            #    (merge_chunks já informa os próprios erros)
+            chunks = self.merge_chunks(
+                path_pessoas, path_secundario,
+                colunas_pessoas, colunas_secundario,
+                chunksize=chunksize, control=control, filters=filters
+            )
+            try:
+                aggregator = StreamingAggregator(aggregations)
+                # Em caso de erro ou cancelamento, __exit__ descarta os arquivos
+                # temporários das planilhas (ver ExcelStreamWriter.abort)
+                with contextlib.ExitStack() as writers:
+                    writer = writers.enter_context(ExcelStreamWriter(output_path))
+                    detail_writer = None
+                    if detail_path == output_path:
+                        detail_writer = writer
+                    elif detail_path is not None:
+                        detail_writer = writers.enter_context(ExcelStreamWriter(detail_path))
+
+                    with self._phase("resumos"):
+                        for chunk in chunks:
+                            aggregator.update(chunk)
+                            if detail_writer is not None:
+                                detail_writer.write(chunk[colunas_detalhe])
+
+                    # 3. Gravar os resumos (o fechamento dos arquivos grava o detalhe)
+                    report_progress(control, "write")
+                    with self._phase("gravacao") as fase:
+                        linhas = {}
+                        if detail_writer is not None:
+                            linhas["detalhe"] = detail_writer.rows_written
+                        for name, df in aggregator.results().items():
+                            linhas[name] = writer.add_sheet(name, df)
+                        writers.close()
+                        fase["linhas_saida"] = sum(linhas.values())
+                        fase["bytes_gravados"] = sum(
+                            file_size(path) or 0 for path in {output_path, detail_path} if path
+                        )
+                return linhas
+
+            except (ValueError, MergeCancelled):
+                raise
+            except Exception as e:
+                raise ValueError(f"Erro ao gravar os resumos: {str(e)}")
+
+    def merge_incremental(
+        self,
+        config_name: str,
+        path_pessoas: str,
+        path_secundario: str,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        watermark_column: str = DEFAULT_WATERMARK_COLUMN,
+        state_store: Optional[MergeStateStore] = None,
+        reset: bool = False,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None
+    ) -> pd.DataFrame:
+        """
+        Realiza o merge incremental de uma exportação cumulativa.
+
+        O estado de cada configuração guarda a marca d'água (maior valor de
+        watermark_column já processado) e o resultado anterior. Uma nova
+        exportação tem somente as linhas posteriores à marca d'água unidas e
+        acrescentadas ao resultado; se Pessoas mudou, apenas as linhas dos
+        "ID Pessoal" afetados são unidas novamente. A junção é sempre a
+        junção hash, independentemente do backend configurado.
+
+        As estatísticas da execução ficam em self.last_incremental_stats.
+
+        Args:
+            config_name: Nome da configuração (identifica o estado salvo)
+            path_pessoas: Caminho do arquivo de pessoas
+            path_secundario: Caminho da exportação cumulativa (registros)
+            selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
+            selected_columns_secundario: Lista de colunas selecionadas do arquivo secundário
+            sort_column: Coluna para ordenação (opcional)
+            sort_order: Ordem de ordenação ("ASC" ou "DESC", padrão: "DESC")
+            watermark_column: Coluna de referência (padrão: "Horário")
+            state_store: Armazenamento dos estados (padrão: ~/.worksheet-merge/state/)
+            reset: Descarta o estado anterior e refaz o merge completo
+            control: Canal de progresso/cancelamento (opcional)
+            filters: Filtros de linhas do arquivo secundário (alterá-los reinicia o estado)
+
+        Returns:
+            DataFrame com o resultado completo (linhas anteriores e novas)
+
+        Raises:
+            ValueError: Se houver erro na validação ou processamento
+            FileNotFoundError: Se os arquivos não existem
+            MergeCancelled: Se o cancelamento foi solicitado via control
+        """
+        if state_store is None:
+            state_store = MergeStateStore()
+
+        with self._run("merge_incremental", [path_pessoas, path_secundario]):
+            try:
+                # 1. Carregar as planilhas (incluindo a coluna de referência)
+                filters = normalize_filters(filters)
+                usecols_pessoas, usecols_secundario = self._required_columns(
+                    selected_columns_pessoas, selected_columns_secundario, sort_column, filters
+                )
+                if watermark_column not in usecols_secundario:
+                    usecols_secundario.append(watermark_column)
+                report_progress(control, "load", 0, 2)
+                df_pessoas = self._load_excel(path_pessoas, header_row=1, usecols=usecols_pessoas)
+                report_progress(control, "load", 1, 2)
+                df_secundario = self._load_excel(path_secundario, header_row=1, usecols=usecols_secundario)
+                report_progress(control, "load", 2, 2)
+
+                # 2. Validar seleções
+                self._validate_selected_columns(
+                    df_pessoas, df_secundario,
+                    selected_columns_pessoas, selected_columns_secundario
+                )
+                if "ID Pessoal" not in selected_columns_pessoas:
+                    raise ValueError("'ID Pessoal' deve estar selecionado em Pessoas")
+                if "ID Pessoal" not in selected_columns_secundario:
+                    raise ValueError("'ID Pessoal' deve estar selecionado em Registros/Níveis")
+                if watermark_column not in df_secundario.columns:
+                    raise ValueError(
+                        f"Coluna de referência não encontrada em Registros/Níveis: {watermark_column}"
+                    )
+                if sort_column and sort_column not in df_secundario.columns:
+                    raise ValueError(
+                        f"Coluna de ordenação não encontrada em Registros/Níveis: {sort_column}"
+                    )
+
+                # 3. Unir somente as linhas novas e as chaves afetadas
+                colunas = select_columns(selected_columns_secundario, selected_columns_pessoas)
+                with self._phase("juncao_incremental", linhas_entrada=len(df_secundario)) as fase:
+                    df_result, self.last_incremental_stats = run_incremental(
+                        state_store,
+                        config_name,
+                        df_pessoas,
+                        df_secundario,
+                        [col for tabela, col in colunas if tabela == "Pessoas"],
+                        [col for tabela, col in colunas if tabela == "Secundario"],
+                        sort_column=sort_column,
+                        sort_order=sort_order,
+                        watermark_column=watermark_column,
+                        reset=reset,
+                        control=control,
+                        filters=filters
+                    )
+                    fase["linhas_saida"] = len(df_result)
+                return df_result
+
+            except MergeCancelled:
+                raise
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Arquivo não encontrado: {str(e)}")
+            except ValueError as e:
+                raise ValueError(f"Erro de validação: {str(e)}")
+            except Exception as e:
+                raise ValueError(f"Erro ao processar merge: {str(e)}")
+
+    def merge_batch(
+        self,
+        path_pessoas: str,
+        paths_secundario: List[str],
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        sort_order: str = "DESC",
+        output_paths: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None,
+        output_mode: str = DEFAULT_OUTPUT_MODE,
+        limit: Optional[int] = None,
+        output_format: Optional[str] = None,
+        output_options: Optional[Dict] = None
+    ):
+        """
+        Mescla vários arquivos secundários com a mesma planilha de Pessoas.
+
+        Pessoas é carregada e indexada uma única vez; os arquivos secundários
+        são lidos e unidos em paralelo em um pool de processos (sempre com a
+        junção hash, independentemente do backend configurado).
+
+        Args:
+            path_pessoas: Caminho do arquivo de pessoas
+            paths_secundario: Caminhos dos arquivos secundários
+            selected_columns_pessoas: Lista de colunas selecionadas da planilha de pessoas
+            selected_columns_secundario: Lista de colunas selecionadas dos arquivos secundários
+            sort_column: Coluna para ordenação, de Registros/Níveis ou de Pessoas (opcional)
+            sort_order: Ordem de ordenação ("ASC" ou "DESC", padrão: "DESC")
+            output_paths: Um arquivo de saída por arquivo secundário. Se omitido,
+                          os resultados são concatenados em um único DataFrame
+            max_workers: Número de processos (padrão: número de CPUs)
+            control: Canal de progresso/cancelamento (opcional)
+            filters: Filtros de linhas dos arquivos secundários (opcional)
+            output_mode: Modo de saída (ver merge()); aplicado a cada arquivo e,
+                         sem output_paths, ao resultado concatenado
+            limit: Limite do modo de saída (ver merge())
+            output_format: Formato dos arquivos de output_paths (padrão: deduzido da extensão)
+            output_options: Opções do formato de saída (ver output_writers.get_writer)
+
+        Returns:
+            DataFrame concatenado (e ordenado), ou, com output_paths, lista de
+            dicionários {"secundario", "saida", "linhas", "chaves", "erro"} por arquivo
+
+        Raises:
+            ValueError: Se houver erro na validação ou processamento (as colunas
+                        selecionadas são validadas no header de cada arquivo
+                        secundário antes de iniciar os processos)
+            FileNotFoundError: Se o arquivo de Pessoas não existe
+            MergeCancelled: Se o cancelamento foi solicitado via control
+        """
+        if output_paths is not None and len(output_paths) != len(paths_secundario):
+            raise ValueError("Informe um arquivo de saída para cada arquivo secundário")
+
+        with self._run("merge_batch", [path_pessoas, *paths_secundario]):
+            try:
+                # 1. Carregar e indexar Pessoas uma única vez
+                filters = normalize_filters(filters)
+                limit = validate_output_mode(output_mode, sort_column, limit)
+                if output_mode == "unsorted":
+                    sort_column = None
+                usecols_pessoas, usecols_secundario = self._required_columns(
+                    selected_columns_pessoas, selected_columns_secundario, sort_column, filters
+                )
+                report_progress(control, "load")
+                df_pessoas = self._load_excel(path_pessoas, header_row=1, usecols=usecols_pessoas)
+
+                if "ID Pessoal" not in selected_columns_pessoas:
+                    raise ValueError("'ID Pessoal' deve estar selecionado em Pessoas")
+                if "ID Pessoal" not in selected_columns_secundario:
+                    raise ValueError("'ID Pessoal' deve estar selecionado em Registros/Níveis")
+
+                # 2. Validar as colunas de cada arquivo secundário antes de
+                #    iniciar os processos (somente o header é lido)
+                _, obrigatorias = self._required_columns(
+                    selected_columns_pessoas, selected_columns_secundario, filters=filters
+                )
+                headers = self._read_headers(paths_secundario)
+                self._validate_selected_columns(
+                    df_pessoas, pd.DataFrame(),
+                    selected_columns_pessoas, []
+                )
+                for path, header in headers.items():
+                    try:
+                        self._validate_selected_columns(
+                            df_pessoas, pd.DataFrame(columns=header), [], obrigatorias
+                        )
+                    except ValueError as e:
+                        raise ValueError(f"{path}: {str(e)}")
+
+                # A coluna de ordenação vem dos arquivos secundários, se todos a
+                # têm, ou de Pessoas; só as colunas que vêm dos arquivos
+                # secundários são exigidas deles
+                sort_source = None
+                if sort_column:
+                    if headers and all(sort_column in header for header in headers.values()):
+                        sort_source = "Secundario"
+                    elif sort_column in df_pessoas.columns:
+                        sort_source = "Pessoas"
+                    elif headers:
+                        raise ValueError(
+                            "Coluna de ordenação não encontrada em Registros/Níveis "
+                            f"nem em Pessoas: {sort_column}"
+                        )
+                    else:
+                        sort_source = "Secundario"  # Nenhum header lido: cada processo informa o erro
+                if sort_source != "Secundario":
+                    usecols_secundario = obrigatorias
+
+                colunas = select_columns(selected_columns_secundario, selected_columns_pessoas)
+                colunas_pessoas = [col for tabela, col in colunas if tabela == "Pessoas"]
+                drop_sort_column = False
+                if sort_source == "Pessoas" and sort_column not in colunas_pessoas:
+                    colunas_pessoas.append(sort_column)  # Necessária para ordenar depois da junção
+                    drop_sort_column = True
+                with self._phase("indice_pessoas", linhas_entrada=len(df_pessoas)):
+                    table = HashJoinTable(df_pessoas, colunas_pessoas)
+
+                # 3. Processar os arquivos secundários em paralelo
+                #    (as fases de cada processo não são medidas individualmente)
+                with self._phase(
+                    "lote", arquivos=len(paths_secundario),
+                    bytes_lidos=sum(file_size(path) or 0 for path in paths_secundario)
+                ) as fase:
+                    result = run_batch(
+                        table,
+                        paths_secundario,
+                        [col for tabela, col in colunas if tabela == "Secundario"],
+                        usecols_secundario,
+                        sort_column=sort_column,
+                        sort_order=sort_order,
+                        output_paths=output_paths,
+                        max_workers=max_workers,
+                        control=control,
+                        filters=filters,
+                        compact=self.compact,
+                        sort_source=sort_source,
+                        drop_sort_column=drop_sort_column,
+                        reader=self.reader,
+                        output_mode=output_mode,
+                        limit=limit,
+                        output_format=output_format,
+                        output_options=output_options
+                    )
+                    fase["linhas_saida"] = (
+                        len(result) if isinstance(result, pd.DataFrame)
+                        else sum(item["linhas"] or 0 for item in result)
+                    )
+                    if output_paths is not None:
+                        fase["bytes_gravados"] = sum(file_size(path) or 0 for path in output_paths)
+                return result
+
+            except MergeCancelled:
+                raise
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Arquivo não encontrado: {str(e)}")
+            except ValueError as e:
+                raise ValueError(f"Erro de validação: {str(e)}")
+            except Exception as e:
+                raise ValueError(f"Erro ao processar merge: {str(e)}")
+
+    def _merge_frames(
+        self,
+        df_pessoas: pd.DataFrame,
+        df_secundario: pd.DataFrame,
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str],
+        sort_order: str,
+        control: Optional[TaskControl] = None,
+        filters: Optional[Dict] = None,
+        output_mode: str = DEFAULT_OUTPUT_MODE,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Filtra as linhas secundárias, valida as seleções e executa o LEFT JOIN.
+
+        Nos modos de seleção, com a coluna de ordenação em Registros/Níveis,
+        as linhas são selecionadas antes da junção (somente elas são unidas e
+        ordenadas); com a coluna em Pessoas, depois da junção.
+        """
+        # 1. Validar colunas selecionadas
+        self._validate_selected_columns(
+            df_pessoas, df_secundario,
+            selected_columns_pessoas, selected_columns_secundario
+        )
+
+        # 2. Validar que "ID Pessoal" está em ambas seleções
+        if "ID Pessoal" not in selected_columns_pessoas:
+            raise ValueError("'ID Pessoal' deve estar selecionado em Pessoas")
+        if "ID Pessoal" not in selected_columns_secundario:
+            raise ValueError("'ID Pessoal' deve estar selecionado em Registros/Níveis")
+
+        # 3. Descartar as linhas rejeitadas pelos filtros antes da junção
+        if filters:
+            with self._phase("filtros", linhas_entrada=len(df_secundario)) as fase:
+                df_secundario = apply_filters(df_secundario, filters)
+                fase["linhas_saida"] = len(df_secundario)
+
+        # 4. Selecionar as linhas do modo de saída antes da junção, se possível
+        if output_mode == "unsorted":
+            sort_column = None
+        tabela_ordenacao = sort_table(df_pessoas, df_secundario, sort_column)
+        selecionar = output_mode in SELECTION_MODES
+        colunas_pessoas = list(selected_columns_pessoas)
+        if selecionar and tabela_ordenacao == "Secundario":
+            with self._phase("selecao", linhas_entrada=len(df_secundario)) as fase:
+                df_secundario = select_rows(df_secundario, output_mode, sort_column, sort_order, limit)
+                fase["linhas_saida"] = len(df_secundario)
+        elif selecionar and sort_column not in colunas_pessoas:
+            colunas_pessoas.append(sort_column)  # Necessária para selecionar depois da junção
+
+        # 5. Executar a junção
+        report_progress(control, "join")
+        with self._phase(
+            "juncao", linhas_entrada=len(df_secundario), backend=self.backend.name
+        ) as fase:
+            df_result = self.backend.join(
+                df_pessoas, df_secundario,
+                colunas_pessoas, selected_columns_secundario,
+                sort_column, sort_order,
+                control=control,
+                metrics=self._metrics
+            )
+            fase["linhas_saida"] = len(df_result)
+        self.last_key_stats = self.backend.last_key_stats
+
+        # 6. Completar a seleção (chaves duplicadas em Pessoas replicam linhas)
+        if selecionar and tabela_ordenacao == "Secundario":
+            if output_mode == "top_n":
+                df_result = df_result.iloc[:limit]
+        elif selecionar:
+            with self._phase("selecao", linhas_entrada=len(df_result)) as fase:
+                df_result = select_rows(df_result, output_mode, sort_column, sort_order, limit)
+                fase["linhas_saida"] = len(df_result)
+            if sort_column not in selected_columns_pessoas and sort_column not in selected_columns_secundario:
+                df_result = df_result.drop(columns=[sort_column])
+        df_result = df_result.reset_index(drop=True)
+
+        report_progress(control, "join", len(df_result), len(df_result))
+        return df_result
+
+    def _load_excel(
+        self,
+        file_path: str,
+        header_row: int = 1,
+        usecols: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Carrega um arquivo Excel com tratamento de erros, reaproveitando os caches.
+
+        Com compact=True, a planilha é convertida para tipos compactos uma
+        única vez, antes de entrar no cache em memória; o relatório da
+        conversão fica em self.last_memory_report[file_path].
 
         Args:
             file_path: Caminho do arquivo
             header_row: Linha que contém o header (0-indexed)
+            usecols: Colunas a carregar (padrão: todas)
 
         Returns:
             DataFrame com os dados
@@ -108,14 +952,128 @@ class MergeEngine:
             FileNotFoundError: Se o arquivo não existe
             ValueError: Se há erro ao ler o arquivo
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+        with self._phase("carga", arquivo=os.path.basename(file_path)) as fase:
+            df = load_workbook(
+                file_path,
+                header_row=header_row,
+                cache=self.cache,
+                usecols=usecols,
+                disk_cache=self.disk_cache,
+                postprocess=self._compact if self.compact else None,
+                engine=self.reader,
+                stats=fase
+            )
+            fase["linhas_saida"] = len(df)
+            if fase.get("origem") == "planilha":
+                fase["bytes_lidos"] = file_size(file_path)
+        self.last_memory_report[file_path] = [
+            item for item in df.attrs.get("compactacao", [])
+            if item["coluna"] in df.columns
+        ]
+        return df
+
+    def _start_run(self, operacao: str, arquivos: Iterable[str] = ()) -> Tuple[RunMetrics, bool]:
+        """
+        Inicia as métricas de uma operação.
 
+        Uma operação chamada por outra (merge_chunks() dentro de
+        merge_report()) registra as fases na execução que já está em andamento.
+
+        Returns:
+            Tupla (métricas, True se a execução foi iniciada aqui)
+        """
+        if self._metrics is not None:
+            return self._metrics, False
+        self._metrics = self.last_metrics = RunMetrics(
+            operacao, arquivos, self.metrics_hooks, self.run_log
+        )
+        return self._metrics, True
+
+    def _finish_run(
+        self,
+        metrics: RunMetrics,
+        owner: bool,
+        erro: Optional[BaseException] = None
+    ) -> None:
+        """Encerra e grava a execução, se ela foi iniciada pela operação (ver _start_run)."""
+        if owner:
+            self._metrics = None
+            metrics.finish(erro)
+
+    @contextlib.contextmanager
+    def _run(self, operacao: str, arquivos: Iterable[str] = ()) -> Iterator[RunMetrics]:
+        """Mede uma operação inteira; o erro registrado é a mensagem final da exceção."""
+        metrics, owner = self._start_run(operacao, arquivos)
+        erro = None
         try:
-            df = pd.read_excel(file_path, header=header_row)
-            return df
+            yield metrics
         except Exception as e:
-            raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
+            erro = e
+            raise
+        finally:
+            self._finish_run(metrics, owner, erro)
+
+    def _phase(self, nome: str, **campos):
+        """Mede uma fase da execução em andamento (ver metrics.RunMetrics.phase)."""
+        return measure_phase(self._metrics, nome, **campos)
+
+    @staticmethod
+    def _compact(df: pd.DataFrame) -> pd.DataFrame:
+        """Converte uma planilha recém-lida para tipos compactos, guardando o relatório."""
+        df, report = compact_dtypes(df, date_columns(list(df.columns)))
+        df.attrs["compactacao"] = report
+        return df
+
+    @staticmethod
+    def _required_columns(
+        selected_columns_pessoas: List[str],
+        selected_columns_secundario: List[str],
+        sort_column: Optional[str] = None,
+        filters: Optional[Dict] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Calcula as colunas que precisam ser lidas de cada planilha.
+
+        Args:
+            selected_columns_pessoas: Colunas selecionadas de pessoas
+            selected_columns_secundario: Colunas selecionadas do arquivo secundário
+            sort_column: Coluna para ordenação (opcional)
+            filters: Filtros de linhas do arquivo secundário (opcional)
+
+        Returns:
+            Tupla (colunas de pessoas, colunas do arquivo secundário)
+        """
+        colunas_pessoas = list(dict.fromkeys([*selected_columns_pessoas, JOIN_KEY]))
+        colunas_secundario = list(dict.fromkeys([*selected_columns_secundario, JOIN_KEY]))
+        if sort_column:
+            # A coluna pode ser de qualquer uma das planilhas (colunas
+            # inexistentes são ignoradas na leitura)
+            if sort_column not in colunas_secundario:
+                colunas_secundario.append(sort_column)
+            if sort_column not in colunas_pessoas:
+                colunas_pessoas.append(sort_column)
+        for col in filter_columns(filters):
+            if col not in colunas_secundario:
+                colunas_secundario.append(col)
+        return colunas_pessoas, colunas_secundario
+
+    def _read_headers(self, paths: List[str]) -> Dict[str, List]:
+        """
+        Lê o header de cada arquivo secundário.
+
+        Arquivos ausentes ou ilegíveis ficam de fora: o erro é informado pelo
+        processo que tentar carregá-los, junto com o resultado desse arquivo.
+
+        Returns:
+            Dicionário {caminho: colunas} dos arquivos lidos
+        """
+        headers = {}
+        for path in paths:
+            try:
+                headers[path] = read_header(path, header_row=1, engine=self.reader)
+            except Exception:
+                continue
+        return headers
 
     @staticmethod
     def _validate_selected_columns(
@@ -155,65 +1113,3 @@ class MergeEngine:
             raise ValueError(
                 f"Colunas não encontradas em Registros/Níveis: {', '.join(missing_secundario)}"
             )
-
-    @staticmethod
-    def _build_select_list(
-        selected_secundario: List[str],
-        selected_pessoas: List[str]
-    ) -> str:
-        """
-        Constrói a lista de colunas para SELECT SQL.
-
-        Ordem: Todas colunas de Secundário + Colunas de Pessoas não duplicadas
-
-        Args:
-            selected_secundario: Colunas selecionadas do arquivo secundário
-            selected_pessoas: Colunas selecionadas de pessoas
-
-        Returns:
-            String formatada para SQL
-        """
-        colunas_sql = []
-
-        # 1. Adicionar todas colunas de Secundário
-        for col in selected_secundario:
-            colunas_sql.append(f'Secundario."{col}"')
-
-        # 2. Adicionar colunas de Pessoas que não estão em Secundário
-        for col in selected_pessoas:
-            # Verificar se a coluna já está em Secundário (evitar duplicação)
-            if col not in selected_secundario:
-                colunas_sql.append(f'Pessoas."{col}"')
-
-        return ", ".join(colunas_sql)
-
-    @staticmethod
-    def _build_query(
-        colunas_sql: str,
-        sort_column: Optional[str] = None,
-        sort_order: str = "DESC"
-    ) -> str:
-        """
-        Constrói a query SQL completa.
-
-        Args:
-            colunas_sql: String com colunas para SELECT
-            sort_column: Coluna para ordenação
-            sort_order: ASC ou DESC
-
-        Returns:
-            Query SQL completa
-        """
-        query = f"""
-        SELECT {colunas_sql}
-        FROM Secundario
-        LEFT JOIN Pessoas ON Secundario."ID Pessoal" = Pessoas."ID Pessoal"
-        """
-
-        # Adicionar ORDER BY se fornecido
-        if sort_column:
-            # Determinar qual tabela contém a coluna
-            # Tentativa 1: Assume que é de Secundário
-            query += f'\nORDER BY Secundario."{sort_column}" {sort_order}'
-
-        return query
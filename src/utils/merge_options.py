@@ -0,0 +1,86 @@
+"""Opções do merge oferecidas na interface e na linha de comando (sem pandas, para que a interface abra rápido)."""
+import os
+from typing import Optional
+
+
+# Coluna de junção das planilhas
+JOIN_KEY = "ID Pessoal"
+
+# Modos de saída e seus nomes na interface
+OUTPUT_MODES = {
+    "sorted": "Ordenado",
+    "top_n": "Primeiros N",
+    "latest_per_person": "Últimos por pessoa",
+    "unsorted": "Ordem original",
+}
+
+DEFAULT_OUTPUT_MODE = "sorted"
+
+# Colunas oferecidas no painel de filtros da interface
+DATE_FILTER_COLUMN = "Horário"
+VALUE_FILTER_COLUMNS = ["Nome da Área", "Nome do Dispositivo", "Nível do Evento", "ID Pessoal"]
+
+# Coluna de data/hora dos eventos e coluna derivada com o dia do evento
+TIME_COLUMN = "Horário"
+DAY_COLUMN = "Dia"
+
+# Resumos prontos oferecidos na interface e na linha de comando
+PRESET_AGGREGATIONS = {
+    "Por pessoa": {
+        "por": [JOIN_KEY],
+        "medidas": {"Eventos": "count", "Primeiro": f"min:{TIME_COLUMN}", "Último": f"max:{TIME_COLUMN}"},
+    },
+    "Por área": {
+        "por": ["Nome da Área"],
+        "medidas": {"Eventos": "count"},
+    },
+    "Por dia": {
+        "por": [DAY_COLUMN],
+        "medidas": {"Eventos": "count"},
+    },
+    "Entrada e saída": {
+        "por": [JOIN_KEY, DAY_COLUMN],
+        "medidas": {"Entrada": f"min:{TIME_COLUMN}", "Saída": f"max:{TIME_COLUMN}"},
+    },
+}
+
+# Formatos do arquivo de saída, seus nomes na interface e suas extensões
+OUTPUT_FORMATS = {
+    "xlsx": "Excel",
+    "csv": "CSV",
+    "parquet": "Parquet",
+    "sqlite": "SQLite",
+}
+
+OUTPUT_EXTENSIONS = {
+    "xlsx": [".xlsx"],
+    "csv": [".csv", ".txt"],
+    "parquet": [".parquet", ".pq"],
+    "sqlite": [".sqlite", ".db", ".sqlite3"],
+}
+
+DEFAULT_OUTPUT_FORMAT = "xlsx"
+
+# Opções padrão dos formatos de saída (ver output_writers)
+DEFAULT_CSV_ENCODING = "utf-8"
+DEFAULT_CSV_DELIMITER = ","
+DEFAULT_ROW_GROUP_ROWS = 100000
+DEFAULT_SQLITE_TABLE = "resultado"
+
+
+def format_for_path(path: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Formato de saída correspondente à extensão de um arquivo.
+
+    Args:
+        path: Caminho do arquivo de saída
+        default: Formato retornado quando a extensão não é reconhecida
+
+    Returns:
+        Chave de OUTPUT_FORMATS, ou default
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for output_format, extensions in OUTPUT_EXTENSIONS.items():
+        if extension in extensions:
+            return output_format
+    return default
@@ -0,0 +1,371 @@
+"""Métricas por fase do merge (tempo, CPU, memória, linhas e bytes) e registro das execuções em JSON."""
+import contextlib
+import datetime
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .config_manager import DEFAULT_CONFIG_DIR
+
+try:
+    import psutil
+except ImportError:  # psutil é opcional: sem ele a memória vem de /proc e do módulo resource
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Função chamada ao fim de cada fase, com o registro da fase
+MetricsHook = Callable[[Dict], None]
+
+# Quantidade máxima de execuções guardadas no registro (as mais antigas são apagadas)
+MAX_RUN_LOGS = 200
+
+
+def current_rss() -> Optional[int]:
+    """Memória residente atual do processo, em bytes (None se não há como medir)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Pico de memória residente do processo desde o início, em bytes (None se não há como medir)."""
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        if hasattr(info, "peak_wset"):  # Windows
+            return info.peak_wset
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KiB; macOS, em bytes
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    return None
+
+
+def file_size(path: str) -> Optional[int]:
+    """Tamanho do arquivo em bytes (None se não existe)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def format_bytes(size: int) -> str:
+    """Tamanho em bytes legível (KiB/MiB)."""
+    if abs(size) >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MiB"
+    return f"{size / 1024:.1f} KiB"
+
+
+class RunMetrics:
+    """
+    Métricas de uma execução do merge, fase a fase.
+
+    Cada fase registra tempo de relógio e de CPU, a memória residente ao
+    final (atual e pico do processo), linhas de entrada e de saída e bytes
+    lidos e gravados. As fases podem ser aninhadas (por exemplo, a carga no
+    SQLite dentro da junção): cada registro indica a fase que o contém em
+    "pai". Os ganchos são chamados ao fim de cada fase.
+
+    O tempo de CPU é o do processo inteiro; o trabalho feito em outros
+    processos (merge em lote) não entra nele.
+    """
+
+    def __init__(
+        self,
+        operacao: str,
+        arquivos: Iterable[str] = (),
+        hooks: Iterable[MetricsHook] = (),
+        run_log: Optional["RunLog"] = None
+    ):
+        """
+        Inicia a execução.
+
+        Args:
+            operacao: Nome da operação ("merge", "merge_batch", ...)
+            arquivos: Arquivos de entrada
+            hooks: Funções chamadas ao fim de cada fase com o registro da fase
+            run_log: Registro em que a execução é gravada ao terminar (opcional)
+        """
+        self.operacao = operacao
+        self.arquivos = list(arquivos)
+        self.inicio = datetime.datetime.now()
+        self.fases: List[Dict] = []
+        self.segundos: Optional[float] = None
+        self.erro: Optional[str] = None
+        self.log_path: Optional[str] = None
+
+        self._hooks = list(hooks)
+        self._run_log = run_log
+        self._start = time.perf_counter()
+        self._stack: List[str] = []
+        self._finished = False
+
+    @contextlib.contextmanager
+    def phase(
+        self,
+        nome: str,
+        linhas_entrada: Optional[int] = None,
+        bytes_lidos: Optional[int] = None,
+        **extra
+    ) -> Iterator[Dict]:
+        """
+        Mede uma fase.
+
+        O registro da fase é entregue ao bloco, que pode preencher
+        "linhas_saida", "bytes_gravados" ou outros campos:
+
+            with metrics.phase("juncao", linhas_entrada=len(df)) as fase:
+                df_result = ...
+                fase["linhas_saida"] = len(df_result)
+
+        Args:
+            nome: Nome da fase
+            linhas_entrada: Linhas recebidas pela fase (opcional)
+            bytes_lidos: Bytes lidos de disco (opcional)
+            **extra: Campos adicionais do registro (por exemplo, "arquivo")
+
+        Yields:
+            Registro da fase
+        """
+        registro = {
+            "fase": nome,
+            "pai": self._stack[-1] if self._stack else None,
+            "inicio": round(time.perf_counter() - self._start, 4),
+            "segundos": None,
+            "cpu_segundos": None,
+            "rss_mb": None,
+            "rss_pico_mb": None,
+            "linhas_entrada": linhas_entrada,
+            "linhas_saida": None,
+            "bytes_lidos": bytes_lidos,
+            "bytes_gravados": None,
+            **extra,
+        }
+        self.fases.append(registro)
+        self._stack.append(nome)
+        inicio, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield registro
+        except Exception as e:
+            registro["erro"] = str(e) or type(e).__name__
+            raise
+        finally:
+            self._stack.pop()
+            registro["segundos"] = round(time.perf_counter() - inicio, 4)
+            registro["cpu_segundos"] = round(time.process_time() - cpu, 4)
+            rss = current_rss()
+            pico = peak_rss()
+            if rss is not None and pico is not None:
+                pico = max(pico, rss)  # As duas medidas vêm de fontes diferentes do sistema
+            registro["rss_mb"] = _to_mb(rss)
+            registro["rss_pico_mb"] = _to_mb(pico)
+            self._notify(registro)
+            if self._finished:
+                # Fase posterior ao fim da execução (por exemplo, a gravação)
+                self.segundos = round(time.perf_counter() - self._start, 4)
+                self.save()
+
+    def finish(self, erro: Optional[BaseException] = None) -> None:
+        """
+        Encerra a execução e a grava no registro.
+
+        Fases medidas depois (como a gravação do resultado) ainda entram na
+        execução, que é gravada novamente ao fim de cada uma.
+
+        Args:
+            erro: Exceção que interrompeu a execução (opcional)
+        """
+        self.segundos = round(time.perf_counter() - self._start, 4)
+        if erro is not None:
+            self.erro = str(erro) or type(erro).__name__
+        self._finished = True
+        self.save()
+
+    def save(self) -> Optional[str]:
+        """Grava a execução no registro, se houver. Retorna o caminho do arquivo."""
+        if self._run_log is not None:
+            self.log_path = self._run_log.write(self.to_dict(), self.log_path)
+        return self.log_path
+
+    def to_dict(self) -> Dict:
+        """Execução como dicionário serializável em JSON."""
+        return {
+            "operacao": self.operacao,
+            "inicio": self.inicio.isoformat(timespec="milliseconds"),
+            "segundos": self.segundos,
+            "arquivos": self.arquivos,
+            "erro": self.erro,
+            "fases": self.fases,
+        }
+
+    def _notify(self, registro: Dict) -> None:
+        for hook in self._hooks:
+            try:
+                hook(registro)
+            except Exception:
+                pass  # Um gancho com erro não interrompe o merge
+
+
+def measure_phase(metrics: Optional[RunMetrics], nome: str, **campos):
+    """
+    Mede uma fase se houver uma execução em andamento.
+
+    Returns:
+        Contexto de RunMetrics.phase(), ou, sem metrics, um contexto que
+        entrega um registro descartável
+    """
+    if metrics is None:
+        return contextlib.nullcontext({})
+    return metrics.phase(nome, **campos)
+
+
+def format_metrics(run: Dict) -> List[str]:
+    """
+    Descreve as fases de uma execução em linhas de texto, com as fases internas recuadas.
+
+    Args:
+        run: Execução (RunMetrics.to_dict() ou um arquivo do registro)
+
+    Returns:
+        Lista de linhas
+    """
+    linhas = []
+    niveis: Dict[str, int] = {}
+    for fase in run["fases"]:
+        nivel = niveis.get(fase["pai"], -1) + 1 if fase["pai"] else 0
+        niveis[fase["fase"]] = nivel
+
+        texto = f"{'  ' * nivel}{fase['fase']}"
+        if fase.get("arquivo"):
+            texto += f" ({fase['arquivo']}"
+            texto += f", {fase['origem']})" if fase.get("origem") else ")"
+        texto += f": {fase['segundos'] if fase['segundos'] is not None else '?'} s"
+        if fase["cpu_segundos"] is not None:
+            texto += f", CPU {fase['cpu_segundos']} s"
+        entrada, saida = fase["linhas_entrada"], fase["linhas_saida"]
+        if entrada is not None and saida is not None:
+            texto += f", {entrada} -> {saida} linhas"
+        elif saida is not None:
+            texto += f", {saida} linhas"
+        elif entrada is not None:
+            texto += f", {entrada} linhas de entrada"
+        if fase["bytes_lidos"]:
+            texto += f", lidos {format_bytes(fase['bytes_lidos'])}"
+        if fase["bytes_gravados"]:
+            texto += f", gravados {format_bytes(fase['bytes_gravados'])}"
+        if fase["rss_mb"] is not None:
+            texto += f", RSS {fase['rss_mb']} MiB (pico {fase['rss_pico_mb']} MiB)"
+        if fase.get("erro"):
+            texto += f", erro: {fase['erro']}"
+        linhas.append(texto)
+
+    total = f"Total: {run['segundos']} s"
+    if run.get("erro"):
+        total += f" (erro: {run['erro']})"
+    linhas.append(total)
+    return linhas
+
+
+class RunLog:
+    """
+    Registro das execuções: um arquivo JSON por execução.
+
+    Guarda as MAX_RUN_LOGS execuções mais recentes em ~/.worksheet-merge/runs/.
+    Falhas de gravação são ignoradas: o registro nunca interrompe um merge.
+    """
+
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        max_files: int = MAX_RUN_LOGS,
+        enabled: bool = True
+    ):
+        """
+        Inicializa o registro.
+
+        Args:
+            log_dir: Diretório dos arquivos (padrão: ~/.worksheet-merge/runs/)
+            max_files: Quantidade máxima de execuções guardadas
+            enabled: Permite desativar o registro
+        """
+        self.log_dir = log_dir or os.path.join(DEFAULT_CONFIG_DIR, "runs")
+        self.max_files = max_files
+        self.enabled = enabled
+
+    def write(self, run: Dict, path: Optional[str] = None) -> Optional[str]:
+        """
+        Grava uma execução.
+
+        Args:
+            run: Execução (RunMetrics.to_dict())
+            path: Arquivo a sobrescrever (uma execução já gravada); padrão: um novo arquivo
+
+        Returns:
+            Caminho do arquivo, ou None se o registro está desativado ou falhou
+        """
+        if not self.enabled:
+            return None
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            novo = path is None
+            if novo:
+                inicio = datetime.datetime.fromisoformat(run["inicio"])
+                path = os.path.join(
+                    self.log_dir, f"{inicio:%Y%m%d-%H%M%S-%f}-{run['operacao']}.json"
+                )
+            temp_path = path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(run, f, ensure_ascii=False, indent=2, default=str)
+            os.replace(temp_path, path)
+            if novo:
+                self._prune()
+            return path
+        except OSError:
+            return None
+
+    def list_runs(self) -> List[str]:
+        """Arquivos das execuções registradas, da mais recente para a mais antiga."""
+        try:
+            nomes = [nome for nome in os.listdir(self.log_dir) if nome.endswith(".json")]
+        except OSError:
+            return []
+        return [os.path.join(self.log_dir, nome) for nome in sorted(nomes, reverse=True)]
+
+    @staticmethod
+    def load(path: str) -> Dict:
+        """Lê uma execução registrada."""
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _prune(self) -> None:
+        """Apaga as execuções mais antigas além de max_files."""
+        for path in self.list_runs()[self.max_files:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Ignorar erro ao apagar um registro antigo
+
+
+_default_run_log: Optional[RunLog] = None
+
+
+def get_default_run_log() -> RunLog:
+    """Retorna o registro de execuções padrão (~/.worksheet-merge/runs/)."""
+    global _default_run_log
+    if _default_run_log is None:
+        _default_run_log = RunLog()
+    return _default_run_log
+
+
+def _to_mb(value: Optional[int]) -> Optional[float]:
+    return None if value is None else round(value / (1024 * 1024), 1)
@@ -0,0 +1,200 @@
+"""Modos de saída do merge: ordenado, primeiros N, últimos por pessoa ou ordem original."""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .join_backends import JOIN_KEY, sort_frame
+from .join_keys import normalize_keys
+from .merge_options import DEFAULT_OUTPUT_MODE, OUTPUT_MODES
+
+# Modos que selecionam linhas e por isso dependem da coluna de ordenação e de um limite
+SELECTION_MODES = ("top_n", "latest_per_person")
+
+
+def validate_output_mode(
+    output_mode: str,
+    sort_column: Optional[str],
+    limit: Optional[int]
+) -> Optional[int]:
+    """
+    Valida o modo de saída e o limite.
+
+    Args:
+        output_mode: Um dos OUTPUT_MODES
+        sort_column: Coluna de ordenação
+        limit: N de "top_n" (obrigatório) ou K de "latest_per_person" (padrão: 1)
+
+    Returns:
+        Limite efetivo (None nos modos sem limite)
+
+    Raises:
+        ValueError: Se o modo, a coluna de ordenação ou o limite são inválidos
+    """
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(
+            f"Modo de saída desconhecido: {output_mode} (opções: {', '.join(OUTPUT_MODES)})"
+        )
+    if output_mode not in SELECTION_MODES:
+        return None
+
+    if not sort_column:
+        raise ValueError(f"O modo de saída '{output_mode}' requer uma coluna de ordenação")
+    if limit is None:
+        if output_mode == "top_n":
+            raise ValueError("Informe o número de linhas do modo 'top_n'")
+        limit = 1
+    if int(limit) < 1:
+        raise ValueError(f"O limite do modo '{output_mode}' deve ser positivo: {limit}")
+    return int(limit)
+
+
+def select_rows(
+    df: pd.DataFrame,
+    output_mode: str,
+    sort_column: Optional[str],
+    sort_order: str = "DESC",
+    limit: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Seleciona e ordena as linhas conforme o modo de saída.
+
+    - "sorted": todas as linhas, ordenadas (sem coluna, na ordem original);
+    - "top_n": as limit primeiras linhas da ordenação, sem ordenar o resto;
+    - "latest_per_person": as limit primeiras linhas de cada "ID Pessoal"
+      (linhas sem ID são descartadas), na ordem da ordenação;
+    - "unsorted": todas as linhas, na ordem original.
+
+    O resultado é sempre igual ao início (ou a um filtro) da ordenação
+    completa e estável de sort_frame().
+
+    Args:
+        df: Linhas a selecionar
+        output_mode: Um dos OUTPUT_MODES
+        sort_column: Coluna de ordenação
+        sort_order: ASC ou DESC
+        limit: Limite já validado (ver validate_output_mode)
+
+    Returns:
+        DataFrame selecionado
+    """
+    if output_mode == "unsorted" or not sort_column:
+        return df
+    if output_mode == "top_n":
+        return top_rows(df, sort_column, sort_order, limit)
+    if output_mode == "latest_per_person":
+        return latest_per_key(df, sort_column, sort_order, limit)
+    return sort_frame(df, sort_column, sort_order)
+
+
+def top_rows(df: pd.DataFrame, column: str, sort_order: str, n: int) -> pd.DataFrame:
+    """
+    As n primeiras linhas da ordenação estável de column, por seleção parcial.
+
+    As posições são escolhidas com np.argpartition (O(n)); somente as linhas
+    escolhidas são ordenadas. Colunas com tipos misturados, que não podem
+    ser convertidas para números, usam a ordenação completa.
+
+    Args:
+        df: Linhas a selecionar
+        column: Coluna de ordenação
+        sort_order: ASC ou DESC
+        n: Número de linhas
+
+    Returns:
+        DataFrame com as n primeiras linhas, ordenadas
+    """
+    if n >= len(df):
+        return sort_frame(df, column, sort_order)
+
+    values = _rank_values(df[column])
+    if values is None:
+        return sort_frame(df, column, sort_order).iloc[:n]
+
+    # Nulos vêm primeiro em ASC e por último em DESC, como em sort_frame()
+    ascending = sort_order.upper() != "DESC"
+    nulls = df[column].isna().to_numpy(dtype=bool)
+    null_positions = np.flatnonzero(nulls)
+    valid_positions = np.flatnonzero(~nulls)
+    if ascending:
+        chosen_nulls = null_positions[:n]
+        remaining = n - len(chosen_nulls)
+    else:
+        remaining = min(n, len(valid_positions))
+        chosen_nulls = null_positions[:n - remaining]
+
+    valid = values[valid_positions]
+    chosen = _smallest(valid if ascending else -valid, remaining)
+    positions = np.sort(np.concatenate([chosen_nulls, valid_positions[chosen]]))
+    return sort_frame(df.iloc[positions], column, sort_order)
+
+
+def latest_per_key(
+    df: pd.DataFrame,
+    column: str,
+    sort_order: str,
+    k: int,
+    key: str = JOIN_KEY
+) -> pd.DataFrame:
+    """
+    As k primeiras linhas de cada chave na ordenação de column.
+
+    Com DESC e uma coluna de data/hora, são os k eventos mais recentes de
+    cada pessoa. As chaves são comparadas normalizadas (ver join_keys);
+    linhas sem chave são descartadas.
+
+    Args:
+        df: Linhas a selecionar
+        column: Coluna de ordenação
+        sort_order: ASC ou DESC
+        k: Linhas por chave
+        key: Coluna da chave (padrão: "ID Pessoal")
+
+    Returns:
+        DataFrame com as linhas selecionadas, na ordem da ordenação
+    """
+    ordered = sort_frame(df, column, sort_order)
+    codes, _ = pd.factorize(normalize_keys(ordered[key]))
+    rank = pd.Series(codes).groupby(codes, sort=False).cumcount().to_numpy()
+    return ordered[(codes >= 0) & (rank < k)]
+
+
+def _smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Posições dos k menores valores; empates ficam com as primeiras posições.
+
+    Returns:
+        Posições (fora de ordem) dos valores escolhidos
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(values):
+        return np.arange(len(values))
+
+    threshold = values[np.argpartition(values, k - 1)[k - 1]]
+    below = np.flatnonzero(values < threshold)
+    ties = np.flatnonzero(values == threshold)[:k - len(below)]
+    return np.concatenate([below, ties])
+
+
+def _rank_values(series: pd.Series) -> Optional[np.ndarray]:
+    """
+    Valores numéricos com a mesma ordem da coluna (nulos com valor arbitrário).
+
+    Returns:
+        Array numérico, ou None se a coluna não pode ser convertida
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.DatetimeIndex(series).asi8
+    if pd.api.types.is_timedelta64_dtype(series):
+        return pd.TimedeltaIndex(series).asi8
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # sort_values() ordena categorias pela ordem das categorias
+        return series.cat.codes.to_numpy()
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    try:
+        codes, _ = pd.factorize(series, sort=True)
+    except TypeError:
+        return None  # Números e textos misturados
+    return codes
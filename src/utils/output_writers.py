@@ -0,0 +1,736 @@
+"""Gravação incremental do resultado do merge (Excel, CSV, Parquet e SQLite)."""
+import codecs
+import datetime
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Type, Union
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from .background import MergeCancelled, TaskControl, report_progress
+from .merge_options import (
+    DEFAULT_CSV_DELIMITER,
+    DEFAULT_CSV_ENCODING,
+    DEFAULT_OUTPUT_FORMAT,
+    DEFAULT_ROW_GROUP_ROWS,
+    DEFAULT_SQLITE_TABLE,
+    OUTPUT_FORMATS,
+    format_for_path,
+)
+from .metrics import RunMetrics, file_size, measure_phase
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # pyarrow é opcional: sem ele o formato Parquet fica indisponível
+    pyarrow = None
+    parquet = None
+
+
+# Limite de linhas de uma planilha do Excel (incluindo o header)
+EXCEL_MAX_ROWS = 1048576
+
+# Linhas por fatia ao gravar um DataFrame inteiro (granularidade de progresso/cancelamento)
+WRITE_SLICE_ROWS = 10000
+
+
+class ExcelStreamWriter:
+    """
+    Grava um .xlsx linha a linha com o modo write-only do openpyxl.
+
+    As linhas são enviadas em blocos (DataFrames) e não ficam acumuladas em
+    memória. Quando uma planilha atinge o limite de linhas do Excel, a
+    gravação continua em uma nova planilha ("Sheet1 (2)", "Sheet1 (3)", ...),
+    repetindo o header. Planilhas adicionais (por exemplo, resumos) podem ser
+    acrescentadas ao final com add_sheet().
+    """
+
+    name = "xlsx"
+    options = ("sheet_name", "max_rows")
+
+    def __init__(
+        self,
+        path: str,
+        sheet_name: str = "Sheet1",
+        max_rows: int = EXCEL_MAX_ROWS
+    ):
+        """
+        Prepara a gravação.
+
+        Args:
+            path: Caminho do arquivo .xlsx de saída
+            sheet_name: Nome da primeira planilha
+            max_rows: Máximo de linhas por planilha, incluindo o header
+        """
+        if max_rows < 2:
+            raise ValueError("Cada planilha deve comportar o header e ao menos uma linha")
+
+        self.path = path
+        self.sheet_name = sheet_name
+        self.max_rows = max_rows
+        self.rows_written = 0
+        self.sheet_count = 0
+
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._columns: Optional[List[str]] = None
+        self._extra_sheets: List[str] = []
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Grava um bloco de linhas.
+
+        Args:
+            chunk: DataFrame com as linhas (todos os blocos devem ter as mesmas colunas)
+        """
+        if self._extra_sheets:
+            raise ValueError("Não é possível gravar linhas depois de add_sheet()")
+        if self._columns is None:
+            self._columns = [str(col) for col in chunk.columns]
+            self._new_sheet()
+
+        if chunk.empty:
+            return
+
+        for row in _rows(chunk):
+            if self._sheet_rows >= self.max_rows:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+            self.rows_written += 1
+
+    def add_sheet(self, sheet_name: str, df: pd.DataFrame) -> int:
+        """
+        Grava um DataFrame inteiro em uma nova planilha, depois das anteriores.
+
+        Depois de add_sheet(), write() não pode mais ser usado (o modo
+        write-only do openpyxl grava as planilhas em sequência).
+
+        Args:
+            sheet_name: Nome da planilha (até 31 caracteres)
+            df: Linhas da planilha (no máximo max_rows - 1)
+
+        Returns:
+            Número de linhas de dados gravadas
+
+        Raises:
+            ValueError: Se o DataFrame não cabe em uma planilha
+        """
+        if len(df) >= self.max_rows:
+            raise ValueError(
+                f"A planilha '{sheet_name}' tem {len(df)} linhas, acima do limite do Excel"
+            )
+        sheet = self._workbook.create_sheet(title=sheet_name[:31])
+        sheet.append([str(col) for col in df.columns])
+        for row in _rows(df):
+            sheet.append(row)
+        self._extra_sheets.append(sheet_name)
+        return len(df)
+
+    def close(self) -> None:
+        """Finaliza e salva o arquivo (um arquivo parcial é removido em caso de erro)."""
+        if self._sheet is None and not self._extra_sheets:
+            # Nenhum bloco recebido: gravar uma planilha vazia
+            self._columns = self._columns or []
+            self._new_sheet()
+
+        try:
+            self._workbook.save(self.path)
+        except Exception:
+            if os.path.exists(self.path):
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass  # Ignorar erro ao remover arquivo parcial
+            raise
+
+    def abort(self) -> None:
+        """
+        Descarta a gravação (o arquivo só é criado em close()).
+
+        No modo write-only, cada planilha grava suas linhas em um arquivo
+        temporário do openpyxl, que só seria removido ao fim do processo:
+        os arquivos são fechados e removidos aqui.
+        """
+        if self._workbook is not None:
+            for sheet in self._workbook.worksheets:
+                _discard_sheet(sheet)
+        self._workbook = None
+        self._sheet = None
+
+    def _new_sheet(self) -> None:
+        """Cria a próxima planilha e grava o header."""
+        self.sheet_count += 1
+        title = self.sheet_name
+        if self.sheet_count > 1:
+            title = f"{self.sheet_name} ({self.sheet_count})"
+
+        self._sheet = self._workbook.create_sheet(title=title)
+        self._sheet_rows = 0
+        if self._columns:
+            self._sheet.append(self._columns)
+            self._sheet_rows = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class _TempFileWriter:
+    """
+    Base dos formatos gravados bloco a bloco em um arquivo temporário.
+
+    Os blocos vão para "<destino>.tmp", que só substitui o destino em
+    close(): em caso de erro ou cancelamento, o arquivo de destino não é
+    alterado e o temporário é removido.
+    """
+
+    name = ""
+    options: tuple = ()
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+        self._temp_path = f"{path}.tmp"
+        self._columns: Optional[List[str]] = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Grava um bloco de linhas.
+
+        Args:
+            chunk: DataFrame com as linhas (todos os blocos devem ter as mesmas colunas)
+        """
+        if self._columns is None:
+            self._columns = [str(col) for col in chunk.columns]
+            self._open(chunk.iloc[:0])
+        if chunk.empty:
+            return
+        self._write(chunk)
+        self.rows_written += len(chunk)
+
+    def close(self) -> None:
+        """Finaliza o arquivo temporário e o move para o destino."""
+        try:
+            if self._columns is None:
+                # Nenhum bloco recebido: gravar um arquivo sem linhas
+                self._columns = []
+                self._open(pd.DataFrame())
+            self._finish()
+            self._close()
+            os.replace(self._temp_path, self.path)
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Descarta a gravação e remove o arquivo temporário."""
+        try:
+            self._close()
+        except Exception:
+            pass  # O arquivo temporário é removido de qualquer forma
+        if os.path.exists(self._temp_path):
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass  # Ignorar erro ao remover arquivo parcial
+
+    def _open(self, empty: pd.DataFrame) -> None:
+        """Cria o arquivo temporário (empty tem as colunas e os tipos do primeiro bloco)."""
+        raise NotImplementedError
+
+    def _write(self, chunk: pd.DataFrame) -> None:
+        """Grava um bloco não vazio."""
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        """Grava o que ainda estiver pendente antes de fechar o arquivo."""
+
+    def _close(self) -> None:
+        """Fecha o arquivo temporário (pode ser chamado mais de uma vez)."""
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class CsvStreamWriter(_TempFileWriter):
+    """Grava um .csv bloco a bloco, com codificação e delimitador configuráveis."""
+
+    name = "csv"
+    options = ("encoding", "delimiter")
+
+    def __init__(
+        self,
+        path: str,
+        encoding: str = DEFAULT_CSV_ENCODING,
+        delimiter: str = DEFAULT_CSV_DELIMITER
+    ):
+        """
+        Prepara a gravação.
+
+        Args:
+            path: Caminho do arquivo .csv de saída
+            encoding: Codificação do texto (por exemplo, "utf-8", "utf-8-sig" ou "latin-1")
+            delimiter: Separador de campos (um caractere, por exemplo "," ou ";")
+
+        Raises:
+            ValueError: Se a codificação ou o delimitador são inválidos
+        """
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise ValueError(f"Codificação desconhecida: {encoding}")
+        if len(delimiter) != 1:
+            raise ValueError(f"O delimitador do CSV deve ter um único caractere: '{delimiter}'")
+
+        super().__init__(path)
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self._file = None
+
+    def _open(self, empty: pd.DataFrame) -> None:
+        self._file = open(self._temp_path, "w", encoding=self.encoding, newline="")
+        empty.to_csv(self._file, sep=self.delimiter, index=False)
+
+    def _write(self, chunk: pd.DataFrame) -> None:
+        chunk.to_csv(self._file, sep=self.delimiter, index=False, header=False)
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetStreamWriter(_TempFileWriter):
+    """
+    Grava um .parquet em grupos de linhas (row groups) de tamanho fixo.
+
+    Os blocos são acumulados até completar um grupo, e cada grupo é gravado
+    assim que fica completo: a memória usada é a de um grupo, não a do
+    resultado inteiro. O schema é definido pelo primeiro grupo; colunas sem
+    nenhum valor nele são gravadas como texto.
+
+    Requer o pacote opcional pyarrow.
+    """
+
+    name = "parquet"
+    options = ("row_group_size", "compression")
+
+    def __init__(
+        self,
+        path: str,
+        row_group_size: int = DEFAULT_ROW_GROUP_ROWS,
+        compression: str = "snappy"
+    ):
+        """
+        Prepara a gravação.
+
+        Args:
+            path: Caminho do arquivo .parquet de saída
+            row_group_size: Linhas por grupo
+            compression: Compressão dos grupos ("snappy", "zstd", "gzip" ou "none")
+
+        Raises:
+            ValueError: Se o pyarrow não está instalado ou as opções são inválidas
+        """
+        if parquet is None:
+            raise ValueError("O formato Parquet requer o pacote pyarrow")
+        if row_group_size <= 0:
+            raise ValueError("O número de linhas por grupo deve ser maior que zero")
+
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self._writer = None
+        self._schema = None
+        self._empty: Optional[pd.DataFrame] = None
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered_rows = 0
+
+    def _open(self, empty: pd.DataFrame) -> None:
+        self._empty = empty
+
+    def _write(self, chunk: pd.DataFrame) -> None:
+        self._buffer.append(chunk)
+        self._buffered_rows += len(chunk)
+        if self._buffered_rows >= self.row_group_size:
+            data = pd.concat(self._buffer, ignore_index=True)
+            cut = len(data) - len(data) % self.row_group_size
+            self._write_group(data.iloc[:cut])
+            rest = data.iloc[cut:]
+            self._buffer = [rest] if len(rest) else []
+            self._buffered_rows = len(rest)
+
+    def _finish(self) -> None:
+        if self._buffer:
+            self._write_group(pd.concat(self._buffer, ignore_index=True))
+            self._buffer = []
+            self._buffered_rows = 0
+        elif self._writer is None:
+            self._write_group(self._empty)
+
+    def _write_group(self, data: pd.DataFrame) -> None:
+        """Converte as linhas para o Arrow e grava em grupos de row_group_size."""
+        table = _arrow_table(data, self._schema)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = parquet.ParquetWriter(
+                self._temp_path, self._schema, compression=self.compression
+            )
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+    def _close(self) -> None:
+        self._buffer = []
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class SQLiteTableWriter:
+    """
+    Grava o resultado em uma tabela de um banco SQLite.
+
+    O arquivo é persistente: outras tabelas do banco são preservadas e uma
+    tabela de mesmo nome é substituída. Toda a gravação ocorre em uma única
+    transação, confirmada em close(); em caso de erro ou cancelamento, o
+    banco volta ao estado anterior. Se nenhum bloco é recebido, as colunas
+    do resultado são desconhecidas e a tabela existente é mantida. Datas são
+    gravadas como texto ISO ("AAAA-MM-DD HH:MM:SS").
+    """
+
+    name = "sqlite"
+    options = ("table",)
+
+    def __init__(self, path: str, table: str = DEFAULT_SQLITE_TABLE):
+        """
+        Prepara a gravação.
+
+        Args:
+            path: Caminho do banco (.sqlite/.db), criado se não existir
+            table: Nome da tabela
+
+        Raises:
+            ValueError: Se o nome da tabela é vazio
+        """
+        if not table or not table.strip():
+            raise ValueError("Informe o nome da tabela SQLite")
+
+        self.path = path
+        self.table = table.strip()
+        self.rows_written = 0
+        self._created = not os.path.exists(path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._insert: Optional[str] = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Grava um bloco de linhas.
+
+        Args:
+            chunk: DataFrame com as linhas (todos os blocos devem ter as mesmas colunas)
+        """
+        if self._connection is None:
+            self._create_table(chunk)
+        if chunk.empty:
+            return
+        self._connection.executemany(self._insert, _sql_rows(chunk))
+        self.rows_written += len(chunk)
+
+    def close(self) -> None:
+        """Confirma a transação e fecha o banco."""
+        try:
+            if self._connection is None:
+                self._create_table(pd.DataFrame())
+            self._connection.execute("COMMIT")
+            self._connection.close()
+            self._connection = None
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Desfaz a transação (um banco criado por esta gravação é removido)."""
+        if self._connection is not None:
+            try:
+                self._connection.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass  # Nenhuma transação aberta
+            self._connection.close()
+            self._connection = None
+        if self._created and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass  # Ignorar erro ao remover arquivo parcial
+
+    def _create_table(self, chunk: pd.DataFrame) -> None:
+        """Abre a transação e recria a tabela com as colunas do primeiro bloco."""
+        tabela = _sql_name(self.table)
+        colunas = [
+            f"{_sql_name(str(col))} {_sql_type(chunk.iloc[:, i].dtype)}"
+            for i, col in enumerate(chunk.columns)
+        ]
+        self._connection = sqlite3.connect(self.path, isolation_level=None)
+        self._connection.execute("BEGIN")
+        if colunas:  # Sem nenhum bloco recebido não há colunas: manter a tabela existente
+            self._connection.execute(f"DROP TABLE IF EXISTS {tabela}")
+            self._connection.execute(f"CREATE TABLE {tabela} ({', '.join(colunas)})")
+        self._insert = (
+            f"INSERT INTO {tabela} VALUES ({', '.join('?' * len(chunk.columns))})"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+# Formatos de saída disponíveis, por nome (ver merge_options.OUTPUT_FORMATS)
+WRITERS: Dict[str, Type] = {
+    writer.name: writer
+    for writer in (ExcelStreamWriter, CsvStreamWriter, ParquetStreamWriter, SQLiteTableWriter)
+}
+
+
+def get_writer(path: str, output_format: Optional[str] = None, **options):
+    """
+    Cria o gravador de um formato de saída.
+
+    Args:
+        path: Caminho do arquivo de saída
+        output_format: Formato (ver WRITERS); se omitido, deduzido da extensão
+                       do arquivo (padrão: xlsx)
+        **options: Opções do formato (ver o atributo options de cada gravador)
+
+    Returns:
+        Gravador com write(), close() e abort(), utilizável com "with"
+
+    Raises:
+        ValueError: Se o formato ou alguma opção é inválida
+    """
+    if output_format is None:
+        output_format = format_for_path(path, DEFAULT_OUTPUT_FORMAT)
+    if output_format not in WRITERS:
+        raise ValueError(
+            f"Formato de saída desconhecido: {output_format} "
+            f"(opções: {', '.join(WRITERS)})"
+        )
+
+    writer = WRITERS[output_format]
+    invalid = [option for option in options if option not in writer.options]
+    if invalid:
+        raise ValueError(
+            f"Opções inválidas para o formato {output_format}: {', '.join(invalid)} "
+            f"(opções: {', '.join(writer.options) or 'nenhuma'})"
+        )
+    return writer(path, **options)
+
+
+def write_output(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    path: str,
+    output_format: Optional[str] = None,
+    options: Optional[Dict] = None,
+    control: Optional[TaskControl] = None,
+    metrics: Optional[RunMetrics] = None
+) -> int:
+    """
+    Grava o resultado do merge no formato escolhido, bloco a bloco.
+
+    Um iterador de blocos (por exemplo, MergeEngine.merge_chunks) é gravado
+    à medida que os blocos chegam, sem reunir o resultado em memória. Em
+    caso de erro, o arquivo de destino não é deixado pela metade.
+
+    Args:
+        data: DataFrame ou iterador de blocos
+        path: Caminho do arquivo de saída
+        output_format: Formato (ver WRITERS); se omitido, deduzido da extensão
+        options: Opções do formato (ver get_writer)
+        control: Canal de progresso/cancelamento (opcional)
+        metrics: Métricas do merge (por exemplo, MergeEngine.last_metrics), às
+                 quais a gravação é acrescentada como a fase "gravacao" (opcional)
+
+    Returns:
+        Número de linhas de dados gravadas
+
+    Raises:
+        ValueError: Se o formato é inválido ou há erro ao gravar o arquivo
+        MergeCancelled: Se o cancelamento foi solicitado via control
+    """
+    if output_format is None:
+        output_format = format_for_path(path, DEFAULT_OUTPUT_FORMAT)
+    writer = get_writer(path, output_format, **(options or {}))
+
+    total = None
+    if isinstance(data, pd.DataFrame):
+        total = len(data)
+        chunks = iter_slices(data, WRITE_SLICE_ROWS)
+    else:
+        chunks = data
+
+    try:
+        with measure_phase(metrics, "gravacao", linhas_entrada=total, formato=output_format) as fase:
+            with writer:
+                report_progress(control, "write", 0, total)
+                for chunk in chunks:
+                    writer.write(chunk)
+                    report_progress(control, "write", writer.rows_written, total)
+            fase["linhas_saida"] = writer.rows_written
+            fase["bytes_gravados"] = file_size(path)
+        return writer.rows_written
+    except (ValueError, MergeCancelled):
+        raise
+    except Exception as e:
+        raise ValueError(f"Erro ao gravar arquivo {OUTPUT_FORMATS[output_format]}: {str(e)}")
+
+
+def write_excel(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    path: str,
+    sheet_name: str = "Sheet1",
+    max_rows: int = EXCEL_MAX_ROWS,
+    control: Optional[TaskControl] = None,
+    metrics: Optional[RunMetrics] = None
+) -> int:
+    """
+    Grava o resultado do merge em .xlsx de forma incremental.
+
+    O arquivo só é criado depois que todos os blocos foram recebidos; em
+    caso de erro, nenhum arquivo parcial é deixado no destino.
+
+    Args:
+        data: DataFrame ou iterador de blocos (por exemplo, MergeEngine.merge_chunks)
+        path: Caminho do arquivo de saída
+        sheet_name: Nome da primeira planilha
+        max_rows: Máximo de linhas por planilha, incluindo o header
+        control: Canal de progresso/cancelamento (opcional)
+        metrics: Métricas do merge (por exemplo, MergeEngine.last_metrics), às
+                 quais a gravação é acrescentada como a fase "gravacao" (opcional)
+
+    Returns:
+        Número de linhas de dados gravadas
+
+    Raises:
+        ValueError: Se há erro ao gravar o arquivo
+        MergeCancelled: Se o cancelamento foi solicitado via control
+    """
+    return write_output(
+        data, path, "xlsx", {"sheet_name": sheet_name, "max_rows": max_rows},
+        control=control, metrics=metrics
+    )
+
+
+def _rows(df: pd.DataFrame) -> Iterable[tuple]:
+    """Linhas do DataFrame como tuplas, com None no lugar dos valores ausentes."""
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _discard_sheet(sheet) -> None:
+    """Fecha e remove o arquivo temporário de uma planilha write-only do openpyxl."""
+    rows = getattr(sheet, "_rows", None)
+    writer = getattr(sheet, "_writer", None)
+    try:
+        if rows is not None:
+            rows.close()
+        if writer is not None:
+            writer.close()
+            writer.cleanup()
+    except (OSError, ValueError):
+        pass  # Arquivo temporário já fechado ou removido
+
+
+def _arrow_table(df: pd.DataFrame, schema=None):
+    """
+    Converte um bloco para uma tabela do Arrow.
+
+    Sem schema, o tipo de cada coluna é deduzido dos valores; colunas sem
+    valores ou de tipos misturados viram texto. Com schema (grupos
+    seguintes), os valores são convertidos para os tipos já gravados.
+    """
+    arrays = []
+    fields = []
+    for i, col in enumerate(df.columns):
+        serie = df.iloc[:, i]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object)
+        field = schema.field(i) if schema is not None else None
+        try:
+            array = pyarrow.array(serie, type=field.type if field else None, from_pandas=True)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            if field is not None and not pyarrow.types.is_string(field.type):
+                raise ValueError(
+                    f"A coluna '{col}' tem valores incompatíveis com o tipo {field.type}"
+                )
+            array = pyarrow.array(
+                serie.astype(str).where(serie.notna(), None), type=pyarrow.string(), from_pandas=True
+            )
+        if field is None:
+            if pyarrow.types.is_null(array.type):
+                array = array.cast(pyarrow.string())
+            field = pyarrow.field(str(col), array.type)
+        arrays.append(array)
+        fields.append(field)
+    return pyarrow.Table.from_arrays(arrays, schema=pyarrow.schema(fields))
+
+
+def _sql_name(name: str) -> str:
+    """Nome de tabela/coluna entre aspas duplas, para o SQLite."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    """Afinidade de tipo do SQLite correspondente a um dtype do pandas."""
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _sql_value(value):
+    """Valor em um tipo aceito pelo sqlite3 (datas como texto ISO)."""
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def _sql_rows(df: pd.DataFrame) -> Iterable[tuple]:
+    """Linhas do DataFrame como tuplas de valores aceitos pelo sqlite3."""
+    for row in _rows(df):
+        yield tuple(_sql_value(value) for value in row)
+
+
+def iter_slices(df: pd.DataFrame, size: int) -> Iterable[pd.DataFrame]:
+    """Divide um DataFrame em fatias de até size linhas (ao menos uma fatia)."""
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
@@ -0,0 +1,159 @@
+"""Prévia paginada do resultado do merge, calculada sob demanda a partir dos blocos."""
+from typing import Callable, Iterator, List, Optional
+
+import pandas as pd
+
+from .background import TaskControl
+
+
+# Linhas por página da prévia
+DEFAULT_PREVIEW_ROWS = 200
+
+
+class _PageControl(TaskControl):
+    """
+    Repassa o progresso dos blocos ao TaskControl da página em cálculo.
+
+    Cada página é calculada por uma tarefa diferente, mas os blocos vêm de
+    um único iterador. O cancelamento é verificado pela prévia entre os
+    blocos, fora do iterador: cancelar uma página não invalida as seguintes.
+    """
+
+    def __init__(self, target: Optional[TaskControl] = None):
+        super().__init__()
+        self.target = target
+
+    def report(self, phase: str, current: Optional[int] = None, total: Optional[int] = None) -> None:
+        if self.target is not None:
+            self.target.report(phase, current, total)
+
+    def check_cancelled(self) -> None:
+        pass  # Verificado em MergePreview._fill
+
+
+class MergePreview:
+    """
+    Primeiras linhas do resultado do merge, página a página.
+
+    Os blocos do merge em streaming (MergeEngine.merge_chunks) são consumidos
+    somente até cobrir a página pedida: a primeira página custa a leitura
+    das primeiras linhas do arquivo secundário, não do arquivo inteiro. As
+    linhas já calculadas ficam guardadas, e voltar a uma página anterior não
+    lê nada. As linhas seguem a ordem do arquivo secundário.
+    """
+
+    def __init__(
+        self,
+        open_chunks: Callable[[TaskControl], Iterator[pd.DataFrame]],
+        page_size: int = DEFAULT_PREVIEW_ROWS,
+        control: Optional[TaskControl] = None
+    ):
+        """
+        Abre o iterador de blocos.
+
+        Args:
+            open_chunks: Função que recebe o canal de progresso e retorna o iterador de blocos
+            page_size: Linhas por página
+            control: Canal de progresso/cancelamento da abertura (opcional)
+
+        Raises:
+            ValueError: Se o tamanho da página é inválido
+        """
+        if page_size <= 0:
+            raise ValueError("O tamanho da página deve ser maior que zero")
+
+        self.page_size = page_size
+        self.columns: Optional[List[str]] = None
+        self.exhausted = False
+
+        self._frames: List[pd.DataFrame] = []
+        self._data: Optional[pd.DataFrame] = None
+        self._rows = 0
+        self._control = _PageControl(control)
+        self._chunks = open_chunks(self._control)
+        self._control.target = None
+
+    @property
+    def rows_loaded(self) -> int:
+        """Linhas do resultado já calculadas."""
+        return self._rows
+
+    def is_loaded(self, number: int) -> bool:
+        """Indica se a página pode ser exibida sem ler mais blocos."""
+        return self.exhausted or self._rows >= (number + 1) * self.page_size
+
+    def has_page(self, number: int) -> bool:
+        """Indica se a página existe ou ainda pode existir (blocos não lidos)."""
+        return number == 0 or (number > 0 and (number * self.page_size < self._rows or not self.exhausted))
+
+    def page(self, number: int, control: Optional[TaskControl] = None) -> pd.DataFrame:
+        """
+        Retorna as linhas de uma página, lendo somente os blocos que faltam.
+
+        Args:
+            number: Número da página (0 = primeira)
+            control: Canal de progresso/cancelamento (opcional)
+
+        Returns:
+            DataFrame com até page_size linhas (vazio além do fim do resultado)
+
+        Raises:
+            ValueError: Se o número da página é inválido
+            MergeCancelled: Se o cancelamento foi solicitado
+        """
+        if number < 0:
+            raise ValueError(f"Página inválida: {number}")
+        self._fill((number + 1) * self.page_size, control)
+
+        data = self._frame()
+        start = number * self.page_size
+        return data.iloc[start:start + self.page_size]
+
+    def close(self) -> None:
+        """
+        Fecha o arquivo secundário e encerra a execução do merge.
+
+        Se uma página está sendo calculada em outra thread, o iterador não
+        pode ser fechado agora: o arquivo é fechado quando ele for descartado.
+        """
+        self.exhausted = True
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                pass  # Iterador em execução em outra thread
+
+    def _fill(self, rows: int, control: Optional[TaskControl]) -> None:
+        """Consome blocos até ter ao menos rows linhas ou o resultado acabar."""
+        self._control.target = control
+        try:
+            while self._rows < rows and not self.exhausted:
+                if control is not None:
+                    control.check_cancelled()
+                try:
+                    chunk = next(self._chunks)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                except Exception:
+                    # O iterador não pode continuar depois de um erro
+                    self.exhausted = True
+                    raise
+                if self.columns is None:
+                    self.columns = list(chunk.columns)
+                self._frames.append(chunk)
+                self._rows += len(chunk)
+        finally:
+            self._control.target = None
+
+    def _frame(self) -> pd.DataFrame:
+        """Linhas já calculadas, em um único DataFrame."""
+        if self._frames:
+            if self._data is not None:
+                self._frames.insert(0, self._data)
+            self._data = pd.concat(self._frames, ignore_index=True)
+            self._frames = []
+        if self._data is None:
+            return pd.DataFrame(columns=self.columns)
+        return self._data
@@ -0,0 +1,133 @@
+"""Filtros de linhas do arquivo secundário, aplicados antes da junção."""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import coerce_dates
+from .merge_options import DATE_FILTER_COLUMN, VALUE_FILTER_COLUMNS
+
+
+def normalize_filters(filters: Optional[Dict]) -> Dict:
+    """
+    Valida uma especificação de filtros e remove os filtros vazios.
+
+    Cada coluna recebe uma lista de valores aceitos (por exemplo, áreas,
+    dispositivos ou uma lista de "ID Pessoal") ou um intervalo de datas
+    {"inicio": ..., "fim": ...}, com limites opcionais e inclusivos. Um
+    "fim" sem horário inclui o dia inteiro.
+
+    Exemplo:
+        {"Horário": {"inicio": "2024-01-01", "fim": "2024-01-31"},
+         "Nome da Área": ["Portaria", "Garagem"]}
+
+    Args:
+        filters: Especificação de filtros (None = sem filtros)
+
+    Returns:
+        Especificação validada, somente com os filtros efetivos
+
+    Raises:
+        ValueError: Se algum filtro é inválido
+    """
+    normalized = {}
+    for column, spec in (filters or {}).items():
+        if isinstance(spec, dict):
+            unknown = set(spec) - {"inicio", "fim"}
+            if unknown:
+                raise ValueError(
+                    f"Filtro inválido para '{column}': chaves desconhecidas {', '.join(sorted(unknown))}"
+                )
+            limites = {key: spec.get(key) for key in ("inicio", "fim") if spec.get(key) not in (None, "")}
+            for key, value in limites.items():
+                try:
+                    pd.Timestamp(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Data inválida no filtro de '{column}': {value}")
+            if limites:
+                normalized[column] = limites
+        elif isinstance(spec, (list, tuple, set)):
+            values = [value for value in spec if value not in (None, "")]
+            if values:
+                normalized[column] = values
+        else:
+            raise ValueError(
+                f"Filtro inválido para '{column}': use uma lista de valores ou {{'inicio', 'fim'}}"
+            )
+    return normalized
+
+
+def filter_columns(filters: Optional[Dict]) -> List[str]:
+    """Colunas usadas pelos filtros (precisam ser carregadas do arquivo secundário)."""
+    return list(filters or {})
+
+
+def apply_filters(df: pd.DataFrame, filters: Optional[Dict]) -> pd.DataFrame:
+    """
+    Mantém somente as linhas aceitas por todos os filtros.
+
+    Args:
+        df: DataFrame (ou bloco) do arquivo secundário
+        filters: Especificação já validada (ver normalize_filters)
+
+    Returns:
+        DataFrame filtrado (o próprio df, se não há filtros)
+
+    Raises:
+        ValueError: Se uma coluna filtrada não existe no DataFrame
+    """
+    if not filters:
+        return df
+
+    missing = [column for column in filters if column not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Colunas de filtro não encontradas em Registros/Níveis: {', '.join(missing)}"
+        )
+
+    mask = np.ones(len(df), dtype=bool)
+    for column, spec in filters.items():
+        if isinstance(spec, dict):
+            mask = mask & _date_range_mask(df[column], spec)
+        else:
+            mask = mask & df[column].isin(_accepted_values(spec)).to_numpy(dtype=bool)
+    if mask.all():
+        return df
+    return df[mask]
+
+
+def _date_range_mask(series: pd.Series, spec: Dict) -> np.ndarray:
+    """Linhas com data dentro do intervalo (datas inválidas ou vazias são rejeitadas)."""
+    dates = coerce_dates(series)
+    mask = dates.notna().to_numpy(dtype=bool)
+    if "inicio" in spec:
+        mask = mask & (dates >= pd.Timestamp(spec["inicio"])).to_numpy(dtype=bool)
+    if "fim" in spec:
+        fim = pd.Timestamp(spec["fim"])
+        if isinstance(spec["fim"], str) and len(spec["fim"].strip()) <= 10:
+            # Somente a data: incluir o dia inteiro
+            mask = mask & (dates < fim + pd.Timedelta(days=1)).to_numpy(dtype=bool)
+        else:
+            mask = mask & (dates <= fim).to_numpy(dtype=bool)
+    return mask
+
+
+def _accepted_values(values: List) -> set:
+    """
+    Valores aceitos, incluindo as formas texto/número de cada valor.
+
+    Assim "123" na lista aceita a célula numérica 123 (e vice-versa).
+    """
+    accepted = set()
+    for value in values:
+        accepted.add(value)
+        text = str(value).strip()
+        accepted.add(text)
+        try:
+            number = float(text)
+        except ValueError:
+            continue
+        if number.is_integer():
+            accepted.add(int(number))
+            accepted.add(str(int(number)))
+    return accepted
@@ -1,7 +1,8 @@
 """Funções auxiliares de interface para os scripts de mesclagem de planilhas."""
 import tkinter as tk
-from tkinter import filedialog
-from typing import List, Optional
+import unicodedata
+from tkinter import filedialog, ttk
+from typing import Dict, Iterable, List, Optional, Set
 
 
 def set_path(entry_field):
@@ -156,3 +157,204 @@ class CategoryFrame(tk.LabelFrame):
                 var.set(True)
             else:
                 var.set(col in columns)
+
+
+# Marcas de seleção exibidas na lista de colunas
+CHECKED = "\u2611"
+UNCHECKED = "\u2610"
+PARTIAL = "\u25a3"
+
+
+class ColumnChecklist(tk.Frame):
+    """
+    Lista de colunas com caixas de seleção, agrupadas por categoria.
+
+    Usa um único ttk.Treeview, que desenha somente as linhas visíveis: a
+    quantidade de colunas não altera o número de widgets, e trocar de
+    arquivo apenas substitui os itens da árvore. As colunas marcadas ficam
+    em um conjunto (selected), independente do que está visível.
+
+    Clicar em uma coluna (ou pressionar espaço) marca/desmarca a coluna;
+    clicar em uma categoria marca todas as suas colunas visíveis, ou
+    desmarca todas se já estavam marcadas. O campo de busca filtra as
+    colunas exibidas (sem diferenciar maiúsculas nem acentos), e os botões
+    "Todas" e "Nenhuma" valem para as colunas exibidas.
+    """
+
+    def __init__(self, parent, empty_text: str = "", **kwargs):
+        """
+        Cria a lista vazia.
+
+        Args:
+            parent: Widget pai
+            empty_text: Texto exibido enquanto não há colunas
+        """
+        super().__init__(parent, **kwargs)
+
+        self.categories: Dict[str, List[str]] = {}
+        self.mandatory_column: Optional[str] = None
+        self.selected: Set[str] = set()
+        self._item_column: Dict[str, str] = {}
+        self._item_category: Dict[str, str] = {}
+        self._folded: Dict[str, str] = {}
+
+        # Busca e seleção em massa
+        frame_busca = tk.Frame(self)
+        frame_busca.pack(fill="x", pady=(0, 5))
+        tk.Label(frame_busca, text="Buscar:").pack(side="left")
+        self.var_busca = tk.StringVar()
+        self.var_busca.trace_add("write", lambda *_: self._render())
+        tk.Entry(frame_busca, textvariable=self.var_busca).pack(
+            side="left", fill="x", expand=True, padx=5
+        )
+        tk.Button(frame_busca, text="Todas", command=lambda: self._set_visible(True), width=7).pack(
+            side="left"
+        )
+        tk.Button(frame_busca, text="Nenhuma", command=lambda: self._set_visible(False), width=7).pack(
+            side="left", padx=(5, 0)
+        )
+
+        self.label_vazio = tk.Label(self, text=empty_text, fg="gray")
+        self.label_vazio.pack()
+
+        # Árvore: categorias no primeiro nível, colunas no segundo
+        frame_arvore = tk.Frame(self)
+        frame_arvore.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(frame_arvore, show="tree", selectmode="browse")
+        scrollbar = ttk.Scrollbar(frame_arvore, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<space>", self._on_space)
+
+    def set_columns(
+        self,
+        categories: Dict[str, List[str]],
+        mandatory_column: Optional[str] = None
+    ) -> None:
+        """
+        Substitui as colunas exibidas; somente a coluna obrigatória fica marcada.
+
+        Args:
+            categories: Colunas por categoria (ver column_categories.categorize_columns)
+            mandatory_column: Coluna sempre marcada, que não pode ser desmarcada
+        """
+        self.categories = {cat: list(cols) for cat, cols in categories.items() if cols}
+        self.mandatory_column = mandatory_column
+        self.selected = {mandatory_column} if self._has_column(mandatory_column) else set()
+        self._folded = {col: _fold(col) for cols in self.categories.values() for col in cols}
+        self.label_vazio.pack_forget()
+        self.var_busca.set("")  # Também redesenha a árvore
+
+    def get_selected_columns(self) -> List[str]:
+        """
+        Retorna as colunas marcadas, na ordem das categorias.
+
+        Returns:
+            Lista de colunas selecionadas
+        """
+        return [
+            col for cols in self.categories.values() for col in cols
+            if col in self.selected
+        ]
+
+    def set_selected_columns(self, columns: Iterable[str]) -> None:
+        """
+        Marca exatamente as colunas fornecidas (as inexistentes são ignoradas).
+
+        Args:
+            columns: Lista de colunas para marcar
+        """
+        self.selected = set(columns)
+        if self._has_column(self.mandatory_column):
+            self.selected.add(self.mandatory_column)
+        self._refresh()
+
+    def _has_column(self, column: Optional[str]) -> bool:
+        return column is not None and any(column in cols for cols in self.categories.values())
+
+    def _render(self) -> None:
+        """Recria os itens da árvore com as colunas que correspondem à busca."""
+        self.tree.delete(*self.tree.get_children())
+        self._item_column.clear()
+        self._item_category.clear()
+
+        busca = _fold(self.var_busca.get().strip())
+        for i, (categoria, colunas) in enumerate(self.categories.items()):
+            visiveis = [col for col in colunas if busca in self._folded[col]]
+            if not visiveis:
+                continue
+            cat_item = self.tree.insert("", "end", iid=f"cat{i}", open=True)
+            self._item_category[cat_item] = categoria
+            for j, col in enumerate(visiveis):
+                col_item = self.tree.insert(cat_item, "end", iid=f"cat{i}col{j}")
+                self._item_column[col_item] = col
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Atualiza as marcas e as contagens dos itens exibidos."""
+        for item, col in self._item_column.items():
+            texto = f"{CHECKED if col in self.selected else UNCHECKED} {col}"
+            if col == self.mandatory_column:
+                texto += " (obrigatória)"
+            self.tree.item(item, text=texto)
+        for item, categoria in self._item_category.items():
+            colunas = self.categories[categoria]
+            marcadas = sum(col in self.selected for col in colunas)
+            marca = CHECKED if marcadas == len(colunas) else PARTIAL if marcadas else UNCHECKED
+            self.tree.item(item, text=f"{marca} {categoria} ({marcadas}/{len(colunas)})")
+
+    def _visible_columns(self, category_item: Optional[str] = None) -> List[str]:
+        """Colunas exibidas (de uma categoria, ou de todas)."""
+        return [
+            col for item, col in self._item_column.items()
+            if category_item is None or self.tree.parent(item) == category_item
+        ]
+
+    def _set_visible(self, checked: bool, category_item: Optional[str] = None) -> None:
+        """Marca ou desmarca as colunas exibidas (de uma categoria, ou de todas)."""
+        colunas = self._visible_columns(category_item)
+        if checked:
+            self.selected.update(colunas)
+        else:
+            self.selected.difference_update(
+                col for col in colunas if col != self.mandatory_column
+            )
+        self._refresh()
+
+    def _toggle(self, item: str) -> None:
+        if item in self._item_column:
+            col = self._item_column[item]
+            if col in self.selected and col != self.mandatory_column:
+                self.selected.discard(col)
+            else:
+                self.selected.add(col)
+            self._refresh()
+        elif item in self._item_category:
+            colunas = self._visible_columns(item)
+            self._set_visible(not all(col in self.selected for col in colunas), item)
+
+    def _on_click(self, event) -> Optional[str]:
+        # Clique no indicador de expandir/recolher mantém o comportamento padrão
+        if self.tree.identify_element(event.x, event.y) == "Treeitem.indicator":
+            return None
+        item = self.tree.identify_row(event.y)
+        if item:
+            self.tree.focus(item)
+            self.tree.selection_set(item)
+            self._toggle(item)
+        return "break"
+
+    def _on_space(self, event) -> str:
+        item = self.tree.focus()
+        if item:
+            self._toggle(item)
+        return "break"
+
+
+def _fold(text: str) -> str:
+    """Texto em minúsculas e sem acentos, para a busca de colunas."""
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
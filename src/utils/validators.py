@@ -76,8 +76,8 @@ def validar_colunas_selecionadas(
     Valida se as colunas selecionadas existem nos DataFrames.
 
     Args:
-        df_pessoas: DataFrame da planilha de pessoas
-        df_secundario: DataFrame da planilha secundária
+        df_pessoas: DataFrame da planilha de pessoas (ou lista com suas colunas)
+        df_secundario: DataFrame da planilha secundária (ou lista com suas colunas)
         colunas_pessoas: Lista de colunas selecionadas em pessoas
         colunas_secundario: Lista de colunas selecionadas no arquivo secundário
         tipo: Nome do arquivo secundário para mensagens customizadas
@@ -104,14 +104,22 @@ def validar_colunas_selecionadas(
         return False
 
     # Validar que colunas existem nos DataFrames
-    colunas_faltando_pessoas = [col for col in colunas_pessoas if col not in df_pessoas.columns]
+    disponiveis_pessoas = set(_colunas_disponiveis(df_pessoas))
+    disponiveis_secundario = set(_colunas_disponiveis(df_secundario))
+
+    colunas_faltando_pessoas = [col for col in colunas_pessoas if col not in disponiveis_pessoas]
     if colunas_faltando_pessoas:
         messagebox.showerror("Erro", f"Colunas não encontradas em Pessoas:\n{', '.join(colunas_faltando_pessoas)}")
         return False
 
-    colunas_faltando_secundario = [col for col in colunas_secundario if col not in df_secundario.columns]
+    colunas_faltando_secundario = [col for col in colunas_secundario if col not in disponiveis_secundario]
     if colunas_faltando_secundario:
         messagebox.showerror("Erro", f"Colunas não encontradas em {tipo}:\n{', '.join(colunas_faltando_secundario)}")
         return False
 
     return True
+
+
+def _colunas_disponiveis(dados):
+    """Retorna as colunas de um DataFrame, ou a própria lista se já for uma lista de colunas."""
+    return dados.columns if hasattr(dados, "columns") else dados
@@ -0,0 +1,55 @@
+"""Importação antecipada, em segundo plano, dos módulos pesados (pandas, numpy, openpyxl e a engine)."""
+import importlib
+import threading
+from typing import Iterable, Optional
+
+
+# Módulos usados na leitura das planilhas e no merge, na ordem de importação
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "openpyxl",
+    ".column_loader",
+    ".merge_engine",
+    ".output_writers",
+)
+
+
+def warm_up(modules: Iterable[str] = HEAVY_MODULES) -> None:
+    """
+    Importa os módulos indicados, ignorando os que falham.
+
+    Um módulo que não pode ser importado é ignorado aqui: o erro aparece
+    normalmente quando o módulo for usado.
+
+    Args:
+        modules: Nomes dos módulos (relativos a utils quando começam por ".")
+    """
+    for name in modules:
+        try:
+            importlib.import_module(name, __package__)
+        except Exception:
+            pass  # O erro será informado no primeiro uso do módulo
+
+
+def start_warmup(modules: Iterable[str] = HEAVY_MODULES) -> Optional[threading.Thread]:
+    """
+    Importa os módulos pesados em uma thread em segundo plano.
+
+    A interface abre sem esperar pelo pandas: enquanto o usuário escolhe
+    os arquivos, a thread carrega as dependências do merge. Se um módulo
+    for usado antes do fim da importação, o sistema de importação do Python
+    faz o chamador aguardar, sem importar o módulo duas vezes.
+
+    Args:
+        modules: Nomes dos módulos (relativos a utils quando começam por ".")
+
+    Returns:
+        A thread iniciada (daemon), ou None se a thread não pôde ser criada
+    """
+    try:
+        thread = threading.Thread(target=warm_up, args=(tuple(modules),), name="warmup", daemon=True)
+        thread.start()
+    except RuntimeError:
+        return None
+    return thread
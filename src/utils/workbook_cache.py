@@ -0,0 +1,288 @@
+"""Cache em memória de planilhas já carregadas, compartilhado entre as etapas do merge."""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .disk_cache import DiskCache, get_default_disk_cache
+from .excel_engines import AUTO_ENGINE, read_excel
+
+# (caminho absoluto, mtime, tamanho em bytes, linha do header)
+FileKey = Tuple[str, float, int, int]
+
+# FileKey + conjunto de colunas carregadas (None = todas as colunas)
+CacheKey = Tuple[FileKey, Optional[FrozenSet]]
+
+# Limite padrão de memória ocupada pelos DataFrames em cache (1 GiB)
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+class WorkbookCache:
+    """
+    Cache LRU de DataFrames limitado pela memória ocupada.
+
+    Cada planilha é identificada por (caminho, mtime, tamanho, header_row), de
+    modo que uma alteração no arquivo invalida automaticamente a entrada antiga.
+    Uma entrada pode conter apenas parte das colunas (projeção); ela atende a
+    qualquer consulta por um subconjunto dessas colunas.
+    Os DataFrames retornados são compartilhados e não devem ser modificados.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes: Memória máxima (em bytes) ocupada pelos DataFrames em cache
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_path: str, header_row: int = 1) -> FileKey:
+        """
+        Gera a chave de cache de um arquivo.
+
+        Args:
+            file_path: Caminho do arquivo
+            header_row: Linha que contém o header (0-indexed)
+
+        Returns:
+            Tupla (caminho absoluto, mtime, tamanho, header_row)
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existe
+        """
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime, stat.st_size, header_row)
+
+    def get(
+        self,
+        file_path: str,
+        header_row: int = 1,
+        columns: Optional[Iterable] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Retorna o DataFrame em cache, ou None se não houver entrada válida.
+
+        Args:
+            file_path: Caminho do arquivo
+            header_row: Linha que contém o header (0-indexed)
+            columns: Colunas necessárias (None = todas as colunas)
+
+        Returns:
+            DataFrame em cache (projetado nas colunas pedidas) ou None
+        """
+        try:
+            file_key = self.make_key(file_path, header_row)
+        except OSError:
+            return None
+
+        wanted = None if columns is None else frozenset(columns)
+
+        with self._lock:
+            for key, (df, _) in reversed(self._entries.items()):
+                if key[0] != file_key:
+                    continue
+                loaded = key[1]
+                if loaded is None or (wanted is not None and wanted <= loaded):
+                    self._entries.move_to_end(key)
+                    if wanted is None or loaded == wanted:
+                        return df
+                    return df[[col for col in df.columns if col in wanted]]
+        return None
+
+    def put(
+        self,
+        file_path: str,
+        header_row: int,
+        df: pd.DataFrame,
+        columns: Optional[Iterable] = None
+    ) -> None:
+        """
+        Armazena um DataFrame no cache, removendo as entradas menos usadas se necessário.
+
+        DataFrames maiores que o limite total não são armazenados.
+
+        Args:
+            file_path: Caminho do arquivo
+            header_row: Linha que contém o header (0-indexed)
+            df: DataFrame carregado
+            columns: Colunas pedidas na carga (None = todas as colunas)
+        """
+        file_key = self.make_key(file_path, header_row)
+        loaded = None if columns is None else frozenset(columns)
+        size = self._estimate_size(df)
+
+        with self._lock:
+            for old_key in list(self._entries):
+                old_file_key, old_loaded = old_key
+                if old_file_key[0] != file_key[0] or old_file_key[3] != file_key[3]:
+                    continue
+                # Remover versões antigas do mesmo arquivo (mtime/tamanho diferentes)
+                # e projeções que a nova entrada já cobre
+                if (
+                    old_file_key != file_key
+                    or loaded is None
+                    or (old_loaded is not None and old_loaded <= loaded)
+                ):
+                    self._discard(old_key)
+
+            if size > self.max_bytes:
+                return
+
+            self._entries[(file_key, loaded)] = (df, size)
+            self._total_bytes += size
+
+            # Política LRU: remover as entradas mais antigas até caber no limite
+            while self._total_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._discard(oldest_key)
+
+    def get_or_load(
+        self,
+        file_path: str,
+        header_row: int,
+        loader: Callable[[], pd.DataFrame],
+        columns: Optional[Iterable] = None
+    ) -> pd.DataFrame:
+        """
+        Retorna o DataFrame em cache ou carrega-o com a função fornecida.
+
+        Args:
+            file_path: Caminho do arquivo
+            header_row: Linha que contém o header (0-indexed)
+            loader: Função sem argumentos que faz o parse do arquivo
+            columns: Colunas que o loader carrega (None = todas as colunas)
+
+        Returns:
+            DataFrame da planilha
+        """
+        df = self.get(file_path, header_row, columns)
+        if df is None:
+            df = loader()
+            self.put(file_path, header_row, df, columns)
+        return df
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """Memória estimada ocupada pelas entradas em cache."""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: CacheKey) -> None:
+        """Remove uma entrada (deve ser chamado com o lock adquirido)."""
+        _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+    @staticmethod
+    def _estimate_size(df: pd.DataFrame) -> int:
+        """Estima a memória ocupada por um DataFrame, incluindo strings."""
+        return int(df.memory_usage(index=True, deep=True).sum())
+
+
+_default_cache = WorkbookCache()
+
+
+def get_default_cache() -> WorkbookCache:
+    """Retorna o cache compartilhado pelo processo."""
+    return _default_cache
+
+
+def load_workbook(
+    file_path: str,
+    header_row: int = 1,
+    cache: Optional[WorkbookCache] = None,
+    usecols: Optional[List] = None,
+    disk_cache: Optional[DiskCache] = None,
+    postprocess: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    engine: str = AUTO_ENGINE,
+    stats: Optional[Dict] = None
+) -> pd.DataFrame:
+    """
+    Carrega um arquivo Excel reaproveitando o parse em cache, se houver.
+
+    Com usecols, somente as colunas pedidas são lidas da planilha; colunas
+    pedidas que não existem no arquivo são ignoradas (a validação das
+    seleções é quem acusa a falta).
+
+    Fora do cache em memória, a planilha é procurada no cache em disco. O
+    parse lê somente as colunas pedidas e as grava no cache em disco,
+    acrescentando-as à entrada do arquivo; as cargas seguintes dessas
+    colunas são uma leitura mapeada em memória, e pedir uma coluna ainda
+    não guardada provoca um novo parse projetado.
+
+    Args:
+        file_path: Caminho do arquivo
+        header_row: Linha que contém o header (0-indexed)
+        cache: Cache a utilizar (padrão: cache compartilhado do processo)
+        usecols: Colunas a carregar (padrão: todas)
+        disk_cache: Cache em disco (padrão: ~/.worksheet-merge/cache/)
+        postprocess: Transformação aplicada após a leitura (por exemplo, a
+                     conversão de tipos); o cache em memória guarda o
+                     resultado transformado, então quem compartilha um cache
+                     deve usar a mesma transformação
+        engine: Leitor de planilhas ("auto" = o mais rápido disponível; ver excel_engines)
+        stats: Dicionário que recebe em "origem" de onde a planilha veio:
+               "memoria", "disco" (cache em disco) ou "planilha" (opcional)
+
+    Returns:
+        DataFrame com os dados (compartilhado, não deve ser modificado)
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existe
+        ValueError: Se há erro ao ler o arquivo
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+    if cache is None:
+        cache = get_default_cache()
+
+    if disk_cache is None:
+        disk_cache = get_default_disk_cache()
+
+    wanted = None if usecols is None else set(usecols)
+    if stats is not None:
+        stats["origem"] = "memoria"
+
+    def _load() -> pd.DataFrame:
+        df = _parse()
+        if postprocess is not None:
+            df = postprocess(df)
+        return df
+
+    def _parse() -> pd.DataFrame:
+        df = disk_cache.load(file_path, header_row, usecols)
+        if df is not None:
+            if stats is not None:
+                stats["origem"] = "disco"
+            return df
+        if stats is not None:
+            stats["origem"] = "planilha"
+
+        try:
+            header: List = []
+            df = read_excel(
+                file_path, header_row=header_row, usecols=usecols, engine=engine, header=header
+            )
+        except Exception as e:
+            raise ValueError(f"Erro ao ler arquivo Excel: {str(e)}")
+
+        # Guardar só as colunas lidas; a entrada em disco cresce a cada nova projeção
+        disk_cache.store(file_path, header_row, df, header)
+        return df
+
+    return cache.get_or_load(file_path, header_row, _load, wanted)
@@ -0,0 +1,54 @@
+"""Fixtures comuns: planilhas no formato das exportações do ZKBio e uma engine isolada."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import DiskCache, MergeEngine, RunLog, WorkbookCache  # noqa: E402
+
+
+def write_export(path, df: pd.DataFrame) -> str:
+    """Grava um DataFrame como as exportações do ZKBio (título na 1ª linha, header na 2ª)."""
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame([["Relatório"]]).to_excel(writer, index=False, header=False, startrow=0)
+        df.to_excel(writer, index=False, startrow=1)
+    return str(path)
+
+
+@pytest.fixture
+def pessoas_path(tmp_path):
+    """Planilha de Pessoas com 50 IDs."""
+    df = pd.DataFrame({
+        "ID Pessoal": np.arange(1, 51),
+        "Nome": [f"P{i}" for i in range(1, 51)],
+        "Email": [f"p{i}@empresa.com" for i in range(1, 51)],
+    })
+    return write_export(tmp_path / "pessoas.xlsx", df)
+
+
+@pytest.fixture
+def registros_ddmm_path(tmp_path):
+    """Registros de acesso com Horário em texto dd/mm/aaaa, como nas exportações do ZKBio."""
+    n = 600
+    rng = np.random.default_rng(0)
+    horarios = pd.date_range("2024-01-01", periods=n, freq="57min")
+    df = pd.DataFrame({
+        "Horário": horarios.strftime("%d/%m/%Y %H:%M:%S"),
+        "ID Pessoal": rng.integers(1, 60, n),
+        "Nome da Área": rng.choice(["Área 1", "Área 2"], n),
+    })
+    return write_export(tmp_path / "registros.xlsx", df)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine com caches e registro de execuções próprios do teste."""
+    return MergeEngine(
+        cache=WorkbookCache(),
+        disk_cache=DiskCache(str(tmp_path / "cache")),
+        run_log=RunLog(str(tmp_path / "runs")),
+    )
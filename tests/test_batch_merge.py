@@ -0,0 +1,55 @@
+"""Merge em lote: validação das colunas e ordenação por colunas de Pessoas."""
+import pandas as pd
+import pytest
+
+from conftest import write_export
+
+PESSOAS = ["ID Pessoal", "Nome"]
+SECUNDARIO = ["Horário", "ID Pessoal", "Nome da Área"]
+
+
+def test_missing_secondary_column_fails_before_workers(engine, pessoas_path, registros_ddmm_path, tmp_path):
+    sem_area = write_export(
+        tmp_path / "sem_area.xlsx",
+        pd.DataFrame({"Horário": ["01/01/2024 08:00:00"], "ID Pessoal": [1]})
+    )
+    with pytest.raises(ValueError, match="sem_area.xlsx: Colunas não encontradas em Registros/Níveis: Nome da Área"):
+        engine.merge_batch(
+            pessoas_path, [registros_ddmm_path, sem_area], PESSOAS, SECUNDARIO,
+            output_paths=[str(tmp_path / "a.xlsx"), str(tmp_path / "b.xlsx")], max_workers=2
+        )
+    assert not (tmp_path / "a.xlsx").exists()
+
+
+def test_missing_file_is_reported_per_file(engine, pessoas_path, registros_ddmm_path, tmp_path):
+    resultados = engine.merge_batch(
+        pessoas_path, [registros_ddmm_path, str(tmp_path / "ausente.xlsx")], PESSOAS, SECUNDARIO,
+        output_paths=[str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], max_workers=1
+    )
+    assert resultados[0]["erro"] is None and resultados[0]["linhas"] == 600
+    assert "ausente.xlsx" in resultados[1]["erro"]
+
+
+@pytest.mark.parametrize("output_mode,limit", [("sorted", None), ("top_n", 25), ("latest_per_person", 2)])
+def test_sort_by_pessoas_column_matches_merge(engine, pessoas_path, registros_ddmm_path, output_mode, limit):
+    params = dict(sort_column="Email", sort_order="ASC", output_mode=output_mode, limit=limit)
+    esperado = engine.merge(pessoas_path, registros_ddmm_path, PESSOAS, SECUNDARIO, **params)
+    resultado = engine.merge_batch(
+        pessoas_path, [registros_ddmm_path], PESSOAS, SECUNDARIO, max_workers=1, **params
+    )
+
+    assert "Email" not in resultado.columns
+    assert list(resultado.columns) == list(esperado.columns)
+    assert resultado["ID Pessoal"].tolist() == esperado["ID Pessoal"].tolist()
+
+
+def test_sort_by_pessoas_column_with_output_paths(engine, pessoas_path, registros_ddmm_path, tmp_path):
+    saida = tmp_path / "ordenado.csv"
+    resultados = engine.merge_batch(
+        pessoas_path, [registros_ddmm_path], [*PESSOAS, "Email"], SECUNDARIO,
+        sort_column="Email", sort_order="DESC", output_paths=[str(saida)], max_workers=1
+    )
+    assert resultados[0]["erro"] is None
+
+    emails = pd.read_csv(saida)["Email"].dropna().tolist()
+    assert emails and emails == sorted(emails, reverse=True)
@@ -0,0 +1,51 @@
+"""Cache em disco com leitura projetada das planilhas."""
+import pytest
+
+from utils import DiskCache, WorkbookCache
+from utils.workbook_cache import load_workbook
+
+pytest.importorskip("pyarrow")
+
+
+def _load(path, disk_cache, usecols):
+    stats = {}
+    df = load_workbook(path, cache=WorkbookCache(), usecols=usecols, disk_cache=disk_cache, stats=stats)
+    return df, stats["origem"]
+
+
+def test_projected_parse_stores_only_requested_columns(tmp_path, pessoas_path):
+    disk_cache = DiskCache(str(tmp_path / "cache"))
+
+    df, origem = _load(pessoas_path, disk_cache, ["ID Pessoal"])
+    assert origem == "planilha"
+    assert list(df.columns) == ["ID Pessoal"]
+
+    entry = disk_cache._entry_path(pessoas_path, 1)
+    header, stored = disk_cache._read_schema(entry)
+    assert stored == ["ID Pessoal"]
+    assert header == ["ID Pessoal", "Nome", "Email"]
+    assert disk_cache.columns(pessoas_path, 1) == header
+
+    df, origem = _load(pessoas_path, disk_cache, ["ID Pessoal"])
+    assert origem == "disco"
+    assert len(df) == 50
+
+
+def test_later_miss_is_merged_into_the_entry(tmp_path, pessoas_path):
+    disk_cache = DiskCache(str(tmp_path / "cache"))
+    _load(pessoas_path, disk_cache, ["Email"])
+
+    _, origem = _load(pessoas_path, disk_cache, ["Email", "ID Pessoal"])
+    assert origem == "planilha"
+
+    df, origem = _load(pessoas_path, disk_cache, ["Email", "ID Pessoal"])
+    assert origem == "disco"
+    assert list(df.columns) == ["ID Pessoal", "Email"]
+    assert df["Email"].iloc[0] == "p1@empresa.com"
+
+    # Sem usecols a entrada só serve quando já tem todas as colunas
+    _, origem = _load(pessoas_path, disk_cache, None)
+    assert origem == "planilha"
+    df, origem = _load(pessoas_path, disk_cache, None)
+    assert origem == "disco"
+    assert list(df.columns) == ["ID Pessoal", "Nome", "Email"]
@@ -0,0 +1,115 @@
+"""Gravadores do resultado: limpeza após cancelamento e tabelas SQLite."""
+import gc
+import os
+import sqlite3
+import tempfile
+
+import pandas as pd
+import pytest
+from openpyxl.worksheet import _writer as openpyxl_writer
+
+from utils import MergeCancelled, TaskControl
+from utils.aggregations import PRESET_AGGREGATIONS
+from utils.output_writers import iter_slices, write_output
+
+
+def _openpyxl_temp_files():
+    return {name for name in os.listdir(tempfile.gettempdir()) if name.startswith("openpyxl")}
+
+
+class _CancelAfter(TaskControl):
+    """Cancela a tarefa depois de um número de relatórios de progresso."""
+
+    def __init__(self, reports):
+        super().__init__()
+        self.reports = reports
+
+    def report(self, phase, current=None, total=None):
+        super().report(phase, current, total)
+        self.reports -= 1
+        if self.reports == 0:
+            self.cancel()
+
+
+def _cancelled_chunks(df, cancel_after):
+    for i, chunk in enumerate(iter_slices(df, 1000)):
+        if i == cancel_after:
+            raise MergeCancelled()
+        yield chunk
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_cancelled_xlsx_leaves_no_temp_files(tmp_path):
+    df = pd.DataFrame({"ID Pessoal": range(20000), "Nome": [f"P{i}" for i in range(20000)]})
+    antes = _openpyxl_temp_files()
+    path = tmp_path / "saida.xlsx"
+
+    with pytest.raises(MergeCancelled):
+        # Planilhas de 5.000 linhas: o cancelamento ocorre com várias planilhas abertas
+        write_output(_cancelled_chunks(df, 12), str(path), options={"max_rows": 5000})
+    gc.collect()
+
+    assert not path.exists()
+    assert _openpyxl_temp_files() == antes
+    assert not openpyxl_writer.ALL_TEMP_FILES
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+@pytest.mark.parametrize("separate_detail", [False, True])
+def test_cancelled_merge_report_leaves_no_temp_files(
+    tmp_path, engine, pessoas_path, registros_ddmm_path, separate_detail
+):
+    antes = _openpyxl_temp_files()
+    output_path = tmp_path / "resumos.xlsx"
+    detail_path = tmp_path / "detalhe.xlsx" if separate_detail else output_path
+
+    with pytest.raises(MergeCancelled):
+        engine.merge_report(
+            pessoas_path, registros_ddmm_path,
+            ["ID Pessoal", "Nome"], ["Horário", "ID Pessoal", "Nome da Área"],
+            {"Por pessoa": PRESET_AGGREGATIONS["Por pessoa"]},
+            str(output_path), detail_path=str(detail_path),
+            chunksize=100, control=_CancelAfter(4)
+        )
+    gc.collect()
+
+    assert not output_path.exists()
+    assert not detail_path.exists()
+    assert _openpyxl_temp_files() == antes
+    assert not openpyxl_writer.ALL_TEMP_FILES
+
+
+@pytest.mark.parametrize("extension", ["csv", "parquet", "sqlite"])
+def test_cancelled_stream_leaves_no_partial_file(tmp_path, extension):
+    df = pd.DataFrame({"ID Pessoal": range(5000)})
+    path = tmp_path / f"saida.{extension}"
+
+    with pytest.raises(MergeCancelled):
+        write_output(_cancelled_chunks(df, 2), str(path))
+
+    assert os.listdir(tmp_path) == []
+
+
+def _sqlite_rows(path, table="resultado"):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(f'SELECT * FROM "{table}"').fetchall()
+
+
+def test_sqlite_without_chunks_keeps_existing_table(tmp_path):
+    path = str(tmp_path / "saida.sqlite")
+    write_output(pd.DataFrame({"ID Pessoal": [1, 2]}), path)
+
+    # Nenhum bloco (por exemplo, todas as linhas filtradas): colunas desconhecidas
+    assert write_output(iter([]), path) == 0
+    assert _sqlite_rows(path) == [(1,), (2,)]
+
+
+def test_sqlite_empty_result_with_columns_replaces_table(tmp_path):
+    path = str(tmp_path / "saida.sqlite")
+    write_output(pd.DataFrame({"ID Pessoal": [1, 2]}), path)
+
+    write_output(pd.DataFrame(columns=["ID Pessoal", "Nome"]), path)
+    assert _sqlite_rows(path) == []
+    with sqlite3.connect(path) as connection:
+        colunas = [row[1] for row in connection.execute('PRAGMA table_info("resultado")')]
+    assert colunas == ["ID Pessoal", "Nome"]
@@ -0,0 +1,63 @@
+"""Filtros de período com datas no formato dd/mm/aaaa."""
+import warnings
+
+import pandas as pd
+
+from utils.dtypes import coerce_dates
+from utils.row_filters import apply_filters
+
+PERIODO = {"Horário": {"inicio": "2024-01-05", "fim": "2024-01-10"}}
+PESSOAS = ["ID Pessoal", "Nome"]
+SECUNDARIO = ["Horário", "ID Pessoal", "Nome da Área"]
+
+
+def test_coerce_dates_reads_day_first():
+    dates = coerce_dates(pd.Series(["05/01/2024 10:00:00", "13/01/2024 08:30:00", None]))
+    assert dates.tolist()[:2] == [pd.Timestamp("2024-01-05 10:00"), pd.Timestamp("2024-01-13 08:30")]
+    assert pd.isna(dates.iloc[2])
+
+
+def test_coerce_dates_accepts_mixed_formats():
+    dates = coerce_dates(pd.Series(["2024-01-05 10:00", "13/01/2024", "inválida"]))
+    assert dates.tolist()[:2] == [pd.Timestamp("2024-01-05 10:00"), pd.Timestamp("2024-01-13")]
+    assert pd.isna(dates.iloc[2])
+
+
+def test_date_filter_on_day_first_text():
+    df = pd.DataFrame({"Horário": ["04/01/2024 23:59:59", "05/01/2024 00:00:00", "10/01/2024 23:00:00",
+                                   "11/01/2024 00:00:00", "13/01/2024 08:00:00"]})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = apply_filters(df, PERIODO)
+    assert result["Horário"].tolist() == ["05/01/2024 00:00:00", "10/01/2024 23:00:00"]
+
+
+def test_merge_and_merge_chunks_agree_on_day_first_file(engine, pessoas_path, registros_ddmm_path):
+    df_merge = engine.merge(
+        pessoas_path, registros_ddmm_path, PESSOAS, SECUNDARIO,
+        filters=PERIODO, output_mode="unsorted"
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        chunks = list(engine.merge_chunks(
+            pessoas_path, registros_ddmm_path, PESSOAS, SECUNDARIO,
+            chunksize=100, filters=PERIODO
+        ))
+    esperadas = coerce_dates(pd.read_excel(registros_ddmm_path, header=1)["Horário"])
+    esperadas = ((esperadas >= "2024-01-05") & (esperadas < "2024-01-11")).sum()
+
+    assert esperadas > 0
+    assert len(df_merge) == esperadas
+    assert sum(len(chunk) for chunk in chunks) == esperadas
+
+
+def test_merge_and_merge_chunks_return_same_dtypes(engine, pessoas_path, registros_ddmm_path):
+    df_merge = engine.merge(pessoas_path, registros_ddmm_path, PESSOAS, SECUNDARIO, output_mode="unsorted")
+    chunks = list(engine.merge_chunks(pessoas_path, registros_ddmm_path, PESSOAS, SECUNDARIO, chunksize=100))
+
+    tipos = {col: str(dtype) for col, dtype in df_merge.dtypes.items()}
+    assert tipos["Horário"].startswith("datetime64")
+    for chunk in chunks:
+        assert {col: str(dtype) for col, dtype in chunk.dtypes.items()} == tipos
+    horarios = pd.concat([chunk["Horário"] for chunk in chunks], ignore_index=True)
+    assert horarios.equals(df_merge["Horário"].reset_index(drop=True))